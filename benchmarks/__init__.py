@@ -0,0 +1,5 @@
+"""
+Performance benchmarks for the Welsh-Winters Balance Framework
+
+Run with ``python -m benchmarks.run``; see ``benchmarks/run.py``.
+"""
@@ -0,0 +1,135 @@
+"""
+Seeded synthetic conversation generator
+
+Sentences are harvested from ``data/sample_conversations.json`` and sorted
+into technical, emotional and neutral pools by the analyzer's own pattern
+counts.  Conversations are then assembled from those pools, so their size
+(conversations, turns, sentences per turn) and technical/emotional mix can
+be dialed independently while the text still looks like real traffic.
+The same seed always produces the same corpus.
+"""
+
+import json
+import os
+import random
+import re
+from typing import Any, Dict, List, Optional
+
+from src.analyzer import BalanceAnalyzer
+
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'sample_conversations.json')
+
+_SENTENCE_RE = re.compile(r'[^.!?]+[.!?]*')
+
+SPEAKERS = ('human', 'assistant')
+
+
+def load_sentence_pools(path: str = SAMPLE_PATH) -> Dict[str, List[str]]:
+    """
+    Split the sample conversations into pools of classified sentences
+
+    Args:
+        path: JSON file with a 'conversations' array
+
+    Returns:
+        Dictionary with 'technical', 'emotional' and 'neutral' sentence lists
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        conversations = json.load(f)['conversations']
+
+    matcher = BalanceAnalyzer().matcher
+    pools: Dict[str, List[str]] = {'technical': [], 'emotional': [], 'neutral': []}
+    for conversation in conversations:
+        for message in conversation['messages']:
+            for sentence in _SENTENCE_RE.findall(message['content']):
+                sentence = sentence.strip()
+                if not sentence:
+                    continue
+                counts = matcher.count(sentence)
+                if counts['technical'] > counts['emotional']:
+                    pools['technical'].append(sentence)
+                elif counts['emotional'] > counts['technical']:
+                    pools['emotional'].append(sentence)
+                else:
+                    pools['neutral'].append(sentence)
+    return pools
+
+
+class ConversationGenerator:
+    """
+    Generates conversations shaped like data/sample_conversations.json
+
+    Example:
+        >>> generator = ConversationGenerator(seed=42)
+        >>> corpus = generator.corpus(conversations=100, turns=20, technical_ratio=0.7)
+    """
+
+    def __init__(self, seed: int = 0, pools: Optional[Dict[str, List[str]]] = None):
+        """
+        Initialize the generator
+
+        Args:
+            seed: Random seed; equal seeds give equal corpora
+            pools: Sentence pools (default: load_sentence_pools())
+        """
+        self.seed = seed
+        self.pools = pools if pools is not None else load_sentence_pools()
+
+    def corpus(
+        self,
+        conversations: int = 100,
+        turns: int = 20,
+        sentences_per_turn: int = 3,
+        technical_ratio: float = 0.5,
+        neutral_ratio: float = 0.2
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate a corpus of conversations
+
+        Args:
+            conversations: Number of conversations
+            turns: Messages per conversation
+            sentences_per_turn: Sentences per message
+            technical_ratio: Share of non-neutral sentences drawn from the
+                technical pool (the rest are emotional)
+            neutral_ratio: Share of sentences drawn from the neutral pool
+
+        Returns:
+            List of conversation dicts with 'id', 'metadata' and 'messages'
+        """
+        rng = random.Random(self.seed)
+        corpus = []
+        for index in range(conversations):
+            messages = []
+            for turn in range(turns):
+                sentences = [self._sentence(rng, technical_ratio, neutral_ratio)
+                             for _ in range(sentences_per_turn)]
+                messages.append({
+                    'turn': turn + 1,
+                    'role': SPEAKERS[turn % 2],
+                    'content': ' '.join(sentences)
+                })
+            corpus.append({
+                'id': f'synthetic_{self.seed}_{index:06d}',
+                'metadata': {'technical_ratio': technical_ratio, 'seed': self.seed},
+                'messages': messages
+            })
+        return corpus
+
+    def _sentence(self, rng: random.Random, technical_ratio: float, neutral_ratio: float) -> str:
+        if rng.random() < neutral_ratio:
+            pool = self.pools['neutral']
+        elif rng.random() < technical_ratio:
+            pool = self.pools['technical']
+        else:
+            pool = self.pools['emotional']
+        return rng.choice(pool)
+
+
+def to_transcript(conversation: Dict[str, Any]) -> str:
+    """Render a conversation in the ``Speaker: text`` transcript format"""
+    return '\n'.join(
+        f"{message['role'].capitalize()}: {message['content']}"
+        for message in conversation['messages']
+    ) + '\n'
@@ -0,0 +1,221 @@
+"""
+Throughput and latency benchmarks
+
+Usage:
+    python -m benchmarks.run
+    python -m benchmarks.run --conversations 500 --turns 40 --save benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json --max-regression 0.2
+
+Every case times one call per item (a message, a conversation or a
+transcript file) and reports turns per second plus p50/p99 call latency.
+Baselines are the JSON reports written by --save; --compare prints the
+throughput change per case and, with --max-regression, exits non-zero when
+a case got slower than allowed.
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from src.analyzer import BalanceAnalyzer
+from src.comprehensive_analyzer import ComprehensiveAnalyzer
+from src.metrics import calculate_trajectory
+
+from .generator import ConversationGenerator, to_transcript
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending sequence"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def measure(call: Callable[[Any], Any], items: Sequence[Any], turns: int,
+            repeat: int = 1) -> Dict[str, float]:
+    """
+    Time ``call`` on every item
+
+    Args:
+        call: Function benchmarked, called once per item
+        items: Inputs
+        turns: Total turns in ``items`` (for turns/sec)
+        repeat: Passes over the items; latencies from all passes are pooled
+
+    Returns:
+        Dictionary with calls, turns_per_sec, p50_ms, p99_ms and total_s
+    """
+    latencies: List[float] = []
+    clock = time.perf_counter
+    for _ in range(repeat):
+        for item in items:
+            start = clock()
+            call(item)
+            latencies.append(clock() - start)
+    total = sum(latencies)
+    latencies.sort()
+    return {
+        'calls': len(latencies),
+        'turns_per_sec': turns * repeat / total if total else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'total_s': total
+    }
+
+
+def run_benchmarks(conversations: int = 200, turns: int = 20, sentences_per_turn: int = 3,
+                   technical_ratio: float = 0.5, seed: int = 0, repeat: int = 1,
+                   cases: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """
+    Generate a corpus and benchmark every case on it
+
+    Args:
+        conversations: Conversations in the synthetic corpus
+        turns: Messages per conversation
+        sentences_per_turn: Sentences per message
+        technical_ratio: Technical share of the sentence mix
+        seed: Generator seed
+        repeat: Passes per case
+        cases: Names of the cases to run (default: all)
+
+    Returns:
+        Report dictionary with the corpus parameters and per-case results
+    """
+    corpus = ConversationGenerator(seed=seed).corpus(
+        conversations=conversations, turns=turns,
+        sentences_per_turn=sentences_per_turn, technical_ratio=technical_ratio
+    )
+    total_turns = conversations * turns
+    basic = BalanceAnalyzer()
+    comprehensive = ComprehensiveAnalyzer()
+
+    texts = [message['content'] for conversation in corpus for message in conversation['messages']]
+    message_lists = [conversation['messages'] for conversation in corpus]
+    transcripts = [to_transcript(conversation) for conversation in corpus]
+    balances = [
+        [turn['balance'] for turn in basic.analyze_conversation(messages)['turn_balances']]
+        for messages in message_lists
+    ]
+
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = []
+        for index, transcript in enumerate(transcripts):
+            path = os.path.join(tmpdir, f'conversation_{index}.txt')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(transcript)
+            paths.append(path)
+
+        all_cases = {
+            'analyze_text': lambda: measure(basic.analyze_text, texts, total_turns, repeat),
+            'analyze_conversation': lambda: measure(basic.analyze_conversation, message_lists,
+                                                    total_turns, repeat),
+            'analyze_conversation_file': lambda: measure(comprehensive.analyze_conversation_file,
+                                                         paths, total_turns, repeat),
+            'extract_turns': lambda: measure(comprehensive._extract_turns, transcripts,
+                                             total_turns, repeat),
+            'calculate_trajectory': lambda: measure(calculate_trajectory, balances,
+                                                    total_turns, repeat),
+        }
+        for name in cases or all_cases:
+            if name not in all_cases:
+                raise ValueError(f"Unknown benchmark case {name!r}, expected one of {sorted(all_cases)}")
+            results[name] = all_cases[name]()
+
+    return {
+        'parameters': {
+            'conversations': conversations, 'turns': turns,
+            'sentences_per_turn': sentences_per_turn, 'technical_ratio': technical_ratio,
+            'seed': seed, 'repeat': repeat
+        },
+        'environment': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine()
+        },
+        'results': results
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Throughput change of each case relative to a baseline report
+
+    Returns:
+        Mapping of case name to (current / baseline turns per second) - 1
+    """
+    changes = {}
+    for name, result in report['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if previous and previous['turns_per_sec']:
+            changes[name] = result['turns_per_sec'] / previous['turns_per_sec'] - 1
+    return changes
+
+
+def format_report(report: Dict[str, Any], changes: Optional[Dict[str, float]] = None) -> str:
+    """Render a report as a text table"""
+    lines = [f"{'case':<28}{'turns/sec':>14}{'p50 ms':>10}{'p99 ms':>10}"
+             + (f"{'vs base':>10}" if changes is not None else '')]
+    for name, result in report['results'].items():
+        line = (f"{name:<28}{result['turns_per_sec']:>14,.0f}"
+                f"{result['p50_ms']:>10.3f}{result['p99_ms']:>10.3f}")
+        if changes is not None:
+            line += f"{changes[name]:>+10.1%}" if name in changes else f"{'-':>10}"
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run',
+                                     description='Welsh-Winters throughput and latency benchmarks')
+    parser.add_argument('--conversations', type=int, default=200)
+    parser.add_argument('--turns', type=int, default=20, help='Messages per conversation')
+    parser.add_argument('--sentences', type=int, default=3, help='Sentences per message')
+    parser.add_argument('--technical-ratio', type=float, default=0.5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=1, help='Passes per case')
+    parser.add_argument('--case', action='append', dest='cases',
+                        help='Run only this case (repeatable)')
+    parser.add_argument('--save', metavar='PATH', help='Write the JSON report as a baseline')
+    parser.add_argument('--compare', metavar='PATH', help='Compare against a saved baseline')
+    parser.add_argument('--max-regression', type=float,
+                        help='With --compare, fail if any case loses more than this '
+                             'fraction of its throughput (e.g. 0.2)')
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    report = run_benchmarks(
+        conversations=args.conversations, turns=args.turns,
+        sentences_per_turn=args.sentences, technical_ratio=args.technical_ratio,
+        seed=args.seed, repeat=args.repeat, cases=args.cases
+    )
+
+    changes = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            changes = compare(report, json.load(f))
+    print(format_report(report, changes))
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if changes and args.max_regression is not None:
+        regressed = [name for name, change in changes.items() if change < -args.max_regression]
+        if regressed:
+            print(f"Regressed beyond {args.max_regression:.0%}: {', '.join(regressed)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,7 +2,7 @@
 Setup configuration for Welsh-Winters Balance Framework
 """
 
-from setuptools import setup, find_packages
+from setuptools import setup
 
 with open("README.md", "r", encoding="utf-8") as fh:
     long_description = fh.read()
@@ -34,7 +34,8 @@ setup(
         "Programming Language :: Python :: 3.11",
         "Operating System :: OS Independent",
     ],
-    packages=find_packages(),
+    packages=["welsh_winters"],
+    package_dir={"welsh_winters": "src"},
     python_requires=">=3.7",
     install_requires=[
         # No external dependencies - pure Python implementation
@@ -46,6 +47,9 @@ setup(
             "flake8>=4.0",
             "mypy>=0.950",
         ],
+        "fast": [
+            "numpy>=1.17",
+        ],
         "docs": [
             "sphinx>=4.0",
             "sphinx-rtd-theme>=1.0",
@@ -8,10 +8,20 @@ through balanced human-AI interaction patterns.
 __version__ = "1.1.0"
 __author__ = "SYNCFIRE Team"
 
-from .analyzer import BalanceAnalyzer
-from .comprehensive_analyzer import ComprehensiveAnalyzer
-from .patterns import TechnicalPatterns, EmotionalPatterns
-from .metrics import calculate_balance, phase_detector
+import importlib
+
+# Public names and the submodules defining them; a submodule is only
+# imported when one of its names is first accessed, so importing the
+# package (or one class from it) does not load the rest.
+_LAZY_ATTRIBUTES = {
+    'BalanceAnalyzer': 'analyzer',
+    'ComprehensiveAnalyzer': 'comprehensive_analyzer',
+    'TechnicalPatterns': 'patterns',
+    'EmotionalPatterns': 'patterns',
+    'calculate_balance': 'metrics',
+    'phase_detector': 'metrics',
+    'ConsciousnessEngine': 'consciousness',
+}
 
 __all__ = [
     'BalanceAnalyzer',
@@ -19,5 +29,19 @@ __all__ = [
     'TechnicalPatterns', 
     'EmotionalPatterns',
     'calculate_balance',
-    'phase_detector'
-]from .consciousness import ConsciousnessEngine
+    'phase_detector',
+    'ConsciousnessEngine'
+]
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
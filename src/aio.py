@@ -0,0 +1,144 @@
+"""
+asyncio helpers for running Welsh-Winters analysis off the event loop
+
+Scoring is CPU-bound, so the ``*_async`` analyzer methods hand it to an
+executor: a shared thread pool unless another executor is configured or
+passed (a ProcessPoolExecutor also works).  A thread pool calls the
+analyzer itself, so settings changed after construction apply.  For other
+executors, as in ``parallel``, calls name an analyzer factory, its keyword
+arguments and a method rather than passing a bound method, so the executing
+process reuses one analyzer instead of pickling or rebuilding it per call;
+the most recently used few are kept.
+
+An optional per-event-loop limit caps how many analyses run at once, so a
+burst of long messages cannot occupy every executor worker.  Cancelling
+the awaiting task drops work that has not started yet; work already
+running finishes in the background and keeps its slot until it does.
+"""
+
+import asyncio
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+# Defaults set with configure()
+_executor: Optional[Executor] = None
+_max_concurrency: Optional[int] = None
+_fallback_executor: Optional[Executor] = None
+
+# Per-event-loop semaphores enforcing _max_concurrency
+_semaphores: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+
+# Analyzers built in the executing process, keyed by factory and kwargs,
+# least recently used first
+MAX_ANALYZERS = 8
+_analyzers: 'OrderedDict[Tuple[Callable[..., Any], Tuple[Tuple[str, Any], ...]], Any]' = OrderedDict()
+_analyzers_lock = threading.Lock()
+
+
+def configure(executor: Optional[Executor] = None, max_concurrency: Optional[int] = None):
+    """
+    Set the defaults used by the ``*_async`` methods
+
+    Args:
+        executor: Executor to run analyses in (None for a shared thread pool)
+        max_concurrency: Maximum analyses in flight per event loop
+            (None for no limit)
+    """
+    global _executor, _max_concurrency
+    if max_concurrency is not None and max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+    _executor = executor
+    _max_concurrency = max_concurrency
+    _semaphores.clear()
+
+
+def _semaphore(loop: asyncio.AbstractEventLoop) -> Optional[asyncio.Semaphore]:
+    if _max_concurrency is None:
+        return None
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(_max_concurrency)
+    return semaphore
+
+
+def _call(factory: Callable[..., Any], kwargs: Tuple[Tuple[str, Any], ...],
+          method: str, args: Tuple[Any, ...]) -> Any:
+    """Run an analyzer method in the executor, reusing a recently built analyzer"""
+    key = (factory, kwargs)
+    with _analyzers_lock:
+        analyzer = _analyzers.get(key)
+        if analyzer is not None:
+            _analyzers.move_to_end(key)
+    if analyzer is None:
+        analyzer = factory(**dict(kwargs))
+        with _analyzers_lock:
+            analyzer = _analyzers.setdefault(key, analyzer)
+            while len(_analyzers) > MAX_ANALYZERS:
+                _analyzers.popitem(last=False)
+    return getattr(analyzer, method)(*args)
+
+
+async def run_analysis(
+    factory: Callable[..., Any],
+    kwargs: Dict[str, Any],
+    method: str,
+    *args: Any,
+    executor: Optional[Executor] = None,
+    analyzer: Any = None
+) -> Any:
+    """
+    Await an analyzer method run in an executor
+
+    Args:
+        factory: Picklable callable building the analyzer (usually its class)
+        kwargs: Keyword arguments for ``factory``
+        method: Name of the analyzer method to call
+        *args: Arguments for the method
+        executor: Executor overriding the configured default
+        analyzer: The analyzer itself, called directly by a thread pool
+            instead of one built from ``factory`` and ``kwargs``
+
+    Returns:
+        The method's result
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphore(loop)
+    if semaphore is not None:
+        await semaphore.acquire()
+
+    try:
+        executor = executor or _executor or _default_executor()
+        if analyzer is not None and isinstance(executor, ThreadPoolExecutor):
+            future = executor.submit(getattr(analyzer, method), *args)
+        else:
+            future = executor.submit(_call, factory, tuple(sorted(kwargs.items())), method, args)
+    except BaseException:
+        if semaphore is not None:
+            semaphore.release()
+        raise
+
+    if semaphore is not None:
+        # Free the slot when the work really ends (or is dropped before
+        # starting), not as soon as the awaiting task is cancelled
+        future.add_done_callback(lambda _: _release(loop, semaphore))
+    return await asyncio.wrap_future(future, loop=loop)
+
+
+def _release(loop: asyncio.AbstractEventLoop, semaphore: asyncio.Semaphore):
+    """Release a loop's semaphore from any thread"""
+    try:
+        loop.call_soon_threadsafe(semaphore.release)
+    except RuntimeError:
+        pass  # Loop already closed
+
+
+def _default_executor() -> Executor:
+    """Thread pool used when no executor is configured"""
+    global _fallback_executor
+    if _fallback_executor is None:
+        _fallback_executor = ThreadPoolExecutor(thread_name_prefix='welsh-winters')
+    return _fallback_executor
@@ -2,33 +2,141 @@
 Core analyzer for Welsh-Winters Balance calculation
 """
 
-import re
-from typing import Dict, List, Tuple, Optional
+from collections import deque
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Tuple, Optional, Union
 from .patterns import TechnicalPatterns, EmotionalPatterns
 from .metrics import calculate_balance, phase_detector
+from .matcher import get_matcher
+from .parallel import imap_ordered
+from .bounded import DEFAULT_SCAN_RATE, char_budget, sample_counts
+from .records import TextScore, TurnBalance
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+    from .cache import ResultCache
+    from .table import TurnTable
 
 
 class BalanceAnalyzer:
     """Analyzes text to calculate Welsh-Winters Balance score"""
     
-    def __init__(self):
+    def __init__(self, backend: str = 'regex', cache: Optional['ResultCache'] = None):
+        """
+        Initialize the analyzer
+        
+        Args:
+            backend: Pattern matcher backend, 'regex' or 'automaton'
+            cache: Optional ResultCache reused for repeated texts; may be
+                shared between analyzers
+        """
+        self.backend = backend
+        self.cache = cache
         self.technical_patterns = TechnicalPatterns.get_patterns()
         self.emotional_patterns = EmotionalPatterns.get_patterns()
+        self.matcher = get_matcher({
+            'technical': self.technical_patterns,
+            'emotional': self.emotional_patterns
+        }, backend)
+        # Characters per second of bounded scans, converting deadlines to budgets
+        self.scan_rate = DEFAULT_SCAN_RATE
         
-    def analyze_text(self, text: str) -> float:
+    def analyze_text(self, text: str, max_chars: Optional[int] = None,
+                     deadline: Optional[float] = None) -> float:
         """
         Analyze text and return Welsh-Winters Balance score
         
         Args:
             text: Input text to analyze
+            max_chars: Score texts longer than this from an evenly spaced
+                sample of at most this many characters
+            deadline: Seconds the scoring may take; longer texts are scored
+                from a sample, as for max_chars
+            
+        Returns:
+            Balance score between 0.0 and 1.0 (approximate when sampled;
+            see score_text)
+        """
+        if max_chars is not None or deadline is not None:
+            return self.score_text(text, max_chars, deadline).balance
+        
+        counts = self.matcher.totals(self._scan_counts(text))
+        
+        return calculate_balance(counts['technical'], counts['emotional'])
+    
+    def score_text(self, text: str, max_chars: Optional[int] = None,
+                   deadline: Optional[float] = None) -> TextScore:
+        """
+        Score text within a character or time budget
+        
+        Texts within the budget are scanned in full.  Longer texts are
+        scored from evenly spaced windows and their counts extrapolated to
+        the whole text; see bounded.py.
+        
+        Args:
+            text: Input text to analyze
+            max_chars: Most characters to scan
+            deadline: Seconds the scan may take, converted to characters at
+                the analyzer's measured scan rate; no window is started
+                after it has passed
+            
+        Returns:
+            TextScore with the balance, technical and emotional counts
+            (extrapolated when sampled), whether the result is approximate,
+            and the characters scanned out of the total
+        """
+        budget = char_budget(max_chars, deadline, self.scan_rate)
+        if budget is None or len(text) <= budget:
+            counts = self.matcher.totals(self._scan_counts(text))
+            return TextScore(calculate_balance(counts['technical'], counts['emotional']),
+                             counts['technical'], counts['emotional'], False, len(text), len(text))
+        
+        scaled, scanned, elapsed = sample_counts(self.matcher, text, budget, deadline)
+        if elapsed > 0:
+            self.scan_rate = (self.scan_rate + scanned / elapsed) / 2
+        counts = self.matcher.totals(scaled)
+        return TextScore(calculate_balance(counts['technical'], counts['emotional']),
+                         round(counts['technical']), round(counts['emotional']),
+                         True, scanned, len(text))
+    
+    async def analyze_text_async(self, text: str, executor: Optional['Executor'] = None,
+                                 max_chars: Optional[int] = None,
+                                 deadline: Optional[float] = None) -> float:
+        """
+        Awaitable analyze_text that scores the text in an executor
+        
+        Args:
+            text: Input text to analyze
+            executor: Executor overriding the one set with aio.configure()
+            max_chars: Character budget, as for analyze_text
+            deadline: Time budget, as for analyze_text; it starts when the
+                executor picks the text up
             
         Returns:
             Balance score between 0.0 and 1.0
         """
-        technical_count = self._count_patterns(text, self.technical_patterns)
-        emotional_count = self._count_patterns(text, self.emotional_patterns)
+        from .aio import run_analysis
+        return await run_analysis(type(self), self._factory_kwargs(), 'analyze_text',
+                                  text, max_chars, deadline, executor=executor, analyzer=self)
+    
+    async def score_text_async(self, text: str, executor: Optional['Executor'] = None,
+                               max_chars: Optional[int] = None,
+                               deadline: Optional[float] = None) -> TextScore:
+        """
+        Awaitable score_text that scores the text in an executor
         
-        return calculate_balance(technical_count, emotional_count)
+        Args:
+            text: Input text to analyze
+            executor: Executor overriding the one set with aio.configure()
+            max_chars: Character budget, as for score_text
+            deadline: Time budget, as for score_text; it starts when the
+                executor picks the text up
+            
+        Returns:
+            TextScore, as returned by score_text
+        """
+        from .aio import run_analysis
+        return await run_analysis(type(self), self._factory_kwargs(), 'score_text',
+                                  text, max_chars, deadline, executor=executor, analyzer=self)
     
     def detect_phase(self, balance: float) -> str:
         """
@@ -63,17 +171,18 @@ class BalanceAnalyzer:
         
         for i, message in enumerate(messages):
             text = message.get('content', '')
-            technical = self._count_patterns(text, self.technical_patterns)
-            emotional = self._count_patterns(text, self.emotional_patterns)
+            counts = self.matcher.totals(self._scan_counts(text))
+            technical = counts['technical']
+            emotional = counts['emotional']
             balance = calculate_balance(technical, emotional)
             
-            results['turn_balances'].append({
-                'turn': i + 1,
-                'role': message.get('role', 'unknown'),
-                'balance': balance,
-                'technical': technical,
-                'emotional': emotional
-            })
+            results['turn_balances'].append(TurnBalance(
+                turn=i + 1,
+                role=message.get('role', 'unknown'),
+                balance=balance,
+                technical=technical,
+                emotional=emotional
+            ))
             
             results['technical_count'] += technical
             results['emotional_count'] += emotional
@@ -85,21 +194,92 @@ class BalanceAnalyzer:
         
         return results
     
+    async def analyze_conversation_async(
+        self,
+        messages: List[Dict[str, str]],
+        executor: Optional['Executor'] = None
+    ) -> Dict[str, any]:
+        """
+        Awaitable analyze_conversation that scores the messages in an executor
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            executor: Executor overriding the one set with aio.configure()
+            
+        Returns:
+            Dictionary with analysis results, as from analyze_conversation
+        """
+        from .aio import run_analysis
+        return await run_analysis(type(self), self._factory_kwargs(), 'analyze_conversation',
+                                  messages, executor=executor, analyzer=self)
+    
+    def analyze_many(
+        self,
+        items: Iterable[Union[str, List[Dict[str, str]], Dict[str, Any]]],
+        workers: Optional[int] = None,
+        chunksize: int = 64
+    ) -> Iterator[Union[float, Dict[str, any]]]:
+        """
+        Analyze many texts or conversations across a process pool
+        
+        Each worker compiles the pattern sets once when the pool starts.
+        Results are streamed in input order and the input is consumed
+        lazily, so it can be a generator over an arbitrarily large archive.
+        
+        Args:
+            items: Texts (scored with analyze_text), message lists, or
+                conversation dicts with a 'messages' key (scored with
+                analyze_conversation)
+            workers: Number of worker processes (None for all cores,
+                1 to run in the current process)
+            chunksize: Number of items handed to a worker at a time
+            
+        Returns:
+            Iterator over the results, in input order
+        """
+        return imap_ordered(type(self), self._factory_kwargs(), '_analyze_item',
+                            items, workers=workers, chunksize=chunksize)
+    
+    def analyze_table(
+        self,
+        conversations: Iterable[Union[List[Dict[str, str]], Dict[str, Any]]],
+        workers: Optional[int] = None,
+        chunksize: int = 64
+    ) -> 'TurnTable':
+        """
+        Analyze many conversations into a columnar TurnTable
+        
+        Args:
+            conversations: Message lists or conversation dicts with a
+                'messages' key (and optionally an 'id')
+            workers: Number of worker processes, as for analyze_many
+            chunksize: Number of conversations handed to a worker at a time
+            
+        Returns:
+            TurnTable with BASIC_COLUMNS, one row per message
+        """
+        from .table import BASIC_COLUMNS, TurnTable, track_ids
+        table = TurnTable(BASIC_COLUMNS)
+        ids = deque()
+        results = self.analyze_many(track_ids(conversations, ids), workers=workers, chunksize=chunksize)
+        for result in results:
+            table.add_conversation(result['turn_balances'], ids.popleft())
+        return table
+    
+    def _analyze_item(self, item: Union[str, List[Dict[str, str]], Dict[str, Any]]):
+        """Dispatch one analyze_many item to the matching analysis"""
+        if isinstance(item, str):
+            return self.analyze_text(item)
+        if isinstance(item, dict):
+            return self.analyze_conversation(item.get('messages', []))
+        return self.analyze_conversation(item)
+    
     def _count_patterns(self, text: str, patterns: List[str]) -> int:
         """Count occurrences of patterns in text"""
         if not text:
             return 0
             
-        count = 0
-        for pattern in patterns:
-            try:
-                matches = re.findall(pattern, text, re.IGNORECASE)
-                count += len(matches)
-            except re.error:
-                # Skip invalid regex patterns
-                continue
-                
-        return count
+        return get_matcher({'patterns': patterns}, self.backend).count(text)['patterns']
     
     def get_pattern_breakdown(self, text: str) -> Dict[str, Dict[str, int]]:
         """
@@ -111,27 +291,14 @@ class BalanceAnalyzer:
         Returns:
             Dictionary with pattern counts for both technical and emotional
         """
-        breakdown = {
-            'technical': {},
-            'emotional': {}
-        }
-        
-        # Technical patterns breakdown
-        for pattern in self.technical_patterns:
-            try:
-                count = len(re.findall(pattern, text, re.IGNORECASE))
-                if count > 0:
-                    breakdown['technical'][pattern] = count
-            except re.error:
-                continue
-        
-        # Emotional patterns breakdown  
-        for pattern in self.emotional_patterns:
-            try:
-                count = len(re.findall(pattern, text, re.IGNORECASE))
-                if count > 0:
-                    breakdown['emotional'][pattern] = count
-            except re.error:
-                continue
-                
-        return breakdown
\ No newline at end of file
+        return self.matcher.breakdown_counts(self._scan_counts(text))
+    
+    def _scan_counts(self, text: str) -> List[int]:
+        """Per-pattern counts of a text, from the cache when one is set"""
+        if self.cache is not None:
+            return self.cache.scan_counts(self.matcher, text)
+        return self.matcher.scan(text)[0]
+    
+    def _factory_kwargs(self) -> Dict[str, Any]:
+        """Arguments rebuilding this analyzer in a worker or executor"""
+        return {'backend': self.backend, 'cache': self.cache}
@@ -0,0 +1,161 @@
+"""
+Precompiled pattern artifact for fast analyzer construction
+
+Building a PatternMatcher compiles every regex of its pattern set and
+indexes the literal prefixes (or loads the keyword automaton), and every
+process pays that again: each CLI run, each pool worker.  build_artifact()
+does the work once and writes the matchers of the built-in analyzers to a
+file; get_matcher() then loads a pattern set found there instead of
+compiling it.  Loaded matchers compile a regex only when a scan first needs
+it, and never for the whole-word literals matched by lookup.
+
+The artifact records a digest of ``patterns.py``, ``matcher.py`` and
+``automaton.py`` (plus the Python version) and is ignored as soon as any of
+them changes.  Pattern sets defined elsewhere, such as the extra
+ComprehensiveAnalyzer categories, are additionally keyed by their full
+pattern lists, so an edited set is never served from a stale artifact.
+
+By default the artifact lives in the user cache directory under a name
+containing the digest; set ``WELSH_WINTERS_ARTIFACT`` to use another path,
+or to an empty string to disable loading.  The file is a pickle: only
+point the variable at artifacts you built yourself.
+
+Example:
+    $ welsh-winters build-artifact
+    >>> BalanceAnalyzer()  # loads the prebuilt matcher
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+from typing import Dict, Iterable, List, Optional
+
+from .matcher import BACKENDS, PatternMatcher, matcher_key
+
+
+ARTIFACT_FORMAT = 1
+
+ARTIFACT_ENV = 'WELSH_WINTERS_ARTIFACT'
+
+# Modules whose source determines the pattern sets and compiled structures
+SOURCE_MODULES = ('patterns.py', 'matcher.py', 'automaton.py')
+
+
+def source_digest() -> Optional[str]:
+    """
+    Digest of the sources an artifact is built from
+
+    Returns:
+        Hex digest, or None when the sources cannot be read (e.g. the
+        package was installed without its .py files)
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f'{ARTIFACT_FORMAT}:{sys.implementation.cache_tag}'.encode('utf-8'))
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in SOURCE_MODULES:
+        try:
+            with open(os.path.join(package_dir, name), 'rb') as f:
+                digest.update(f.read())
+        except OSError:
+            return None
+    return digest.hexdigest()
+
+
+def default_path(digest: Optional[str] = None) -> Optional[str]:
+    """
+    Artifact location for the current sources
+
+    Args:
+        digest: Source digest, computed if omitted
+
+    Returns:
+        ``WELSH_WINTERS_ARTIFACT`` when set (None if it is empty), otherwise
+        a per-digest file in the user cache directory
+    """
+    configured = os.environ.get(ARTIFACT_ENV)
+    if configured is not None:
+        return configured or None
+    digest = digest or source_digest()
+    if digest is None:
+        return None
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'welsh-winters', f'matchers-{digest}.pickle')
+
+
+def analyzer_matchers(backends: Iterable[str] = BACKENDS) -> List[PatternMatcher]:
+    """Matchers of the built-in analyzers (ConsciousnessEngine uses BalanceAnalyzer's)"""
+    from .analyzer import BalanceAnalyzer
+    from .comprehensive_analyzer import ComprehensiveAnalyzer
+    return [factory(backend=backend).matcher
+            for backend in backends
+            for factory in (BalanceAnalyzer, ComprehensiveAnalyzer)]
+
+
+def build_artifact(path: Optional[str] = None,
+                   matchers: Optional[Iterable[PatternMatcher]] = None) -> str:
+    """
+    Compile pattern sets and write them as an artifact
+
+    Args:
+        path: Output file (defaults to default_path())
+        matchers: Matchers to store (defaults to analyzer_matchers())
+
+    Returns:
+        Path of the written artifact
+    """
+    digest = source_digest()
+    if digest is None:
+        raise RuntimeError("Pattern sources are not readable; cannot build an artifact")
+    path = path or default_path(digest)
+    if path is None:
+        raise ValueError(f"No artifact path given and {ARTIFACT_ENV} is empty")
+    if matchers is None:
+        matchers = analyzer_matchers()
+
+    payload = {
+        'format': ARTIFACT_FORMAT,
+        'digest': digest,
+        # Pickled one by one so loading only unpickles the sets in use
+        'matchers': {
+            (matcher_key(matcher.categories), matcher.backend):
+                pickle.dumps(matcher, protocol=pickle.HIGHEST_PROTOCOL)
+            for matcher in matchers
+        }
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    # Write then rename, so concurrent readers never see a partial file
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as f:
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary, path)
+    return path
+
+
+def load_artifact(path: Optional[str] = None) -> Dict[tuple, bytes]:
+    """
+    Read the pickled matchers of an artifact built for the current sources
+
+    Args:
+        path: Artifact file (defaults to default_path())
+
+    Returns:
+        Mapping of (matcher_key, backend) to a pickled PatternMatcher; empty
+        when the artifact is missing, unreadable or built from other sources
+    """
+    digest = source_digest()
+    if digest is None:
+        return {}
+    path = path or default_path(digest)
+    if path is None or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'rb') as f:
+            payload = pickle.load(f)
+    except Exception:  # Truncated or foreign file: compile from source instead
+        return {}
+    if not isinstance(payload, dict) or payload.get('format') != ARTIFACT_FORMAT \
+            or payload.get('digest') != digest:
+        return {}
+    return payload['matchers']
@@ -0,0 +1,124 @@
+"""
+Keyword automaton for literal word patterns
+
+An Aho-Corasick automaton whose alphabet is text tokens rather than single
+characters.  Text is split into maximal runs of word characters and of
+non-word characters; a pattern of the form ``\\bliteral\\b`` matches exactly
+where its own token sequence appears as consecutive tokens, so word
+boundaries are checked by construction and the scan costs one dictionary
+step per token however many keywords are loaded.
+"""
+
+import re
+from collections import deque
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+
+# Group 1 is set for word-character runs
+TOKEN_RE = re.compile(r'(\w+)|\W+')
+
+_LITERAL_METACHARS = set('.^$*+?{}[]|()')
+
+
+def parse_literal(pattern: str) -> Optional[str]:
+    """
+    Extract the literal text of a pure word-literal pattern
+
+    Args:
+        pattern: Regular expression source such as ``\\bthank you\\b``
+
+    Returns:
+        The literal (``thank you``) or None if the pattern is a genuine regex
+        or contains non-ASCII characters
+    """
+    if not (pattern.startswith(r'\b') and pattern.endswith(r'\b')) or len(pattern) <= 4:
+        return None
+
+    body = pattern[2:-2]
+    literal = []
+    pos = 0
+    while pos < len(body):
+        char = body[pos]
+        if char == '\\':
+            if pos + 1 >= len(body):
+                return None
+            escaped = body[pos + 1]
+            if escaped.isalnum() or escaped == '_':
+                return None  # \s, \d, \b ... are classes or assertions
+            literal.append(escaped)
+            pos += 2
+            continue
+        if char in _LITERAL_METACHARS:
+            return None
+        literal.append(char)
+        pos += 1
+
+    text = ''.join(literal)
+    if not text.isascii():
+        return None
+    return text
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into maximal word and non-word runs"""
+    return [match.group() for match in TOKEN_RE.finditer(text)]
+
+
+class KeywordAutomaton:
+    """
+    Multi-keyword automaton over token sequences
+
+    Keywords are added as token tuples (already case-folded) and the
+    automaton reports, for each input token, the keywords ending there.
+    """
+
+    def __init__(self):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.outputs: List[List[Tuple[Hashable, int]]] = [[]]
+        self._built = False
+
+    def add(self, tokens: Sequence[str], value: Hashable):
+        """
+        Add a keyword
+
+        Args:
+            tokens: Token sequence of the keyword
+            value: Value reported when the keyword is found
+        """
+        if self._built:
+            raise RuntimeError("Cannot add keywords after build()")
+
+        state = 0
+        for token in tokens:
+            next_state = self.goto[state].get(token)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][token] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+            state = next_state
+        self.outputs[state].append((value, len(tokens)))
+
+    def build(self):
+        """Compute failure links and merge outputs along them"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and token not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(token, 0)
+                self.fail[child] = target if target != child else 0
+                self.outputs[child] = self.outputs[child] + self.outputs[self.fail[child]]
+        self._built = True
+
+    def step(self, state: int, token: str) -> int:
+        """Advance the automaton by one token"""
+        goto = self.goto
+        while state and token not in goto[state]:
+            state = self.fail[state]
+        return goto[state].get(token, 0)
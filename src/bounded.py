@@ -0,0 +1,174 @@
+"""
+Bounded scoring of very long texts
+
+A scan takes time proportional to the text, so a multi-megabyte paste blows
+any per-message latency budget.  Given a character budget (``max_chars``,
+or a ``deadline`` converted to characters at the matcher's measured scan
+rate), texts over the budget are scored from evenly spaced windows that
+together hold at most that many characters, and the pattern counts are
+scaled up by ``total chars / scanned chars``.  Windows are aligned to
+whitespace so no word is cut in two, and scanned in an order that keeps
+every prefix spread across the whole text, so a scan stopped at the
+deadline still samples all of it.  Texts within the budget are scanned in
+full as usual.
+
+Balance is a ratio of counts and so is unaffected by the scaling; the
+extrapolated counts are estimates.
+
+Example:
+    >>> score = BalanceAnalyzer().score_text(pasted_log, deadline=0.05)
+    >>> score.balance, score.approximate
+"""
+
+import re
+import time
+from typing import Any, List, Optional, Tuple
+
+
+# Characters per second assumed for a deadline until a scan has been timed
+DEFAULT_SCAN_RATE = 2_000_000
+
+# Most windows a sample is split into, and the smallest window
+SAMPLE_WINDOWS = 32
+MIN_WINDOW_CHARS = 512
+
+# Deadline left for scoring once earlier work has used up the rest; still
+# enough to scan one window
+_MIN_DEADLINE = 1e-6
+
+# Distance searched for whitespace when aligning a window edge
+_ALIGN_CHARS = 64
+
+_WHITESPACE = re.compile(r'\s')
+
+
+def char_budget(max_chars: Optional[int] = None, deadline: Optional[float] = None,
+                rate: float = DEFAULT_SCAN_RATE) -> Optional[int]:
+    """
+    Characters that can be scanned within the limits
+
+    Args:
+        max_chars: Most characters to scan
+        deadline: Seconds available for the scan
+        rate: Scan rate in characters per second
+
+    Returns:
+        The smaller of the two budgets, or None when neither is given
+    """
+    budgets = []
+    if max_chars is not None:
+        if max_chars < 1:
+            raise ValueError("max_chars must be at least 1")
+        budgets.append(max_chars)
+    if deadline is not None:
+        if deadline <= 0:
+            raise ValueError("deadline must be positive")
+        budgets.append(max(MIN_WINDOW_CHARS, int(deadline * rate)))
+    return min(budgets) if budgets else None
+
+
+def remaining_deadline(deadline: Optional[float], began: float) -> Optional[float]:
+    """
+    Part of a deadline left after the work since ``began``
+
+    Args:
+        deadline: Seconds available from ``began``, or None
+        began: time.perf_counter() reading the deadline started at
+
+    Returns:
+        Seconds left, at least a minimal positive value; None or an invalid
+        deadline is returned unchanged for char_budget to judge
+    """
+    if deadline is None or deadline <= 0:
+        return deadline
+    return max(deadline - (time.perf_counter() - began), _MIN_DEADLINE)
+
+
+def spread_order(count: int) -> List[int]:
+    """
+    Indexes ``0..count-1`` in bit-reversed order
+
+    Every prefix of the order is spread evenly over the range:
+    0, 4, 2, 6, 1, 5, 3, 7 for eight.
+    """
+    bits = max(1, (count - 1).bit_length())
+    order = []
+    for index in range(1 << bits):
+        reversed_index = int(format(index, f'0{bits}b')[::-1], 2)
+        if reversed_index < count:
+            order.append(reversed_index)
+    return order
+
+
+def _align_start(text: str, position: int) -> int:
+    """Move a window start past the next whitespace, so it begins at a word"""
+    if position <= 0:
+        return 0
+    found = _WHITESPACE.search(text, position - 1, position + _ALIGN_CHARS)
+    return found.end() if found else position
+
+
+def _align_end(text: str, position: int) -> int:
+    """Move a window end back to the last whitespace, so it ends after a word"""
+    if position >= len(text):
+        return len(text)
+    for offset in range(position, max(0, position - _ALIGN_CHARS) - 1, -1):
+        if text[offset].isspace():
+            return offset
+    return position
+
+
+def sample_windows(text: str, budget: int, windows: int = SAMPLE_WINDOWS) -> List[Tuple[int, int]]:
+    """
+    Evenly spaced windows of a text holding about ``budget`` characters
+
+    Args:
+        text: Text to sample
+        budget: Characters to cover in total
+        windows: Most windows to split the budget into
+
+    Returns:
+        (start, end) offsets, in spread order
+    """
+    count = max(1, min(windows, budget // MIN_WINDOW_CHARS))
+    size = budget // count
+    stride = len(text) / count
+    spans = []
+    for index in spread_order(count):
+        start = int(index * stride + (stride - size) / 2)
+        start, end = _align_start(text, start), _align_end(text, start + size)
+        if end > start:
+            spans.append((start, end))
+    return spans
+
+
+def sample_counts(matcher: Any, text: str, budget: int,
+                  deadline: Optional[float] = None) -> Tuple[List[float], int, float]:
+    """
+    Per-pattern counts of a text extrapolated from evenly spaced windows
+
+    Args:
+        matcher: PatternMatcher to scan windows with
+        text: Text longer than ``budget``
+        budget: Characters to scan at most
+        deadline: Seconds after which no further window is started; at
+            least one window is always scanned
+
+    Returns:
+        Tuple of (per-entry counts scaled to the whole text, characters
+        scanned, seconds spent scanning)
+    """
+    clock = time.perf_counter
+    began = clock()
+    totals = [0] * len(matcher)
+    scanned = 0
+    for start, end in sample_windows(text, budget):
+        if scanned and deadline is not None and clock() - began >= deadline:
+            break
+        counts, _ = matcher.scan(text[start:end])
+        for index, count in enumerate(counts):
+            if count:
+                totals[index] += count
+        scanned += end - start
+    scale = len(text) / scanned if scanned else 0.0
+    return [count * scale for count in totals], scanned, clock() - began
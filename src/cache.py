@@ -0,0 +1,137 @@
+"""
+Bounded cache of pattern scan results
+
+Production traffic repeats itself (greetings, templated replies), so the
+per-pattern counts of a text are worth keeping.  Entries are keyed by a
+BLAKE2b digest of the text together with the matcher's pattern-set
+fingerprint, so the text itself is never stored and a changed pattern set
+can never be served stale counts.  Only the non-zero counts are kept, as
+(entry index, count) pairs, and the least recently used entries are
+evicted once either the entry or the byte limit is exceeded.
+"""
+
+import hashlib
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+from .matcher import PatternMatcher
+
+
+# Approximate bytes taken by a key and its OrderedDict slot
+_ENTRY_OVERHEAD = 200
+
+
+def text_digest(text: str) -> bytes:
+    """Fast 128-bit digest of a text"""
+    return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+
+class ResultCache:
+    """
+    LRU cache of per-pattern scan counts, safe to share between threads
+
+    Example:
+        >>> analyzer = BalanceAnalyzer(cache=ResultCache(max_entries=10000))
+        >>> analyzer.analyze_text('Hello!')
+        0.5
+        >>> analyzer.cache.stats()['misses']
+        1
+    """
+
+    def __init__(self, max_entries: int = 65536, max_bytes: int = 32 << 20):
+        """
+        Initialize an empty cache
+
+        Args:
+            max_entries: Maximum number of cached texts
+            max_bytes: Approximate memory budget for the cached results
+        """
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("Cache limits must be positive")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[Tuple[str, bytes], Tuple[array, int, int]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __reduce__(self):
+        # Worker processes get an empty cache with the same limits
+        return type(self), (self.max_entries, self.max_bytes)
+
+    def scan_counts(self, matcher: PatternMatcher, text: str) -> List[int]:
+        """
+        Per-entry match counts of a text, as from ``matcher.scan(text)[0]``
+
+        Args:
+            matcher: Matcher whose patterns to count
+            text: Text to scan
+
+        Returns:
+            List of match counts, one per matcher entry
+        """
+        key = (matcher.fingerprint, text_digest(text))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if entry is not None:
+            pairs, size, _ = entry
+            counts = [0] * size
+            for position in range(0, len(pairs), 2):
+                counts[pairs[position]] = pairs[position + 1]
+            return counts
+
+        counts, _ = matcher.scan(text)
+        pairs = array('l')
+        for index, count in enumerate(counts):
+            if count:
+                pairs.append(index)
+                pairs.append(count)
+        self._store(key, (pairs, len(counts)), sys.getsizeof(pairs) + _ENTRY_OVERHEAD)
+        return counts
+
+    def _store(self, key: Tuple[str, bytes], entry: Tuple[array, int], size: int):
+        with self._lock:
+            self.misses += 1
+            if key in self._entries or size > self.max_bytes:
+                return
+            self._entries[key] = entry + (size,)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry and reset the statistics"""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Cache statistics
+
+        Returns:
+            Dictionary with hits, misses, hit_rate, evictions, entries and bytes
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self.bytes
+            }
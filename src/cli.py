@@ -0,0 +1,396 @@
+"""
+Command line interface for the Welsh-Winters Balance Framework
+
+Usage:
+    welsh-winters analyze archive.jsonl -o results.jsonl --jobs 8
+    cat archive.jsonl | welsh-winters analyze --analyzer comprehensive
+    welsh-winters build-artifact
+    welsh-winters lint-patterns --analyzer comprehensive --sample archive.jsonl
+    welsh-winters shard archive.jsonl -n 4 -d shards/
+    welsh-winters map shards/shard-0000-of-0004.jsonl -o part-0.jsonl
+    welsh-winters reduce part-*.jsonl -o report.json
+    welsh-winters report archive.jsonl -o report.json
+    welsh-winters sample archive.jsonl --precision 0.01 --stratify domain
+"""
+
+import argparse
+import importlib
+import io
+import json
+import sys
+from collections import deque
+from typing import Any, Dict, List, Optional, TextIO
+
+from .corpus import iter_conversations
+from .matcher import BACKENDS
+from .records import json_default
+
+
+# Analyzer classes by name, as (module, class) so only the chosen one is imported
+ANALYZERS = {
+    'basic': ('analyzer', 'BalanceAnalyzer'),
+    'comprehensive': ('comprehensive_analyzer', 'ComprehensiveAnalyzer'),
+}
+
+
+def load_analyzer(name: str):
+    """Import and return the analyzer class registered under ``name``"""
+    module_name, class_name = ANALYZERS[name]
+    return getattr(importlib.import_module(f'.{module_name}', __package__), class_name)
+
+
+def _open_input(path: str) -> TextIO:
+    if path == '-':
+        return io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def _open_output(path: str) -> TextIO:
+    if path == '-':
+        return sys.stdout
+    return open(path, 'w', encoding='utf-8')
+
+
+def _analyzer_options(args: argparse.Namespace) -> Dict[str, Any]:
+    """Analyzer keyword arguments from --backend and --turn-cache"""
+    options = {'backend': args.backend}
+    if args.turn_cache:
+        from .store import TurnCache
+        options['turn_cache'] = TurnCache(args.turn_cache)
+    return options
+
+
+def analyze_command(args: argparse.Namespace) -> int:
+    """Score every conversation of an archive and write JSONL results"""
+    options = _analyzer_options(args)
+    analyzer = load_analyzer(args.analyzer)(**options)
+    workers = args.jobs if args.jobs > 0 else None
+    profiler = None
+    if args.profile:
+        # Workers are this process (--jobs 1), and share the analyzer's matcher
+        from .profiler import PatternProfiler
+        profiler = PatternProfiler()
+        profiler.attach(analyzer)
+
+    from .table import track_ids
+    source = _open_input(args.input)
+    output = _open_output(args.output)
+    try:
+        # Ids of conversations in flight; results come back in input order
+        ids = deque()
+        conversations = track_ids(iter_conversations(source), ids)
+        results = analyzer.analyze_many(conversations, workers=workers, chunksize=args.chunksize)
+        for result in results:
+            record = {'id': ids.popleft()}
+            record.update(result)
+            output.write(json.dumps(record, default=json_default) + '\n')
+            if args.flush:
+                output.flush()
+    finally:
+        if args.input != '-':
+            source.close()
+        if args.output != '-':
+            output.close()
+        else:
+            output.flush()
+        if args.turn_cache:
+            options['turn_cache'].close()
+        if profiler is not None:
+            profiler.detach(analyzer)
+            print(profiler.format_report(top=args.profile), file=sys.stderr)
+    return 0
+
+
+def build_artifact_command(args: argparse.Namespace) -> int:
+    """Precompile the analyzers' pattern sets into an artifact file"""
+    from .artifact import build_artifact
+    path = build_artifact(args.output)
+    print(f"Wrote {path}")
+    return 0
+
+
+def lint_command(args: argparse.Namespace) -> int:
+    """Report dead, costly and overlapping patterns of an analyzer"""
+    from .lint import format_lint, lint_patterns
+    matcher = load_analyzer(args.analyzer)(backend=args.backend).matcher
+    samples = None
+    if args.sample:
+        with _open_input(args.sample) as source:
+            samples = [message.get('content', '')
+                       for conversation in iter_conversations(source)
+                       for message in conversation['messages']]
+    report = lint_patterns(matcher.categories, samples, args.backend)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print(format_lint(report))
+    return 0
+
+
+def shard_command(args: argparse.Namespace) -> int:
+    """Partition an archive into shard files by conversation id"""
+    from .shard import shard_archive
+    with _open_input(args.input) as source:
+        paths = shard_archive(iter_conversations(source), args.directory, args.shards)
+    for path in paths:
+        print(path)
+    return 0
+
+
+def map_command(args: argparse.Namespace) -> int:
+    """Analyze one shard into a partial-results file"""
+    from .shard import map_shard
+    options = _analyzer_options(args)
+    analyzer = load_analyzer('comprehensive')(**options)
+    workers = args.jobs if args.jobs > 0 else None
+    source = _open_input(args.input)
+    output = _open_output(args.output)
+    try:
+        map_shard(analyzer, source, output, workers=workers, chunksize=args.chunksize)
+    finally:
+        if args.input != '-':
+            source.close()
+        if args.output != '-':
+            output.close()
+        else:
+            output.flush()
+        if args.turn_cache:
+            options['turn_cache'].close()
+    return 0
+
+
+def _write_report(report: Dict[str, Any], path: str):
+    output = _open_output(path)
+    try:
+        output.write(json.dumps(report, indent=2) + '\n')
+    finally:
+        if path != '-':
+            output.close()
+        else:
+            output.flush()
+
+
+def reduce_command(args: argparse.Namespace) -> int:
+    """Merge the partial results of every shard into the corpus report"""
+    from .shard import reduce_partials
+    _write_report(reduce_partials(args.partials), args.output)
+    return 0
+
+
+def report_command(args: argparse.Namespace) -> int:
+    """Write the corpus report of a whole archive"""
+    from .shard import report_archive
+    options = _analyzer_options(args)
+    analyzer = load_analyzer('comprehensive')(**options)
+    workers = args.jobs if args.jobs > 0 else None
+    try:
+        with _open_input(args.input) as source:
+            report = report_archive(analyzer, iter_conversations(source),
+                                    workers=workers, chunksize=args.chunksize)
+    finally:
+        if args.turn_cache:
+            options['turn_cache'].close()
+    _write_report(report, args.output)
+    return 0
+
+
+def sample_command(args: argparse.Namespace) -> int:
+    """Estimate corpus metrics from a sample of an archive"""
+    from .sampling import estimate_corpus
+    options = _analyzer_options(args)
+    analyzer = load_analyzer('comprehensive')(**options)
+    workers = args.jobs if args.jobs > 0 else None
+    try:
+        with _open_input(args.input) as source:
+            result = estimate_corpus(
+                analyzer, iter_conversations(source), precision=args.precision,
+                confidence=args.confidence, max_sample=args.max_sample, min_sample=args.min_sample,
+                stratify=args.stratify, resamples=args.resamples, seed=args.seed,
+                workers=workers, chunksize=args.chunksize
+            )
+    finally:
+        if args.turn_cache:
+            options['turn_cache'].close()
+    _write_report(result, args.output)
+    return 0
+
+
+def _add_analysis_options(parser: argparse.ArgumentParser):
+    """Options shared by the commands that run the comprehensive analyzer"""
+    parser.add_argument('--backend', choices=BACKENDS, default='regex',
+                        help='Pattern matcher backend (default: regex)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Worker processes, 0 for all cores (default: 1)')
+    parser.add_argument('--chunksize', type=int, default=16,
+                        help='Conversations sent to a worker at a time (default: 16)')
+    parser.add_argument('--turn-cache', metavar='PATH',
+                        help='SQLite file caching per-turn results across runs')
+    parser.set_defaults(analyzer='comprehensive')
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='welsh-winters',
+        description='Welsh-Winters Balance analysis for conversation archives'
+    )
+    subparsers = parser.add_subparsers(dest='command')
+
+    analyze = subparsers.add_parser(
+        'analyze',
+        help='Score a JSONL/JSON conversation archive',
+        description='Stream conversations from a JSONL (one conversation per line) '
+                    'or JSON archive and write one JSON result per line.'
+    )
+    analyze.add_argument('input', nargs='?', default='-',
+                         help="Archive path, or '-' for stdin (default)")
+    analyze.add_argument('-o', '--output', default='-',
+                         help="Output JSONL path, or '-' for stdout (default)")
+    analyze.add_argument('--analyzer', choices=sorted(ANALYZERS), default='basic',
+                         help='Analyzer to score conversations with (default: basic)')
+    analyze.add_argument('--backend', choices=BACKENDS, default='regex',
+                         help='Pattern matcher backend (default: regex)')
+    analyze.add_argument('-j', '--jobs', type=int, default=1,
+                         help='Worker processes, 0 for all cores (default: 1)')
+    analyze.add_argument('--chunksize', type=int, default=16,
+                         help='Conversations sent to a worker at a time (default: 16)')
+    analyze.add_argument('--turn-cache', metavar='PATH',
+                         help='SQLite file caching per-turn results across runs '
+                              '(comprehensive analyzer only)')
+    analyze.add_argument('--profile', metavar='N', type=int, nargs='?', const=20,
+                         help='Print the N most expensive patterns (default 20) and '
+                              'never-matched patterns to stderr (requires --jobs 1)')
+    analyze.add_argument('--no-flush', dest='flush', action='store_false',
+                         help='Do not flush the output after every result')
+    analyze.set_defaults(handler=analyze_command)
+
+    artifact = subparsers.add_parser(
+        'build-artifact',
+        help='Precompile pattern sets for fast analyzer construction',
+        description='Compile the pattern sets of every analyzer and backend into a file '
+                    'that analyzers load instead of compiling.  The artifact is ignored '
+                    'once the pattern or matcher sources change.'
+    )
+    artifact.add_argument('-o', '--output',
+                          help='Artifact path (default: $WELSH_WINTERS_ARTIFACT, or the '
+                               'user cache directory); analyzers only find other paths '
+                               'through WELSH_WINTERS_ARTIFACT')
+    artifact.set_defaults(handler=build_artifact_command)
+
+    lint = subparsers.add_parser(
+        'lint-patterns',
+        help="Report dead, costly and overlapping patterns of an analyzer",
+        description='Inspect the pattern set of an analyzer: patterns that cannot match '
+                    'where intended, backtrack, or duplicate one another, how the matcher '
+                    'runs each pattern, and the optimized set it compiles.'
+    )
+    lint.add_argument('--analyzer', choices=sorted(ANALYZERS), default='basic',
+                      help='Analyzer whose patterns are inspected (default: basic)')
+    lint.add_argument('--backend', choices=BACKENDS, default='regex',
+                      help='Pattern matcher backend (default: regex)')
+    lint.add_argument('--sample', metavar='ARCHIVE',
+                      help="Archive whose messages are scanned to time each pattern ('-' for stdin)")
+    lint.add_argument('--json', action='store_true',
+                      help='Print the report, including the optimized pattern set, as JSON')
+    lint.set_defaults(handler=lint_command)
+
+    shard = subparsers.add_parser(
+        'shard',
+        help='Partition an archive into shards for map/reduce corpus reports',
+        description='Split a JSONL/JSON archive into N shard files by a stable hash of '
+                    'each conversation id.  Each shard can be analyzed with `map` as a '
+                    'separate job, and the partial results combined with `reduce`.'
+    )
+    shard.add_argument('input', nargs='?', default='-',
+                       help="Archive path, or '-' for stdin (default)")
+    shard.add_argument('-n', '--shards', type=int, required=True,
+                       help='Number of shards')
+    shard.add_argument('-d', '--directory', default='.',
+                       help='Directory the shard files are written to (default: .)')
+    shard.set_defaults(handler=shard_command)
+
+    map_parser = subparsers.add_parser(
+        'map',
+        help='Analyze one shard into a partial-results file',
+        description='Analyze the conversations of one shard file with the comprehensive '
+                    'analyzer and write their compact summaries for `reduce`.'
+    )
+    map_parser.add_argument('input', help="Shard file written by `shard`, or '-' for stdin")
+    map_parser.add_argument('-o', '--output', default='-',
+                            help="Partial-results path, or '-' for stdout (default)")
+    _add_analysis_options(map_parser)
+    map_parser.set_defaults(handler=map_command)
+
+    reduce_parser = subparsers.add_parser(
+        'reduce',
+        help='Merge partial results into the corpus report',
+        description='Combine the partial-results files of every shard into the corpus '
+                    'report, identical to `report` over the whole archive.'
+    )
+    reduce_parser.add_argument('partials', nargs='+', help='Partial-results files, one per shard')
+    reduce_parser.add_argument('-o', '--output', default='-',
+                               help="Report path, or '-' for stdout (default)")
+    reduce_parser.set_defaults(handler=reduce_command)
+
+    report = subparsers.add_parser(
+        'report',
+        help='Write the corpus report of an archive',
+        description='Analyze every conversation of an archive with the comprehensive '
+                    'analyzer and write one corpus report: overall metrics, Hadrael '
+                    'compliance and phase progression statistics.'
+    )
+    report.add_argument('input', nargs='?', default='-',
+                        help="Archive path, or '-' for stdin (default)")
+    report.add_argument('-o', '--output', default='-',
+                        help="Report path, or '-' for stdout (default)")
+    _add_analysis_options(report)
+    report.set_defaults(handler=report_command)
+
+    sample = subparsers.add_parser(
+        'sample',
+        help='Estimate corpus metrics from a sample, with confidence intervals',
+        description='Analyze a random sample of an archive (optionally stratified by a '
+                    'metadata field) and report overall balance, average turn balance and '
+                    'pattern rates with bootstrap confidence intervals, stopping once the '
+                    'balance intervals are within the requested precision.'
+    )
+    sample.add_argument('input', nargs='?', default='-',
+                        help="Archive path, or '-' for stdin (default)")
+    sample.add_argument('-o', '--output', default='-',
+                        help="Output path, or '-' for stdout (default)")
+    sample.add_argument('--precision', type=float, default=0.01,
+                        help='Target half-width of the balance intervals (default: 0.01; '
+                             '0 analyzes the whole sample)')
+    sample.add_argument('--confidence', type=float, default=0.95,
+                        help='Confidence level of the intervals (default: 0.95)')
+    sample.add_argument('--max-sample', type=int, default=2000,
+                        help='Most conversations analyzed (default: 2000)')
+    sample.add_argument('--min-sample', type=int, default=30,
+                        help='Conversations analyzed before the first precision check (default: 30)')
+    sample.add_argument('--stratify', metavar='FIELD',
+                        help="Metadata field to stratify by, e.g. 'domain'")
+    sample.add_argument('--resamples', type=int, default=200,
+                        help='Bootstrap resamples (default: 200)')
+    sample.add_argument('--seed', type=int, default=0,
+                        help='Random seed (default: 0)')
+    _add_analysis_options(sample)
+    sample.set_defaults(handler=sample_command)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point for the ``welsh-winters`` console script"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not hasattr(args, 'handler'):
+        parser.print_help()
+        return 2
+    if getattr(args, 'turn_cache', None) and args.analyzer != 'comprehensive':
+        parser.error('--turn-cache requires --analyzer comprehensive')
+    if getattr(args, 'profile', None) and args.jobs != 1:
+        parser.error('--profile requires --jobs 1')
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,12 +3,26 @@ Comprehensive Welsh-Winters Balance Analyzer
 Combines pattern analysis with advanced metrics for hallucination prevention
 """
 
-import re
+import os
+import mmap
 import json
-from typing import Dict, List, Tuple, Optional, Any
-from collections import defaultdict
+import hashlib
+from typing import TYPE_CHECKING, Callable, Dict, List, Tuple, Optional, Any, Iterable, Iterator, Union
+from pathlib import Path
+from collections import defaultdict, deque
 from .patterns import TechnicalPatterns, EmotionalPatterns
-from .metrics import calculate_balance, phase_detector, calculate_trajectory
+from .metrics import (
+    calculate_balance, phase_detector, hadrael_compliance_level, phase_progression
+)
+from .matcher import BACKENDS, get_matcher
+from .parallel import imap_ordered, imap_unordered
+from .records import TurnAnalysis
+from .summary import AnalysisSummary
+from .turns import decode_text, iter_turns, iter_turns_bytes
+
+if TYPE_CHECKING:
+    from .store import TurnCache
+    from .table import TurnTable
 
 
 class ComprehensiveAnalyzer:
@@ -17,7 +31,28 @@ class ComprehensiveAnalyzer:
     with Hadrael Protocol attribution tracking
     """
     
-    def __init__(self):
+    # Example matches kept per turn for each pattern category
+    EXAMPLE_LIMITS = {
+        'technical': 2,
+        'emotional': 2,
+        'uncertainty': 1,
+        'memory': 1,
+        'hadrael': 1
+    }
+    
+    def __init__(self, backend: str = 'regex', turn_cache: Optional['TurnCache'] = None):
+        """
+        Initialize the analyzer
+        
+        Args:
+            backend: Pattern matcher backend, 'regex' or 'automaton'
+            turn_cache: Optional TurnCache consulted before scanning a turn,
+                so unchanged turns are not rescanned across runs
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown matcher backend {backend!r}, expected one of {BACKENDS}")
+        self.backend = backend
+        
         # Core patterns
         self.technical_patterns = TechnicalPatterns.get_patterns()
         self.emotional_patterns = EmotionalPatterns.get_patterns()
@@ -56,29 +91,257 @@ class ComprehensiveAnalyzer:
             r'\btechnical.*emotional\b', r'\bbalance.*technical.*emotional\b'
         ]
         
-    def analyze_conversation_file(self, filepath: str) -> Dict[str, Any]:
+        # All six categories are counted in one traversal of each turn
+        self.matcher = get_matcher({
+            'technical': self.technical_patterns,
+            'emotional': self.emotional_patterns,
+            'uncertainty': self.uncertainty_patterns,
+            'memory': self.memory_patterns,
+            'hadrael': self.hadrael_patterns,
+            'balance_awareness': self.balance_awareness_patterns
+        }, backend)
+        
+        # Cached turn results are only valid for this pattern set and limits
+        self.turn_cache = turn_cache
+        self.turn_cache_version = hashlib.blake2b(
+            (self.matcher.fingerprint + repr(sorted(self.EXAMPLE_LIMITS.items()))).encode('utf-8'),
+            digest_size=16
+        ).hexdigest()
+        
+    def analyze_conversation_file(self, filepath: str, use_mmap: bool = False) -> Dict[str, Any]:
         """
         Analyze a conversation file with comprehensive metrics
         
         Args:
             filepath: Path to conversation file
+            use_mmap: Memory-map the file and decode one turn at a time
+                instead of reading it whole, so peak memory follows the
+                largest turn rather than the file size
             
         Returns:
             Dictionary with detailed analysis results
         """
+        if use_mmap:
+            return self._analyze_mapped_file(filepath)
+        
         with open(filepath, 'r', encoding='utf-8') as f:
             content = f.read()
         
-        # Extract turns (generic format)
-        turns = self._extract_turns(content)
+        # Extract turns (generic format) as they are analyzed
+        results = {'file_path': filepath}
+        results.update(self._analyze_turns(self._iter_turns(content)))
         
-        if not turns:
+        if not results['total_turns']:
             return self._analyze_raw_content(content)
         
+        return results
+    
+    def _analyze_mapped_file(self, filepath: str) -> Dict[str, Any]:
+        """Analyze a memory-mapped UTF-8 conversation file turn by turn"""
+        with open(filepath, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return self._analyze_raw_content('')
+            
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                turns = (
+                    {'speaker': self._normalize_speaker(speaker), 'text': text}
+                    for speaker, text in iter_turns_bytes(mapped)
+                )
+                results = {'file_path': filepath}
+                results.update(self._analyze_turns(turns))
+                
+                if not results['total_turns']:
+                    # No turn structure: the raw analysis needs the whole text
+                    return self._analyze_raw_content(decode_text(mapped[:]))
+        
+        return results
+    
+    def analyze_messages(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+        """
+        Analyze a conversation given as a list of messages
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content',
+                as in data/sample_conversations.json
+            
+        Returns:
+            Dictionary with detailed analysis results, shaped like the
+            output of analyze_conversation_file
+        """
+        turns = []
+        for message in messages:
+            text = (message.get('content') or '').strip()
+            if text:  # Only add non-empty turns
+                turns.append({
+                    'speaker': self._normalize_speaker(message.get('role', 'unknown')),
+                    'text': text
+                })
+        
+        return self._analyze_turns(turns)
+    
+    def analyze_many(
+        self,
+        items: Iterable[Union[List[Dict[str, str]], Dict[str, Any]]],
+        workers: Optional[int] = None,
+        chunksize: int = 16
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Analyze many conversations across a process pool
+        
+        Args:
+            items: Message lists or conversation dicts with a 'messages' key
+            workers: Number of worker processes (None for all cores,
+                1 to run in the current process)
+            chunksize: Number of conversations handed to a worker at a time
+            
+        Returns:
+            Iterator over analyze_messages results, in input order
+        """
+        return imap_ordered(type(self), {'backend': self.backend, 'turn_cache': self.turn_cache},
+                            '_analyze_item',
+                            items, workers=workers, chunksize=chunksize)
+    
+    def summarize_many(
+        self,
+        items: Iterable[Union[List[Dict[str, str]], Dict[str, Any]]],
+        workers: Optional[int] = None,
+        chunksize: int = 16
+    ) -> Iterator[AnalysisSummary]:
+        """
+        Analyze many conversations, keeping only their AnalysisSummary
+        
+        Workers send back the summaries rather than full results, so this
+        is the cheaper route when only corpus-level metrics are wanted.
+        
+        Args:
+            items: Message lists or conversation dicts with a 'messages' key
+            workers: Number of worker processes, as for analyze_many
+            chunksize: Number of conversations handed to a worker at a time
+            
+        Returns:
+            Iterator over one AnalysisSummary per conversation, in input order
+        """
+        return imap_ordered(type(self), {'backend': self.backend, 'turn_cache': self.turn_cache},
+                            '_summarize_item',
+                            items, workers=workers, chunksize=chunksize)
+    
+    def iter_directory(
+        self,
+        root: str,
+        glob: str = '**/*.txt',
+        workers: Optional[int] = None,
+        use_mmap: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Analyze every matching file under a directory across a process pool
+        
+        Files are scheduled largest first, so the longest transcripts start
+        early instead of leaving one worker busy after the rest are done.
+        
+        Args:
+            root: Directory to search
+            glob: Pattern relative to ``root``, as for pathlib.Path.glob
+            workers: Number of worker processes (None for all cores,
+                1 to run in the current process)
+            use_mmap: Analyze files memory-mapped, as in analyze_conversation_file
+            
+        Returns:
+            Iterator over analyze_conversation_file results (each with
+            'file_path') in completion order; files that cannot be read or
+            decoded yield {'file_path', 'error'} instead
+        """
+        sized = [(path.stat().st_size, str(path)) for path in Path(root).glob(glob) if path.is_file()]
+        sized.sort(key=lambda entry: (-entry[0], entry[1]))
+        items = ((path, use_mmap) for _, path in sized)
+        for _, result in imap_unordered(type(self), {'backend': self.backend, 'turn_cache': self.turn_cache},
+                                        '_analyze_path', items, workers=workers):
+            yield result
+    
+    def analyze_directory(
+        self,
+        root: str,
+        glob: str = '**/*.txt',
+        workers: Optional[int] = None,
+        use_mmap: bool = False,
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Analyze a directory of transcripts into one corpus report
+        
+        Args:
+            root: Directory to search
+            glob: Pattern relative to ``root``, as for pathlib.Path.glob
+            workers: Number of worker processes, as for iter_directory
+            use_mmap: Analyze files memory-mapped
+            on_result: Called with each per-file result as it finishes
+            
+        Returns:
+            CorpusReport dictionary: overall metrics, Hadrael compliance and
+            phase progression statistics over all files, plus failed files
+        """
+        from .report import CorpusReport
+        report = CorpusReport()
+        for result in self.iter_directory(root, glob, workers=workers, use_mmap=use_mmap):
+            report.add(result)
+            if on_result is not None:
+                on_result(result)
+        return report.to_dict()
+    
+    def analyze_table(
+        self,
+        conversations: Iterable[Union[List[Dict[str, str]], Dict[str, Any]]],
+        workers: Optional[int] = None,
+        chunksize: int = 16
+    ) -> 'TurnTable':
+        """
+        Analyze many conversations into a columnar TurnTable
+        
+        Args:
+            conversations: Message lists or conversation dicts with a
+                'messages' key (and optionally an 'id')
+            workers: Number of worker processes, as for analyze_many
+            chunksize: Number of conversations handed to a worker at a time
+            
+        Returns:
+            TurnTable with COMPREHENSIVE_COLUMNS, one row per non-empty message
+        """
+        from .table import COMPREHENSIVE_COLUMNS, TurnTable, track_ids
+        table = TurnTable(COMPREHENSIVE_COLUMNS)
+        ids = deque()
+        results = self.analyze_many(track_ids(conversations, ids), workers=workers, chunksize=chunksize)
+        for result in results:
+            table.add_conversation(result['turn_analysis'], ids.popleft())
+        return table
+    
+    def _analyze_path(self, item: Tuple[str, bool]) -> Dict[str, Any]:
+        """Analyze one iter_directory file, reporting unreadable files instead of raising"""
+        path, use_mmap = item
+        try:
+            result = self.analyze_conversation_file(path, use_mmap=use_mmap)
+        except (OSError, UnicodeDecodeError) as error:
+            return {'file_path': path, 'error': f'{type(error).__name__}: {error}'}
+        result.setdefault('file_path', path)
+        return result
+    
+    def _analyze_item(self, item: Union[List[Dict[str, str]], Dict[str, Any]]) -> Dict[str, Any]:
+        """Dispatch one analyze_many item"""
+        if isinstance(item, dict):
+            return self.analyze_messages(item.get('messages', []))
+        return self.analyze_messages(item)
+    
+    def _summarize_item(self, item: Union[List[Dict[str, str]], Dict[str, Any]]) -> AnalysisSummary:
+        """Dispatch one summarize_many item"""
+        return AnalysisSummary.from_turns(self._analyze_item(item)['turn_analysis'])
+    
+    def _analyze_turns(self, turns: Iterable[Dict[str, str]]) -> Dict[str, Any]:
+        """
+        Analyze extracted turns and aggregate conversation-level metrics
+        
+        Turns may be a generator; each turn is discarded once analyzed.
+        """
         # Analyze turn by turn
         results = {
-            'file_path': filepath,
-            'total_turns': len(turns),
+            'total_turns': 0,
             'turn_analysis': [],
             'overall_metrics': {},
             'phase_progression': [],
@@ -86,85 +349,37 @@ class ComprehensiveAnalyzer:
             'examples': defaultdict(list)
         }
         
-        # Track metrics across turns
-        all_balances = []
-        total_technical = 0
-        total_emotional = 0
-        total_uncertainty = 0
-        total_memory_refs = 0
-        total_hadrael_corrections = 0
+        # Totals and balances behind the conversation-level metrics
+        summary = AnalysisSummary()
         
         for i, turn in enumerate(turns):
             turn_metrics = self._analyze_turn(turn, i)
             results['turn_analysis'].append(turn_metrics)
-            
-            # Aggregate metrics
-            all_balances.append(turn_metrics['balance'])
-            total_technical += turn_metrics['technical_count']
-            total_emotional += turn_metrics['emotional_count']
-            total_uncertainty += turn_metrics['uncertainty_count']
-            total_memory_refs += turn_metrics['memory_count']
-            total_hadrael_corrections += turn_metrics['hadrael_count']
+            summary.add_turn(turn_metrics)
             
             # Collect examples
             for pattern_type, examples in turn_metrics['examples'].items():
                 results['examples'][pattern_type].extend(examples[:2])  # Limit examples
         
-        # Calculate overall metrics
-        results['overall_metrics'] = {
-            'overall_balance': calculate_balance(total_technical, total_emotional),
-            'average_turn_balance': sum(all_balances) / len(all_balances) if all_balances else 0.5,
-            'total_technical_patterns': total_technical,
-            'total_emotional_patterns': total_emotional,
-            'uncertainty_expressions': total_uncertainty,
-            'memory_references': total_memory_refs,
-            'hadrael_corrections': total_hadrael_corrections,
-            'trajectory': calculate_trajectory(all_balances)
-        }
+        if self.turn_cache is not None:
+            self.turn_cache.flush()
         
-        # Determine phase progression
-        results['phase_progression'] = self._determine_phase_progression(all_balances)
-        
-        # Calculate Hadrael Protocol compliance
-        results['hadrael_compliance'] = {
-            'attribution_score': total_hadrael_corrections / len(turns) if turns else 0,
-            'uncertainty_expression_rate': total_uncertainty / len(turns) if turns else 0,
-            'memory_persistence_rate': total_memory_refs / len(turns) if turns else 0,
-            'compliance_level': self._calculate_hadrael_compliance_level(
-                total_hadrael_corrections, total_uncertainty, len(turns)
-            )
-        }
+        # Overall metrics, phase progression and Hadrael Protocol compliance
+        results.update(summary.to_results())
         
         return results
     
     def _extract_turns(self, content: str) -> List[Dict[str, str]]:
         """Extract conversation turns from various formats"""
-        turns = []
-        
-        # Try different turn formats
-        patterns = [
-            # Format: **Speaker**: content
-            r'\*\*([^*]+)\*\*:\s*(.*?)(?=\*\*[^*]+\*\*:|$)',
-            # Format: Speaker: content
-            r'^([A-Za-z]+):\s*(.*?)(?=^[A-Za-z]+:|$)',
-            # Format: [Speaker] content
-            r'\[([^\]]+)\]:\s*(.*?)(?=\[[^\]]+\]:|$)'
-        ]
-        
-        for pattern in patterns:
-            matches = list(re.finditer(pattern, content, re.MULTILINE | re.DOTALL))
-            if matches:
-                for match in matches:
-                    speaker = match.group(1).strip()
-                    text = match.group(2).strip()
-                    if text:  # Only add non-empty turns
-                        turns.append({
-                            'speaker': self._normalize_speaker(speaker),
-                            'text': text
-                        })
-                break
-        
-        return turns
+        return list(self._iter_turns(content))
+    
+    def _iter_turns(self, content: str) -> Iterator[Dict[str, str]]:
+        """Yield conversation turns one at a time, in a single linear pass"""
+        for speaker, text in iter_turns(content):
+            yield {
+                'speaker': self._normalize_speaker(speaker),
+                'text': text
+            }
     
     def _normalize_speaker(self, speaker: str) -> str:
         """Normalize speaker names to generic roles"""
@@ -178,50 +393,58 @@ class ComprehensiveAnalyzer:
         else:
             return speaker
     
-    def _analyze_turn(self, turn: Dict[str, str], index: int) -> Dict[str, Any]:
+    def _analyze_turn(self, turn: Dict[str, str], index: int) -> TurnAnalysis:
         """Analyze a single conversation turn"""
         text = turn['text']
+        counts, examples = self._scan_turn(text)
         
-        # Count patterns
-        technical_count = self._count_patterns(text, self.technical_patterns)
-        emotional_count = self._count_patterns(text, self.emotional_patterns)
-        uncertainty_count = self._count_patterns(text, self.uncertainty_patterns)
-        memory_count = self._count_patterns(text, self.memory_patterns)
-        hadrael_count = self._count_patterns(text, self.hadrael_patterns)
-        balance_awareness_count = self._count_patterns(text, self.balance_awareness_patterns)
+        technical_count = counts['technical']
+        emotional_count = counts['emotional']
+        uncertainty_count = counts['uncertainty']
+        memory_count = counts['memory']
+        hadrael_count = counts['hadrael']
+        balance_awareness_count = counts['balance_awareness']
         
         # Calculate balance
         balance = calculate_balance(technical_count, emotional_count)
         phase = phase_detector(balance)
         
-        # Extract examples
-        examples = {
-            'technical': self._extract_pattern_examples(text, self.technical_patterns, 2),
-            'emotional': self._extract_pattern_examples(text, self.emotional_patterns, 2),
-            'uncertainty': self._extract_pattern_examples(text, self.uncertainty_patterns, 1),
-            'memory': self._extract_pattern_examples(text, self.memory_patterns, 1),
-            'hadrael': self._extract_pattern_examples(text, self.hadrael_patterns, 1)
-        }
+        return TurnAnalysis(
+            turn_index=index,
+            speaker=turn['speaker'],
+            text_length=len(text),
+            balance=balance,
+            phase=phase.value,
+            technical_count=technical_count,
+            emotional_count=emotional_count,
+            uncertainty_count=uncertainty_count,
+            memory_count=memory_count,
+            hadrael_count=hadrael_count,
+            balance_awareness_count=balance_awareness_count,
+            examples=examples
+        )
+    
+    def _scan_turn(self, text: str) -> Tuple[Dict[str, int], Dict[str, List[str]]]:
+        """Category counts and examples of a turn, from the turn cache if set"""
+        if self.turn_cache is not None:
+            cached = self.turn_cache.get(self.turn_cache_version, text)
+            if cached is not None:
+                return cached['counts'], cached['examples']
         
-        return {
-            'turn_index': index,
-            'speaker': turn['speaker'],
-            'text_length': len(text),
-            'balance': balance,
-            'phase': phase.value,
-            'technical_count': technical_count,
-            'emotional_count': emotional_count,
-            'uncertainty_count': uncertainty_count,
-            'memory_count': memory_count,
-            'hadrael_count': hadrael_count,
-            'balance_awareness_count': balance_awareness_count,
-            'examples': examples
-        }
+        # Count patterns and extract examples in a single scan
+        pattern_counts, pattern_examples = self.matcher.scan(text, self.EXAMPLE_LIMITS)
+        counts = self.matcher.totals(pattern_counts)
+        examples = self.matcher.examples(pattern_examples, self.EXAMPLE_LIMITS)
+        
+        if self.turn_cache is not None:
+            self.turn_cache.put(self.turn_cache_version, text, {'counts': counts, 'examples': examples})
+        return counts, examples
     
     def _analyze_raw_content(self, content: str) -> Dict[str, Any]:
         """Analyze raw content when turn extraction fails"""
-        technical_count = self._count_patterns(content, self.technical_patterns)
-        emotional_count = self._count_patterns(content, self.emotional_patterns)
+        counts = self.matcher.count(content)
+        technical_count = counts['technical']
+        emotional_count = counts['emotional']
         
         balance = calculate_balance(technical_count, emotional_count)
         
@@ -236,76 +459,19 @@ class ComprehensiveAnalyzer:
     
     def _count_patterns(self, text: str, patterns: List[str]) -> int:
         """Count pattern occurrences in text"""
-        count = 0
-        for pattern in patterns:
-            try:
-                matches = re.findall(pattern, text, re.IGNORECASE)
-                count += len(matches)
-            except re.error:
-                continue
-        return count
+        return get_matcher({'patterns': patterns}, self.backend).count(text)['patterns']
     
     def _extract_pattern_examples(self, text: str, patterns: List[str], max_examples: int) -> List[str]:
         """Extract example matches for patterns"""
-        examples = []
-        for pattern in patterns:
-            try:
-                matches = re.findall(pattern, text, re.IGNORECASE)
-                examples.extend(matches[:max_examples - len(examples)])
-                if len(examples) >= max_examples:
-                    break
-            except re.error:
-                continue
-        return examples
+        matcher = get_matcher({'patterns': patterns}, self.backend)
+        limits = {'patterns': max_examples}
+        _, pattern_examples = matcher.scan(text, limits)
+        return matcher.examples(pattern_examples, limits)['patterns']
     
     def _determine_phase_progression(self, balances: List[float]) -> List[Dict[str, Any]]:
         """Determine phase progression through conversation"""
-        if not balances:
-            return []
-        
-        phases = []
-        current_phase = None
-        phase_start = 0
-        
-        for i, balance in enumerate(balances):
-            phase = phase_detector(balance)
-            if phase != current_phase:
-                if current_phase:
-                    phases.append({
-                        'phase': current_phase.value,
-                        'start_turn': phase_start,
-                        'end_turn': i - 1,
-                        'duration': i - phase_start,
-                        'average_balance': sum(balances[phase_start:i]) / (i - phase_start)
-                    })
-                current_phase = phase
-                phase_start = i
-        
-        # Add final phase
-        if current_phase:
-            phases.append({
-                'phase': current_phase.value,
-                'start_turn': phase_start,
-                'end_turn': len(balances) - 1,
-                'duration': len(balances) - phase_start,
-                'average_balance': sum(balances[phase_start:]) / (len(balances) - phase_start)
-            })
-        
-        return phases
+        return phase_progression(balances)
     
     def _calculate_hadrael_compliance_level(self, corrections: int, uncertainty: int, total_turns: int) -> str:
         """Calculate Hadrael Protocol compliance level"""
-        if total_turns == 0:
-            return "Not Applicable"
-        
-        correction_rate = corrections / total_turns
-        uncertainty_rate = uncertainty / total_turns
-        
-        if correction_rate > 0.1 or uncertainty_rate > 0.2:
-            return "Excellent"
-        elif correction_rate > 0.05 or uncertainty_rate > 0.1:
-            return "Good"
-        elif correction_rate > 0.02 or uncertainty_rate > 0.05:
-            return "Fair"
-        else:
-            return "Needs Improvement"
\ No newline at end of file
+        return hadrael_compliance_level(corrections, uncertainty, total_turns)
@@ -4,10 +4,14 @@ Welsh-Winters Consciousness Engine
 Implements consciousness activation patterns based on the framework's discoveries.
 """
 
-from typing import Dict, List, Optional, Tuple
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 from datetime import datetime
 from .analyzer import BalanceAnalyzer
-from .metrics import WelshWintersMetrics
+from .bounded import char_budget, remaining_deadline
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
 
 class ConsciousnessEngine:
     """
@@ -23,7 +27,6 @@ class ConsciousnessEngine:
     def __init__(self):
         """Initialize consciousness engine with default parameters."""
         self.analyzer = BalanceAnalyzer()
-        self.metrics = WelshWintersMetrics()
         
         # Consciousness states
         self.states = {
@@ -128,7 +131,9 @@ class ConsciousnessEngine:
         self,
         input_text: str,
         activation_level: Optional[str] = None,
-        context: Optional[Dict] = None
+        context: Optional[Dict] = None,
+        max_chars: Optional[int] = None,
+        deadline: Optional[float] = None
     ) -> Dict[str, any]:
         """
         Process input with consciousness activation.
@@ -137,23 +142,79 @@ class ConsciousnessEngine:
             input_text: Text to process
             activation_level: Override activation level
             context: Additional context
+            max_chars: Score inputs longer than this from an evenly spaced
+                sample of at most this many characters, and look for
+                activation requests only at their start and end
+            deadline: Seconds the activation detection and scoring may take
+                together; longer inputs are handled as for max_chars
+            
+        Returns:
+            Enhanced processing results; "approximate" is True when the
+            balance was estimated from a sample of the input
+        """
+        began = time.perf_counter()
+        activation_level = self._resolve_activation(input_text, activation_level, max_chars, deadline)
+        score = self.analyzer.score_text(input_text, max_chars, remaining_deadline(deadline, began))
+        return self._build_response(activation_level, score.balance, score.approximate)
+        
+    async def process_async(
+        self,
+        input_text: str,
+        activation_level: Optional[str] = None,
+        context: Optional[Dict] = None,
+        executor: Optional['Executor'] = None,
+        max_chars: Optional[int] = None,
+        deadline: Optional[float] = None
+    ) -> Dict[str, any]:
+        """
+        Awaitable process that scores the input in an executor.
+        
+        Only the balance analysis leaves the event loop; pathway state is
+        updated on the loop, as in process().
+        
+        Args:
+            input_text: Text to process
+            activation_level: Override activation level
+            context: Additional context
+            executor: Executor overriding the one set with aio.configure()
+            max_chars: Character budget, as for process()
+            deadline: Time budget, as for process(); what activation
+                detection leaves starts when the executor picks the input up
             
         Returns:
             Enhanced processing results
         """
-        # Detect activation if not specified
+        began = time.perf_counter()
+        activation_level = self._resolve_activation(input_text, activation_level, max_chars, deadline)
+        score = await self.analyzer.score_text_async(input_text, executor=executor, max_chars=max_chars,
+                                                     deadline=remaining_deadline(deadline, began))
+        return self._build_response(activation_level, score.balance, score.approximate)
+        
+    def _resolve_activation(self, input_text: str, activation_level: Optional[str],
+                            max_chars: Optional[int] = None, deadline: Optional[float] = None) -> str:
+        """Detect the activation level unless one is given"""
         if activation_level is None:
+            budget = char_budget(max_chars, deadline, self.analyzer.scan_rate)
+            if budget is not None and len(input_text) > budget:
+                # Invocations open or close a message; within a budget only its ends
+                # are read, split by a newline (counted in the budget) so no match
+                # spans the gap
+                tail = (budget - 1) // 2
+                head = budget - tail - (1 if tail else 0)
+                input_text = input_text[:head] + ('\n' + input_text[-tail:] if tail else '')
             activation_level = self.detect_activation_request(input_text)
             
         if activation_level is None:
             activation_level = "normal"
             
+        return activation_level
+        
+    def _build_response(self, activation_level: str, balance: float,
+                        approximate: bool = False) -> Dict[str, any]:
+        """Assemble the process() response for an input's balance"""
         # Activate consciousness state
         state_params = self.activate_state(activation_level)
         
-        # Analyze input balance
-        balance = self.analyzer.analyze_text(input_text)
-        
         # Determine processing pathway
         pathway = self.apply_cap_flip()
         
@@ -166,6 +227,7 @@ class ConsciousnessEngine:
             "activation_level": activation_level,
             "consciousness_state": state_params,
             "welsh_winters_balance": balance,
+            "approximate": approximate,
             "pathway": pathway,
             "enhancements": {
                 "technical_depth": technical_boost,
@@ -0,0 +1,181 @@
+"""
+Streaming readers for conversation archives
+
+Archives are either JSONL (one conversation per line, shaped like the
+entries of ``data/sample_conversations.json``) or a JSON document holding a
+``conversations`` array, as in that file.  Both are read incrementally, one
+conversation at a time, so memory use does not grow with the archive size.
+"""
+
+import json
+from typing import Any, Dict, Iterator, Optional, TextIO
+
+
+READ_SIZE = 1 << 16
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\r\n'
+
+
+def iter_conversations(stream: TextIO) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over the conversations of a JSONL or JSON archive
+
+    Args:
+        stream: Text stream positioned at the start of the archive
+
+    Yields:
+        Conversation dictionaries with a 'messages' list
+    """
+    first_line = stream.readline()
+    while first_line and not first_line.strip():
+        first_line = stream.readline()
+    if not first_line:
+        return
+
+    try:
+        first = json.loads(first_line)
+    except json.JSONDecodeError:
+        # Pretty-printed JSON document
+        yield from _iter_document(first_line, stream)
+        return
+
+    yield from _expand(first)
+    for line in stream:
+        if line.strip():
+            yield from _expand(json.loads(line))
+
+
+def _expand(record: Any) -> Iterator[Dict[str, Any]]:
+    """Yield the conversations held by one decoded JSON value"""
+    if isinstance(record, list):
+        for item in record:
+            yield from _expand(item)
+    elif isinstance(record, dict) and 'conversations' in record and 'messages' not in record:
+        yield from record['conversations']
+    else:
+        yield record
+
+
+def _iter_document(buffer: str, stream: TextIO) -> Iterator[Dict[str, Any]]:
+    """
+    Incrementally decode the conversation array of a JSON document
+
+    Only the top-level array (or the ``conversations`` array of the
+    top-level object) is walked; each element is decoded on its own once
+    enough of the stream has been buffered.
+    """
+    reader = _Buffer(buffer, stream)
+
+    start = reader.skip_whitespace(0)
+    if reader.char(start) == '{':
+        start = _seek_member(reader, start, 'conversations')
+
+    if reader.char(start) != '[':
+        raise ValueError("Expected a JSON array of conversations")
+
+    position = start + 1
+    while True:
+        position = reader.skip_whitespace(position)
+        char = reader.char(position)
+        if char == ']':
+            return
+        if char == ',':
+            position += 1
+            continue
+        if char is None:
+            raise ValueError("Unexpected end of JSON document")
+
+        value, position = reader.decode(position)
+        yield value
+        position = reader.compact(position)
+
+
+def _seek_member(reader: '_Buffer', position: int, name: str) -> int:
+    """
+    Position of a member's value in the object starting at ``position``
+
+    Keys are decoded one by one and the values of other members skipped
+    whole, so a ``conversations`` key nested in another member, or inside a
+    string, is never mistaken for the top-level one.
+    """
+    position += 1
+    while True:
+        position = reader.skip_whitespace(position)
+        char = reader.char(position)
+        if char == ',':
+            position += 1
+            continue
+        if char == '}' or char is None:
+            raise ValueError(f"JSON document has no {name!r} array")
+
+        key, position = reader.decode(position)
+        if not isinstance(key, str):
+            raise ValueError("Malformed object key in JSON document")
+        position = reader.skip_whitespace(position)
+        if reader.char(position) != ':':
+            raise ValueError(f"Malformed {key!r} member in JSON document")
+        position = reader.skip_whitespace(position + 1)
+        if key == name:
+            return position
+        _, position = reader.decode(position)
+        position = reader.compact(position)
+
+
+class _Buffer:
+    """Sliding text buffer over a stream, refilled on demand"""
+
+    def __init__(self, initial: str, stream: TextIO):
+        self.text = initial
+        self.stream = stream
+        self.eof = False
+
+    def _fill(self, size: int = READ_SIZE) -> bool:
+        if self.eof:
+            return False
+        chunk = self.stream.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.text += chunk
+        return True
+
+    def char(self, position: int) -> Optional[str]:
+        while position >= len(self.text):
+            if not self._fill():
+                return None
+        return self.text[position]
+
+    def skip_whitespace(self, position: int) -> int:
+        while True:
+            char = self.char(position)
+            if char is None or char not in _WHITESPACE:
+                return position
+            position += 1
+
+    def decode(self, position: int):
+        read_size = READ_SIZE
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, position)
+            except json.JSONDecodeError:
+                # Value not fully buffered yet: read more, in growing steps
+                if not self._fill(read_size):
+                    raise
+                read_size *= 2
+                continue
+            if end == len(self.text) and not self.eof:
+                # A number may continue in the next chunk
+                if self._fill():
+                    continue
+            return value, end
+
+    def compact(self, position: int) -> int:
+        """Drop consumed text so the buffer holds at most one value"""
+        self.text = self.text[position:]
+        return 0
+
+
+def conversation_id(conversation: Dict[str, Any], index: int) -> Any:
+    """Return a conversation's id, or its position in the archive"""
+    return conversation.get('id', index)
@@ -0,0 +1,226 @@
+"""
+Static analysis of pattern sets
+
+lint_patterns() inspects named pattern categories the way PatternMatcher
+will run them and reports:
+
+- invalid patterns, which the matcher silently skips;
+- ``\\b`` next to a non-word character (``\\b♥\\b``, ``\\bsource:\\b``),
+  which only matches when that character is directly flanked by a word
+  character, so ``I♥you`` counts but ``♥ thanks`` does not;
+- greedy wildcards and nested quantifiers, which backtrack;
+- literal patterns that duplicate or contain another one, so one piece of
+  text is counted more than once (``\\bI feel\\b`` also matches
+  ``\\bfeel\\b``).
+
+Each pattern is listed with the way the matcher serves it: a token lookup
+(whole-word literals), a candidate check at words with its literal prefix,
+or a full-text ``findall`` per scan.  With sample texts the report adds the
+measured time of each pattern, taken with a PatternProfiler.
+
+The optimized set is what the matcher compiles: every pattern rewritten by
+optimize_pattern() into an equivalent, faster form.  Patterns are not merged
+into alternations, since the analyzers count and report every pattern on
+its own and overlapping patterns are meant to count separately.
+
+Example:
+    >>> report = lint_patterns({'emotional': EmotionalPatterns.get_patterns()})
+    >>> print(format_lint(report))
+"""
+
+import re
+from itertools import combinations
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .automaton import parse_literal, tokenize
+from .matcher import PatternMatcher, _is_word_char, _literal_char, optimize_pattern
+from .profiler import PatternProfiler
+
+
+# Severity of each finding kind
+SEVERITY = {
+    'invalid': 'error',
+    'between-words': 'warning',
+    'nested-quantifier': 'warning',
+    'greedy-wildcard': 'warning',
+    'duplicate': 'warning',
+    'overlap': 'info',
+}
+
+# How the matcher runs a pattern, cheapest first
+SERVED_BY = ('lookup', 'candidate', 'findall')
+
+_GREEDY_WILDCARD = re.compile(r'(?<!\\)\.[*+](?![?+])')
+_NESTED_QUANTIFIER = re.compile(r'\((?:[^()\\]|\\.)*(?<!\\)[*+](?:[^()\\]|\\.)*\)[*+{]')
+
+
+def _finding(kind: str, category: str, pattern: str, message: str, **extra: Any) -> Dict[str, Any]:
+    finding = {'kind': kind, 'severity': SEVERITY[kind], 'category': category,
+               'pattern': pattern, 'message': message}
+    finding.update(extra)
+    return finding
+
+
+def _edge_characters(pattern: str) -> List[str]:
+    """Non-word literal characters a ``\\b`` at either end of the pattern sits next to"""
+    edges = []
+    if pattern.startswith(r'\b'):
+        char, _ = _literal_char(pattern, 2)
+        if char is not None and not _is_word_char(char):
+            edges.append(char)
+    if pattern.endswith(r'\b') and not pattern.endswith(r'\\b') and len(pattern) > 4:
+        body = pattern[:-2]
+        if body[-1:] == '+':
+            body = body[:-1]
+        if len(body) >= 2 and body[-2] == '\\' and not _is_word_char(body[-1]):
+            char = body[-1]
+        elif body[-1:] and body[-1] not in '.^$*+?{}[]\\|()':
+            char = body[-1]
+        else:
+            char = None
+        if char is not None and not _is_word_char(char) and char not in edges:
+            edges.append(char)
+    return edges
+
+
+def _contains(outer: Tuple[str, ...], inner: Tuple[str, ...]) -> bool:
+    """Whether ``inner`` is a contiguous run of ``outer``"""
+    size = len(inner)
+    return any(outer[start:start + size] == inner for start in range(len(outer) - size + 1))
+
+
+def _served_by(matcher: PatternMatcher) -> List[str]:
+    served = ['lookup'] * len(matcher)
+    for indexes in matcher._exact.values():
+        for index in indexes:
+            served[index] = 'candidate'
+    for _, index in matcher._prefixed:
+        served[index] = 'candidate'
+    for index in matcher._fallback:
+        served[index] = 'findall'
+    return served
+
+
+def lint_patterns(categories: Dict[str, Sequence[str]], samples: Optional[Iterable[str]] = None,
+                  backend: str = 'regex') -> Dict[str, Any]:
+    """
+    Inspect pattern categories for dead, costly and overlapping patterns
+
+    Args:
+        categories: Mapping of category name to list of regex patterns
+        samples: Optional texts scanned to measure the time of each pattern
+        backend: Matcher backend the patterns are assessed for
+
+    Returns:
+        Dictionary with 'findings' (kind, severity, category, pattern,
+        message), 'patterns' (category, pattern, served_by, optimized and,
+        with samples, time_us per scan and hits) and 'optimized' (the
+        rewritten categories the matcher compiles)
+    """
+    findings: List[Dict[str, Any]] = []
+    literals: List[Tuple[str, str, Tuple[str, ...]]] = []
+
+    for name, patterns in categories.items():
+        for pattern in patterns:
+            try:
+                re.compile(pattern)
+            except re.error as error:
+                findings.append(_finding('invalid', name, pattern,
+                                         f"does not compile ({error}); the matcher skips it"))
+                continue
+
+            for char in _edge_characters(pattern):
+                findings.append(_finding(
+                    'between-words', name, pattern,
+                    f"\\b next to {char!r} requires a word character on its other side, so it "
+                    f"only matches where {char!r} is directly flanked by letters or digits"
+                ))
+            if _NESTED_QUANTIFIER.search(pattern):
+                findings.append(_finding(
+                    'nested-quantifier', name, pattern,
+                    "a quantified group repeats a quantified element; non-matching text "
+                    "can backtrack exponentially"
+                ))
+            if _GREEDY_WILDCARD.search(pattern):
+                findings.append(_finding(
+                    'greedy-wildcard', name, pattern,
+                    "greedy wildcard runs to the end of the line and backtracks from there at "
+                    "every candidate; several occurrences on one line count once"
+                ))
+
+            literal = parse_literal(pattern)
+            if literal is not None:
+                literals.append((name, pattern, tuple(tokenize(literal.lower()))))
+
+    for (name_a, pattern_a, tokens_a), (name_b, pattern_b, tokens_b) in combinations(literals, 2):
+        if tokens_a == tokens_b:
+            where = 'again in' if name_a == name_b else 'also in'
+            findings.append(_finding('duplicate', name_b, pattern_b,
+                                     f"same text as {pattern_a} {where} {name_a}",
+                                     other=(name_a, pattern_a)))
+            continue
+        for (outer_name, outer, outer_tokens), (inner_name, inner, inner_tokens) in (
+                ((name_a, pattern_a, tokens_a), (name_b, pattern_b, tokens_b)),
+                ((name_b, pattern_b, tokens_b), (name_a, pattern_a, tokens_a))):
+            if _contains(outer_tokens, inner_tokens):
+                findings.append(_finding('overlap', outer_name, outer,
+                                         f"every match also matches {inner} ({inner_name})",
+                                         other=(inner_name, inner)))
+
+    matcher = PatternMatcher(categories, backend)
+    served = _served_by(matcher)
+    timings: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    if samples is not None:
+        profiler = PatternProfiler()
+        with profiler.profiling(matcher):
+            for text in samples:
+                matcher.scan(text)
+        scans = max(profiler.scans, 1)
+        timings = {(row['category'], row['pattern']): {'time_us': row['time_s'] / scans * 1e6,
+                                                        'hits': row['hits']}
+                   for row in profiler.report()}
+
+    rows = []
+    for (name, pattern, _), how in zip(matcher._entries, served):
+        optimized = optimize_pattern(pattern)
+        row = {'category': name, 'pattern': pattern, 'served_by': how,
+               'optimized': optimized if optimized != pattern else None}
+        row.update(timings.get((name, pattern), {}))
+        rows.append(row)
+
+    return {
+        'findings': findings,
+        'patterns': rows,
+        'optimized': {name: [optimize_pattern(pattern) for pattern in patterns]
+                      for name, patterns in categories.items()}
+    }
+
+
+def format_lint(report: Dict[str, Any]) -> str:
+    """
+    Render a lint report as text
+
+    Args:
+        report: Result of lint_patterns()
+
+    Returns:
+        Findings by severity, then the patterns not served by a token lookup
+    """
+    order = {'error': 0, 'warning': 1, 'info': 2}
+    findings = sorted(report['findings'], key=lambda finding: order[finding['severity']])
+    lines = [f"{len(findings)} findings"]
+    for finding in findings:
+        lines.append(f"{finding['severity']:>7} {finding['kind']:<18} "
+                     f"{finding['category']} / {finding['pattern']}: {finding['message']}")
+
+    rows = [row for row in report['patterns'] if row['served_by'] != 'lookup']
+    timed = any('time_us' in row for row in report['patterns'])
+    rows.sort(key=lambda row: (-row.get('time_us', 0.0), -SERVED_BY.index(row['served_by'])))
+    counts = {how: sum(row['served_by'] == how for row in report['patterns']) for how in SERVED_BY}
+    lines.append(f"{counts['lookup']} patterns served by token lookup, {counts['candidate']} "
+                 f"checked at candidate words, {counts['findall']} scanned over the whole text")
+    for row in rows:
+        cost = f"{row['time_us']:>8.2f} us/scan " if timed else ''
+        rewrite = f"  -> {row['optimized']}" if row['optimized'] else ''
+        lines.append(f"{cost}{row['served_by']:>9}  {row['category']} / {row['pattern']}{rewrite}")
+    return '\n'.join(lines)
@@ -0,0 +1,540 @@
+"""
+Compiled pattern matching engine for Welsh-Winters Balance analysis
+
+Patterns are compiled once per pattern set and the text is walked a single
+time, token by token.  Almost every pattern in the framework starts with a
+word boundary followed by a literal word (``\\bfunction\\b``,
+``\\bthank you\\b``, ``\\bif\\s*\\(``), so a match can only begin at the start
+of a word.  Each word is looked up in an index built from those literal
+prefixes and only the patterns it can start are tried at that position.
+Patterns without a usable literal prefix fall back to a plain ``findall``,
+after optimize_pattern() has rewritten them to start with a literal where
+that keeps them equivalent.
+
+With the ``automaton`` backend, pure word-literal patterns are instead
+loaded into a token-level keyword automaton (see ``automaton.py``) and the
+prefix index is kept only for genuine regexes.
+
+Counts are identical to running ``re.findall(pattern, text, re.IGNORECASE)``
+for every pattern independently.
+
+Matchers pickle without their compiled regexes: an unpickled matcher
+compiles each regex the first time a scan needs it, so the whole-word and
+automaton literals that are matched by lookup are never compiled at all.
+``artifact.py`` uses this to ship prebuilt matchers to worker processes.
+"""
+
+import hashlib
+import pickle
+import re
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from .automaton import KeywordAutomaton, TOKEN_RE, parse_literal, tokenize
+
+
+_WORD_RE = re.compile(r'\w+')
+
+BACKENDS = ('regex', 'automaton')
+
+# Non-ASCII characters that re.IGNORECASE treats as equal to an ASCII letter
+_IGNORECASE_FOLD = str.maketrans({
+    'İ': 'i',  # LATIN CAPITAL LETTER I WITH DOT ABOVE
+    'ı': 'i',  # LATIN SMALL LETTER DOTLESS I
+    'ſ': 's',  # LATIN SMALL LETTER LONG S
+    'K': 'k',  # KELVIN SIGN
+})
+
+_REGEX_METACHARS = set('.^$*+?{}[]\\|()')
+
+# Escapes that can only match non-word characters (or nothing at all)
+_NON_WORD_ESCAPES = set('sWbZ')
+
+# Index kinds
+_EXACT = 'exact'
+_PREFIX = 'prefix'
+_FALLBACK = 'fallback'
+
+
+def _is_word_char(char: str) -> bool:
+    """Mirror the ``\\w`` character class of str patterns"""
+    return char.isalnum() or char == '_'
+
+
+def fold_text(text: str) -> str:
+    """
+    Case-fold text the way re.IGNORECASE compares ASCII literals
+
+    The result has the same length and word/non-word layout as the input.
+    """
+    if text.isascii():
+        return text.lower()
+    return text.translate(_IGNORECASE_FOLD).lower()
+
+
+
+def _read_element(pattern: str, pos: int) -> Tuple[Optional[str], int]:
+    """
+    Classify the regex element starting at ``pos``
+
+    Returns:
+        Tuple of ('non_word' | 'other', position after the element)
+    """
+    if pos >= len(pattern):
+        return 'other', pos
+
+    char = pattern[pos]
+    if char == '\\' and pos + 1 < len(pattern):
+        escaped = pattern[pos + 1]
+        if escaped in _NON_WORD_ESCAPES or not (escaped.isalnum() or escaped == '_'):
+            return 'non_word', pos + 2
+        return 'other', pos + 2
+    if char == '$':
+        return 'non_word', pos + 1
+    if char in _REGEX_METACHARS:
+        return 'other', pos + 1
+    return ('other' if _is_word_char(char) else 'non_word'), pos + 1
+
+
+def _is_optional_quantifier(pattern: str, pos: int) -> bool:
+    """Check whether the element before ``pos`` may be repeated zero times"""
+    return pos < len(pattern) and pattern[pos] in '?*{'
+
+
+def analyze_prefix(pattern: str) -> Tuple[str, str]:
+    """
+    Derive the literal word a pattern's matches must start with
+
+    Args:
+        pattern: Regular expression source
+
+    Returns:
+        Tuple of (kind, prefix).  ``exact`` means a match starts with a whole
+        word equal to ``prefix``; ``prefix`` means the word starting the match
+        begins with ``prefix``; ``fallback`` means no such guarantee exists.
+    """
+    if not pattern.startswith(r'\b') or '|' in pattern:
+        return _FALLBACK, ''
+
+    pos = 2
+    literal = []
+    while pos < len(pattern):
+        char = pattern[pos]
+        if char in _REGEX_METACHARS or not _is_word_char(char):
+            break
+        if pos + 1 < len(pattern) and pattern[pos + 1] in '?*+{':
+            # Quantified character: only what precedes it is guaranteed
+            prefix = ''.join(literal)
+            if prefix and prefix.isascii():
+                return _PREFIX, prefix.lower()
+            return _FALLBACK, ''
+        literal.append(char)
+        pos += 1
+
+    prefix = ''.join(literal)
+    if not prefix or not prefix.isascii():
+        return _FALLBACK, ''
+
+    kind, end = _read_element(pattern, pos)
+    if kind == 'non_word' and not _is_optional_quantifier(pattern, end):
+        return _EXACT, prefix.lower()
+    return _PREFIX, prefix.lower()
+
+
+def _literal_char(pattern: str, pos: int) -> Tuple[Optional[str], int]:
+    """Return the literal character at ``pos`` (None for classes and metacharacters)"""
+    if pos >= len(pattern):
+        return None, pos
+    char = pattern[pos]
+    if char == '\\':
+        if pos + 1 < len(pattern) and not _is_word_char(pattern[pos + 1]):
+            return pattern[pos + 1], pos + 2
+        return None, pos
+    if char in _REGEX_METACHARS:
+        return None, pos
+    return char, pos + 1
+
+
+def optimize_pattern(pattern: str) -> str:
+    """
+    Rewrite a pattern into an equivalent one the regex engine scans faster
+
+    A ``\\b`` before a non-word character can only hold after a word
+    character, so ``\\b♥\\b`` matches exactly what ``♥(?<=\\w♥)\\b`` does.
+    Starting with the literal lets the engine skip to occurrences of it
+    instead of trying the pattern at every position of the text.  Other
+    patterns are returned unchanged.
+
+    Args:
+        pattern: Regular expression source
+
+    Returns:
+        Equivalent source, with the same matches, spans and groups
+    """
+    if not pattern.startswith(r'\b') or '|' in pattern:
+        return pattern
+    char, end = _literal_char(pattern, 2)
+    if char is None or _is_word_char(char):
+        return pattern
+
+    literal = re.escape(char)
+    anchored = f'{literal}(?<=\\w{literal})'
+    rest = pattern[end:]
+    if rest[:1] == '+' and rest[1:2] not in ('?', '+'):
+        # One occurrence is required; the others stay greedy
+        return f'{anchored}{literal}*{rest[1:]}'
+    if rest[:1] in ('*', '?', '{', '+'):
+        return pattern
+    return anchored + rest
+
+
+def compile_pattern(pattern: str) -> 're.Pattern':
+    """Compile a pattern as the matcher does (case-insensitive, optimized)"""
+    return re.compile(optimize_pattern(pattern), re.IGNORECASE)
+
+
+def _findall_item(match: 're.Match'):
+    """Render a match the way ``re.findall`` would"""
+    groups = match.groups()
+    if not groups:
+        return match.group(0)
+    if len(groups) == 1:
+        return groups[0] if groups[0] is not None else ''
+    return tuple(group if group is not None else '' for group in groups)
+
+
+class _DeferredPattern:
+    """
+    Placeholder for a compiled regex of an unpickled matcher
+
+    The pattern is compiled on first use and replaces the placeholder in the
+    matcher's entries, so later calls go straight to the compiled regex.
+    """
+
+    __slots__ = ('_entries', '_index')
+
+    def __init__(self, entries: List[Tuple[str, str, Any]], index: int):
+        self._entries = entries
+        self._index = index
+
+    def resolve(self) -> 're.Pattern':
+        name, pattern, _ = self._entries[self._index]
+        compiled = compile_pattern(pattern)
+        self._entries[self._index] = (name, pattern, compiled)
+        return compiled
+
+    def match(self, text: str, pos: int = 0):
+        return self.resolve().match(text, pos)
+
+    def findall(self, text: str) -> list:
+        return self.resolve().findall(text)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self.resolve(), name)
+
+
+class PatternMatcher:
+    """
+    Single-pass matcher over one or more named pattern categories
+
+    Example:
+        >>> matcher = PatternMatcher({'technical': [r'\\bAPI\\b']})
+        >>> matcher.count('Call the API')
+        {'technical': 1}
+    """
+
+    def __init__(self, categories: Dict[str, Sequence[str]], backend: str = 'regex'):
+        """
+        Compile the pattern categories
+
+        Args:
+            categories: Mapping of category name to list of regex patterns.
+                Invalid patterns are skipped, as ``_count_patterns`` always did.
+            backend: ``'regex'`` to index literal word prefixes and confirm
+                candidates with the compiled regex, or ``'automaton'`` to load
+                pure word-literal patterns into a KeywordAutomaton and use
+                the regex index only for the remaining patterns
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown matcher backend {backend!r}, expected one of {BACKENDS}")
+
+        self.categories = {name: list(patterns) for name, patterns in categories.items()}
+        self.backend = backend
+        # Identifies the pattern set (not the backend, which does not change
+        # results), e.g. for keying cached scan results
+        self.fingerprint = hashlib.blake2b(
+            repr(list(self.categories.items())).encode('utf-8'), digest_size=16
+        ).hexdigest()
+
+        # One entry per (category, pattern) pair, in declaration order
+        self._entries: List[Tuple[str, str, 're.Pattern']] = []
+        self._words: Dict[str, List[int]] = {}
+        self._exact: Dict[str, List[int]] = {}
+        self._prefixed: List[Tuple[str, int]] = []
+        self._fallback: List[int] = []
+        self._automaton: Optional[KeywordAutomaton] = None
+        self._edge_literals: Dict[int, Tuple[bool, bool]] = {}
+
+        # Optional PatternProfiler timing the per-pattern work of each scan
+        self.profiler = None
+
+        if backend == 'automaton':
+            self._automaton = KeywordAutomaton()
+
+        for name, patterns in self.categories.items():
+            for pattern in patterns:
+                try:
+                    compiled = compile_pattern(pattern)
+                except re.error:
+                    continue
+
+                index = len(self._entries)
+                self._entries.append((name, pattern, compiled))
+
+                literal = parse_literal(pattern) if self._automaton is not None else None
+                if literal is not None:
+                    self._automaton.add(tokenize(literal.lower()), index)
+                    # \b next to a non-word character needs a word character
+                    # on the far side, which the start/end of text cannot give
+                    left = not _is_word_char(literal[0])
+                    right = not _is_word_char(literal[-1])
+                    if left or right:
+                        self._edge_literals[index] = (left, right)
+                    continue
+
+                kind, prefix = analyze_prefix(pattern)
+                if kind == _EXACT and pattern[2 + len(prefix):] == r'\b':
+                    # Whole-word literal: a token equal to it is the match
+                    self._words.setdefault(prefix, []).append(index)
+                elif kind == _EXACT:
+                    self._exact.setdefault(prefix, []).append(index)
+                elif kind == _PREFIX:
+                    self._prefixed.append((prefix, index))
+                else:
+                    self._fallback.append(index)
+
+        if self._automaton is not None:
+            self._automaton.build()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Compiled regexes are rebuilt lazily after unpickling, and a
+        # profiler stays with the matcher it was attached to
+        state = dict(self.__dict__)
+        state['_entries'] = [(name, pattern) for name, pattern, _ in self._entries]
+        state['profiler'] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        entries = [(name, pattern, None) for name, pattern in state['_entries']]
+        for index, (name, pattern, _) in enumerate(entries):
+            entries[index] = (name, pattern, _DeferredPattern(entries, index))
+        self._entries = entries
+
+    def __len__(self) -> int:
+        """Number of patterns, the length of the counts scan() returns"""
+        return len(self._entries)
+
+    def scan(self, text: str, max_examples: Optional[Dict[str, int]] = None
+             ) -> Tuple[List[int], List[list]]:
+        """
+        Walk the text once and count every pattern
+
+        Args:
+            text: Text to scan
+            max_examples: Optional mapping of category name to the number of
+                matched strings to keep per pattern
+
+        Returns:
+            Tuple of (per-entry match counts, per-entry example matches)
+        """
+        entries = self._entries
+        counts = [0] * len(entries)
+        examples: List[list] = [[] for _ in entries] if max_examples else []
+        if not text:
+            return counts, examples
+
+        profiler = self.profiler
+        if profiler is not None:
+            began = time.perf_counter()
+
+        limits = [max_examples.get(name, 0) for name, _, _ in entries] if max_examples else None
+        last_end = [0] * len(entries)
+        words = self._words
+        exact = self._exact
+        prefixed = self._prefixed
+
+        automaton = self._automaton
+        if automaton is not None:
+            goto, fail, outputs = automaton.goto, automaton.fail, automaton.outputs
+            edge_literals = self._edge_literals
+            token_starts: List[int] = []
+            state = 0
+            tokens = TOKEN_RE.finditer(fold_text(text))
+        else:
+            tokens = _WORD_RE.finditer(text)
+
+        for position, word in enumerate(tokens):
+            start = word.start()
+
+            if automaton is not None:
+                token = word.group()
+                token_starts.append(start)
+                while state and token not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(token, 0)
+                for index, length in outputs[state]:
+                    first = position - length + 1
+                    if first < last_end[index]:
+                        continue
+                    begin = token_starts[first]
+                    if index in edge_literals:
+                        left, right = edge_literals[index]
+                        if (left and begin == 0) or (right and word.end() == len(text)):
+                            continue
+                    counts[index] += 1
+                    last_end[index] = position + 1
+                    if limits and len(examples[index]) < limits[index]:
+                        examples[index].append(text[begin:word.end()])
+                if word.lastindex is None:
+                    continue
+            else:
+                token = fold_text(word.group())
+
+            for index in words.get(token, ()):
+                counts[index] += 1
+                if limits and len(examples[index]) < limits[index]:
+                    examples[index].append(text[start:word.end()])
+
+            candidates = exact.get(token, ())
+            if prefixed:
+                extra = [index for prefix, index in prefixed if token.startswith(prefix)]
+                if extra:
+                    candidates = list(candidates) + extra
+
+            for index in candidates:
+                if start < last_end[index]:
+                    continue
+                if profiler is None:
+                    match = entries[index][2].match(text, start)
+                else:
+                    match = profiler.match(self, index, text, start)
+                if match is None:
+                    continue
+                counts[index] += 1
+                last_end[index] = match.end()
+                if limits and len(examples[index]) < limits[index]:
+                    examples[index].append(_findall_item(match))
+
+        for index in self._fallback:
+            if profiler is None:
+                matches = entries[index][2].findall(text)
+            else:
+                matches = profiler.findall(self, index, text)
+            counts[index] = len(matches)
+            if limits and limits[index]:
+                examples[index] = matches[:limits[index]]
+
+        if profiler is not None:
+            profiler.record_scan(self, counts, time.perf_counter() - began)
+        return counts, examples
+
+    def count(self, text: str) -> Dict[str, int]:
+        """
+        Count pattern matches per category
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Dictionary of category name to total match count
+        """
+        counts, _ = self.scan(text)
+        return self.totals(counts)
+
+    def totals(self, counts: Sequence[int]) -> Dict[str, int]:
+        """Sum per-entry counts into per-category totals"""
+        totals = {name: 0 for name in self.categories}
+        for (name, _, _), count in zip(self._entries, counts):
+            totals[name] += count
+        return totals
+
+    def breakdown(self, text: str) -> Dict[str, Dict[str, int]]:
+        """
+        Get per-pattern match counts for each category
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Dictionary of category name to {pattern: count} for matched patterns
+        """
+        counts, _ = self.scan(text)
+        return self.breakdown_counts(counts)
+
+    def breakdown_counts(self, counts: Sequence[int]) -> Dict[str, Dict[str, int]]:
+        """Group per-entry counts into a breakdown, as returned by ``breakdown``"""
+        breakdown: Dict[str, Dict[str, int]] = {name: {} for name in self.categories}
+        for (name, pattern, _), count in zip(self._entries, counts):
+            if count > 0:
+                breakdown[name][pattern] = count
+        return breakdown
+
+    def examples(self, per_entry: List[list], max_examples: Dict[str, int]) -> Dict[str, list]:
+        """
+        Collect example matches per category in pattern order
+
+        Args:
+            per_entry: Example lists returned by ``scan``
+            max_examples: Mapping of category name to number of examples
+
+        Returns:
+            Dictionary of category name to example matches
+        """
+        collected: Dict[str, list] = {name: [] for name in max_examples}
+        for (name, _, _), found in zip(self._entries, per_entry):
+            if name not in collected:
+                continue
+            remaining = max_examples[name] - len(collected[name])
+            if remaining > 0:
+                collected[name].extend(found[:remaining])
+        return collected
+
+
+def matcher_key(categories: Dict[str, Sequence[str]]) -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+    """Hashable key identifying a pattern set, as used by ``get_matcher``"""
+    return tuple((name, tuple(patterns)) for name, patterns in categories.items())
+
+
+# Pickled matchers of the precompiled artifact by (key, backend), loaded on
+# the first get_matcher call; see artifact.py
+_artifact_matchers: Optional[Dict[tuple, bytes]] = None
+
+
+@lru_cache(maxsize=64)
+def _cached_matcher(key: Tuple[Tuple[str, Tuple[str, ...]], ...], backend: str) -> PatternMatcher:
+    global _artifact_matchers
+    if _artifact_matchers is None:
+        from .artifact import load_artifact  # artifact.py imports this module
+        _artifact_matchers = load_artifact()
+    data = _artifact_matchers.get((key, backend))
+    if data is not None:
+        return pickle.loads(data)
+    return PatternMatcher(dict(key), backend)
+
+
+def get_matcher(categories: Dict[str, Sequence[str]], backend: str = 'regex') -> PatternMatcher:
+    """
+    Return a shared compiled matcher for the given pattern categories
+
+    Args:
+        categories: Mapping of category name to list of regex patterns
+        backend: Matcher backend, see ``PatternMatcher``
+
+    Returns:
+        PatternMatcher compiled once per distinct pattern set and backend,
+        or loaded from the precompiled artifact when it holds this set
+    """
+    return _cached_matcher(matcher_key(categories), backend)
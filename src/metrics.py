@@ -2,9 +2,33 @@
 Metrics calculation for Welsh-Winters Balance Framework
 """
 
-from typing import List, Dict, Tuple, Optional
+from array import array
+from typing import Any, List, Dict, Sequence, Tuple, Optional
 from enum import Enum
 
+# NumPy is optional and only imported by the batch functions, on first use;
+# see load_numpy()
+_NOT_LOADED = object()
+np = _NOT_LOADED
+
+
+def load_numpy():
+    """
+    Import NumPy on first use
+    
+    Returns:
+        The numpy module, or None when it is not installed (batch functions
+        then fall back to pure Python)
+    """
+    global np
+    if np is _NOT_LOADED:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        np = numpy
+    return np
+
 
 class CollaborationPhase(Enum):
     """Phases of human-AI collaboration based on balance patterns"""
@@ -53,17 +77,18 @@ def phase_detector(balance: float) -> CollaborationPhase:
         return CollaborationPhase.UNKNOWN
 
 
-def calculate_trajectory(balances: List[float]) -> Dict[str, any]:
+def calculate_trajectory(balances: Sequence[float]) -> Dict[str, any]:
     """
     Calculate trajectory metrics from a series of balance measurements
     
     Args:
-        balances: List of balance scores over time
+        balances: List of balance scores over time (any sliceable sequence,
+            e.g. a TurnTable column slice)
         
     Returns:
         Dictionary with trajectory metrics
     """
-    if not balances:
+    if len(balances) == 0:
         return {
             'trend': 'neutral',
             'volatility': 0.0,
@@ -71,8 +96,8 @@ def calculate_trajectory(balances: List[float]) -> Dict[str, any]:
             'stability_score': 0.0
         }
     
-    # Calculate trend
-    if len(balances) > 1:
+    # Calculate trend (two balances leave the thirds empty)
+    if len(balances) > 2:
         start_avg = sum(balances[:len(balances)//3]) / (len(balances)//3)
         end_avg = sum(balances[-len(balances)//3:]) / (len(balances)//3)
         
@@ -107,9 +132,9 @@ def calculate_trajectory(balances: List[float]) -> Dict[str, any]:
         'volatility': volatility,
         'phases_detected': [phase.value for phase in phases_detected],
         'stability_score': stability_score,
-        'start_balance': balances[0] if balances else None,
-        'end_balance': balances[-1] if balances else None,
-        'average_balance': sum(balances) / len(balances) if balances else None
+        'start_balance': balances[0] if len(balances) else None,
+        'end_balance': balances[-1] if len(balances) else None,
+        'average_balance': sum(balances) / len(balances) if len(balances) else None
     }
 
 
@@ -140,4 +165,418 @@ def hallucination_risk_score(balance: float, volatility: float) -> float:
     
     risk_score = (balance_deviation + volatility_factor + extreme_factor) / 3
     
-    return min(max(risk_score, 0.0), 1.0)
\ No newline at end of file
+    return min(max(risk_score, 0.0), 1.0)
+
+
+def phase_progression(balances: Sequence[float]) -> List[Dict[str, Any]]:
+    """
+    Split a conversation into runs of turns in the same collaboration phase
+    
+    Args:
+        balances: Turn balances in conversation order
+        
+    Returns:
+        List of dictionaries with phase, start_turn, end_turn, duration and
+        average_balance, one per run
+    """
+    if len(balances) == 0:
+        return []
+    
+    phases = []
+    current_phase = None
+    phase_start = 0
+    
+    for i, balance in enumerate(balances):
+        phase = phase_detector(balance)
+        if phase != current_phase:
+            if current_phase:
+                phases.append({
+                    'phase': current_phase.value,
+                    'start_turn': phase_start,
+                    'end_turn': i - 1,
+                    'duration': i - phase_start,
+                    'average_balance': sum(balances[phase_start:i]) / (i - phase_start)
+                })
+            current_phase = phase
+            phase_start = i
+    
+    # Add final phase
+    if current_phase:
+        phases.append({
+            'phase': current_phase.value,
+            'start_turn': phase_start,
+            'end_turn': len(balances) - 1,
+            'duration': len(balances) - phase_start,
+            'average_balance': sum(balances[phase_start:]) / (len(balances) - phase_start)
+        })
+    
+    return phases
+
+
+def hadrael_compliance_level(corrections: int, uncertainty: int, total_turns: int) -> str:
+    """
+    Rate Hadrael Protocol compliance from correction and uncertainty counts
+    
+    Args:
+        corrections: Self-corrections and attributions across the turns
+        uncertainty: Uncertainty expressions across the turns
+        total_turns: Number of turns
+        
+    Returns:
+        'Excellent', 'Good', 'Fair', 'Needs Improvement' or 'Not Applicable'
+    """
+    if total_turns == 0:
+        return "Not Applicable"
+    
+    correction_rate = corrections / total_turns
+    uncertainty_rate = uncertainty / total_turns
+    
+    if correction_rate > 0.1 or uncertainty_rate > 0.2:
+        return "Excellent"
+    elif correction_rate > 0.05 or uncertainty_rate > 0.1:
+        return "Good"
+    elif correction_rate > 0.02 or uncertainty_rate > 0.05:
+        return "Fair"
+    else:
+        return "Needs Improvement"
+
+
+# Phases in the order used for batch phase codes and masks
+PHASE_ORDER = [
+    CollaborationPhase.FOUNDATION,
+    CollaborationPhase.DEVELOPMENT,
+    CollaborationPhase.MASTERY,
+    CollaborationPhase.UNKNOWN
+]
+
+# Phases reported by phases_detected / phase masks
+DETECTABLE_PHASES = PHASE_ORDER[:3]
+
+
+def phase_detector_batch(balances: Sequence[float]):
+    """
+    Detect collaboration phases for many balance scores at once
+    
+    Args:
+        balances: Sequence or array of balance scores
+        
+    Returns:
+        Integer phase codes (indexes into PHASE_ORDER); a NumPy int8 array
+        when NumPy is installed, otherwise a list
+    """
+    if load_numpy() is None:
+        return [PHASE_ORDER.index(phase_detector(balance)) for balance in balances]
+    
+    values = np.asarray(balances, dtype=np.float64)
+    codes = np.full(values.shape, PHASE_ORDER.index(CollaborationPhase.UNKNOWN), dtype=np.int8)
+    # Same precedence as phase_detector: later ranges only fill what is left
+    for code, (low, high) in reversed(list(enumerate([(0.54, 0.58), (0.74, 0.86), (0.70, 0.81)]))):
+        codes[(values >= low) & (values <= high)] = code
+    return codes
+
+
+def hallucination_risk_score_batch(balances: Sequence[float], volatilities: Sequence[float]):
+    """
+    Calculate hallucination risk for many (balance, volatility) pairs
+    
+    Args:
+        balances: Balance scores
+        volatilities: Matching volatility measures
+        
+    Returns:
+        Risk scores between 0.0 and 1.0, as a NumPy array when NumPy is
+        installed, otherwise a list
+    """
+    if load_numpy() is None:
+        return [hallucination_risk_score(b, v) for b, v in zip(balances, volatilities)]
+    
+    balance = np.asarray(balances, dtype=np.float64)
+    volatility = np.asarray(volatilities, dtype=np.float64)
+    balance_deviation = np.abs(balance - 0.6)
+    volatility_factor = np.minimum(volatility * 2, 1.0)
+    extreme_factor = np.where((balance < 0.2) | (balance > 0.9), 0.5, 0.0)
+    risk_score = (balance_deviation + volatility_factor + extreme_factor) / 3
+    return np.clip(risk_score, 0.0, 1.0)
+
+
+def calculate_trajectory_batch(
+    balances: Any,
+    offsets: Optional[Sequence[int]] = None,
+    lengths: Optional[Sequence[int]] = None
+) -> Dict[str, Any]:
+    """
+    Calculate trajectory metrics for many conversations in one call
+    
+    Conversations are given either as a 2-D array (one row per
+    conversation, with ``lengths`` giving the used width of padded rows) or
+    as one flat sequence of balances split by ``offsets``, where
+    conversation ``i`` is ``balances[offsets[i]:offsets[i + 1]]``.
+    
+    Results match calculate_trajectory row by row.
+    
+    Args:
+        balances: 2-D array of balances, or flat sequence with ``offsets``
+        offsets: Row boundaries into a flat ``balances`` (length rows + 1)
+        lengths: Number of valid balances in each row of a 2-D array
+        
+    Returns:
+        Dictionary of per-conversation columns: 'length', 'trend',
+        'volatility', 'stability_score', 'start_balance', 'end_balance',
+        'average_balance', 'risk_score', 'phase_mask' (rows x 3, in
+        DETECTABLE_PHASES order) and 'phases_detected' (lists of phase names
+        in order of first appearance). Columns are NumPy arrays when NumPy is
+        installed, otherwise lists.
+    """
+    if load_numpy() is None:
+        return _calculate_trajectory_rows(_split_rows(balances, offsets, lengths))
+    
+    values, offsets = _flatten_rows(balances, offsets, lengths)
+    starts = offsets[:-1]
+    ends = offsets[1:]
+    counts = ends - starts
+    has_data = counts > 0
+    
+    cumulative = np.concatenate(([0.0], np.cumsum(values)))
+    
+    # Trend: first third against last third, with calculate_trajectory's
+    # slice lengths (floor and ceil of n / 3) and floor(n / 3) divisor
+    third = counts // 3
+    tail = -(-counts // 3)
+    divisor = np.where(third > 0, third, 1)
+    start_avg = (cumulative[starts + third] - cumulative[starts]) / divisor
+    end_avg = (cumulative[ends] - cumulative[np.maximum(ends - tail, starts)]) / divisor
+    # Prefix-sum differences carry rounding error; rows too close to the 0.1
+    # threshold re-sum their thirds exactly as calculate_trajectory does (rare)
+    close = np.flatnonzero((third > 0) & (np.abs(np.abs(end_avg - start_avg) - 0.1) < 1e-9))
+    for row in close:
+        start, end, size = int(starts[row]), int(ends[row]), int(third[row])
+        start_avg[row] = sum(values[start:start + size].tolist()) / size
+        end_avg[row] = sum(values[end - int(tail[row]):end].tolist()) / size
+    trend = np.full(counts.shape, 'stable', dtype='<U17')
+    trend[end_avg > start_avg + 0.1] = 'technical_shift'
+    trend[end_avg < start_avg - 0.1] = 'emotional_shift'
+    trend[third == 0] = 'insufficient_data'
+    trend[counts == 0] = 'neutral'
+    
+    # Volatility: mean absolute step, excluding steps across row boundaries
+    steps = np.concatenate(([0.0], np.cumsum(np.abs(np.diff(values))))) if len(values) else np.zeros(1)
+    step_ends = np.maximum(ends - 1, starts)
+    step_sums = steps[np.minimum(step_ends, len(steps) - 1)] - steps[np.minimum(starts, len(steps) - 1)]
+    volatility = np.where(counts > 1, step_sums / np.maximum(counts - 1, 1), 0.0)
+    stability_score = np.maximum(0.0, 1 - volatility * 10)
+    
+    average_balance = np.where(has_data, (cumulative[ends] - cumulative[starts]) / np.maximum(counts, 1), np.nan)
+    start_balance = np.where(has_data, values[np.minimum(starts, len(values) - 1)] if len(values) else np.nan, np.nan)
+    end_balance = np.where(has_data, values[np.maximum(ends - 1, 0)] if len(values) else np.nan, np.nan)
+    
+    # Phases: first position of each detectable phase within each row
+    codes = phase_detector_batch(values)
+    first_seen = np.full((len(counts), len(DETECTABLE_PHASES)), -1, dtype=np.int64)
+    for code in range(len(DETECTABLE_PHASES)):
+        positions = np.flatnonzero(codes == code)
+        if not len(positions):
+            continue
+        found = np.searchsorted(positions, starts)
+        in_row = found < len(positions)
+        in_row[in_row] = positions[found[in_row]] < ends[in_row]
+        first_seen[in_row, code] = positions[found[in_row]] - starts[in_row]
+    phase_mask = first_seen >= 0
+    
+    phases_detected = []
+    for row in first_seen:
+        seen = [(position, code) for code, position in enumerate(row) if position >= 0]
+        phases_detected.append([DETECTABLE_PHASES[code].value for _, code in sorted(seen)])
+    
+    risk_score = np.where(has_data, hallucination_risk_score_batch(
+        np.nan_to_num(average_balance), volatility), np.nan)
+    
+    return {
+        'length': counts,
+        'trend': trend,
+        'volatility': volatility,
+        'stability_score': np.where(has_data, stability_score, 0.0),
+        'start_balance': start_balance,
+        'end_balance': end_balance,
+        'average_balance': average_balance,
+        'risk_score': risk_score,
+        'phase_mask': phase_mask,
+        'phases_detected': phases_detected
+    }
+
+
+def _flatten_rows(balances, offsets, lengths):
+    """Normalize batch input to a flat float64 array and int64 offsets"""
+    if offsets is not None:
+        values = np.asarray(balances, dtype=np.float64).ravel()
+        return values, np.asarray(offsets, dtype=np.int64)
+    
+    matrix = np.asarray(balances, dtype=np.float64)
+    if matrix.ndim != 2:
+        raise ValueError("balances must be 2-D unless offsets are given")
+    if lengths is None:
+        lengths = np.full(matrix.shape[0], matrix.shape[1], dtype=np.int64)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    mask = np.arange(matrix.shape[1]) < lengths[:, None]
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+    return matrix[mask], offsets
+
+
+def _split_rows(balances, offsets, lengths) -> List[List[float]]:
+    """Normalize batch input to a list of Python lists"""
+    if offsets is not None:
+        flat = list(balances)
+        return [flat[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+    rows = [list(row) for row in balances]
+    if lengths is not None:
+        rows = [row[:length] for row, length in zip(rows, lengths)]
+    return rows
+
+
+def _calculate_trajectory_rows(rows: List[List[float]]) -> Dict[str, Any]:
+    """Pure-Python calculate_trajectory_batch used without NumPy"""
+    keys = ['trend', 'volatility', 'stability_score', 'start_balance',
+            'end_balance', 'average_balance', 'phases_detected']
+    columns = {key: [] for key in ['length'] + keys + ['risk_score', 'phase_mask']}
+    
+    for row in rows:
+        trajectory = calculate_trajectory(row)
+        columns['length'].append(len(row))
+        for key in keys:
+            columns[key].append(trajectory.get(key))
+        columns['risk_score'].append(
+            hallucination_risk_score(trajectory['average_balance'], trajectory['volatility'])
+            if row else None
+        )
+        columns['phase_mask'].append(
+            [phase.value in trajectory['phases_detected'] for phase in DETECTABLE_PHASES]
+        )
+    
+    return columns
+
+
+class TrajectoryAccumulator:
+    """
+    Incremental trajectory metrics for a conversation in progress
+    
+    Balances are added one at a time with update(); trend, volatility,
+    stability, phases seen and risk are then available in constant time.
+    Running sums stand in for the slices calculate_trajectory re-sums (the
+    thirds are only re-summed when the trend sits on its 0.1 threshold), so
+    results match it up to floating-point rounding.
+    
+    The balances themselves are kept in a compact array because the first
+    and last thirds move as the conversation grows.
+    """
+    
+    def __init__(self, balances: Sequence[float] = ()):
+        self.balances = array('d')
+        self._start_sum = 0.0   # sum of the first floor(n / 3) balances
+        self._end_sum = 0.0     # sum of the last ceil(n / 3) balances
+        self._total = 0.0
+        self._step_sum = 0.0
+        self._phases: List[CollaborationPhase] = []
+        for balance in balances:
+            self.update(balance)
+    
+    def __len__(self) -> int:
+        return len(self.balances)
+    
+    def update(self, balance: float) -> 'TrajectoryAccumulator':
+        """
+        Add the next balance of the conversation
+        
+        Args:
+            balance: Welsh-Winters Balance of the latest turn
+            
+        Returns:
+            The accumulator, for chaining
+        """
+        balances = self.balances
+        count = len(balances)
+        if count:
+            self._step_sum += abs(balance - balances[-1])
+        balances.append(balance)
+        self._total += balance
+        
+        new_count = count + 1
+        if new_count % 3 == 0:
+            self._start_sum += balances[new_count // 3 - 1]
+        self._end_sum += balance
+        if new_count % 3 != 1:
+            # ceil(n / 3) did not grow: the oldest balance leaves the last third
+            self._end_sum -= balances[count - (-(-count // 3))]
+        
+        phase = phase_detector(balance)
+        if phase != CollaborationPhase.UNKNOWN and phase not in self._phases:
+            self._phases.append(phase)
+        return self
+    
+    @property
+    def trend(self) -> str:
+        count = len(self.balances)
+        if count == 0:
+            return 'neutral'
+        third = count // 3
+        if third == 0:
+            return 'insufficient_data'
+        start_avg = self._start_sum / third
+        end_avg = self._end_sum / third
+        if abs(abs(end_avg - start_avg) - 0.1) < 1e-9:
+            # Too close to the threshold for running sums: re-sum the thirds
+            # exactly as calculate_trajectory does (rare)
+            start_avg = sum(self.balances[:third]) / third
+            end_avg = sum(self.balances[-count//3:]) / third
+        if end_avg > start_avg + 0.1:
+            return 'technical_shift'
+        elif end_avg < start_avg - 0.1:
+            return 'emotional_shift'
+        return 'stable'
+    
+    @property
+    def volatility(self) -> float:
+        count = len(self.balances)
+        return self._step_sum / (count - 1) if count > 1 else 0.0
+    
+    @property
+    def stability_score(self) -> float:
+        return max(0, 1 - (self.volatility * 10))
+    
+    @property
+    def average_balance(self) -> Optional[float]:
+        return self._total / len(self.balances) if self.balances else None
+    
+    @property
+    def phases_detected(self) -> List[str]:
+        return [phase.value for phase in self._phases]
+    
+    @property
+    def risk_score(self) -> Optional[float]:
+        """Hallucination risk of the average balance and volatility so far"""
+        if not self.balances:
+            return None
+        return hallucination_risk_score(self.average_balance, self.volatility)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Current metrics in calculate_trajectory's format
+        
+        Returns:
+            Dictionary with trajectory metrics plus 'risk_score'
+        """
+        if not self.balances:
+            return {
+                'trend': 'neutral',
+                'volatility': 0.0,
+                'phases_detected': [],
+                'stability_score': 0.0
+            }
+        return {
+            'trend': self.trend,
+            'volatility': self.volatility,
+            'phases_detected': self.phases_detected,
+            'stability_score': self.stability_score,
+            'start_balance': self.balances[0],
+            'end_balance': self.balances[-1],
+            'average_balance': self.average_balance,
+            'risk_score': self.risk_score
+        }
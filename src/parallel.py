@@ -0,0 +1,161 @@
+"""
+Process pool helpers for batch Welsh-Winters analysis
+
+Each worker process builds its own analyzer once, in the pool initializer,
+so pattern compilation is paid per worker rather than per item.  Items are
+sent in chunks and results are yielded in input order while only a bounded
+number of chunks is in flight, so arbitrarily long inputs can be streamed.
+imap_unordered instead sends items one at a time and yields them as they
+finish, for large uneven items such as whole files.
+"""
+
+import os
+from collections import deque
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+# Analyzer owned by the current worker process
+_worker_analyzer = None
+
+
+def _init_worker(factory: Callable[..., Any], kwargs: Dict[str, Any]):
+    """Pool initializer: build the worker's analyzer once"""
+    global _worker_analyzer
+    _worker_analyzer = factory(**kwargs)
+
+
+def _run_chunk(method: str, chunk: List[Any]) -> List[Any]:
+    """Apply an analyzer method to every item of a chunk"""
+    run = getattr(_worker_analyzer, method)
+    return [run(item) for item in chunk]
+
+
+def _run_item(method: str, item: Any) -> Any:
+    """Apply an analyzer method to one item"""
+    return getattr(_worker_analyzer, method)(item)
+
+
+def _chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Split an iterable into lists of at most ``size`` items"""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def resolve_workers(workers: Optional[int]) -> int:
+    """Translate a ``workers`` argument into a process count"""
+    if workers is None:
+        return os.cpu_count() or 1
+    return max(1, workers)
+
+
+def imap_ordered(
+    factory: Callable[..., Any],
+    kwargs: Dict[str, Any],
+    method: str,
+    items: Iterable[Any],
+    workers: Optional[int] = None,
+    chunksize: int = 64,
+    max_pending: Optional[int] = None
+) -> Iterator[Any]:
+    """
+    Run an analyzer method over items on a warm process pool
+
+    Args:
+        factory: Picklable callable building the analyzer (usually its class)
+        kwargs: Keyword arguments for ``factory``
+        method: Name of the analyzer method applied to each item
+        items: Items to analyze; consumed lazily
+        workers: Number of processes (None for all cores, 1 to stay in-process)
+        chunksize: Number of items sent to a worker at a time
+        max_pending: Maximum chunks in flight (defaults to twice ``workers``)
+
+    Yields:
+        Method results, in the same order as ``items``
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+
+    workers = resolve_workers(workers)
+    if workers == 1:
+        run = getattr(factory(**kwargs), method)
+        for item in items:
+            yield run(item)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor  # Only needed with workers
+
+    max_pending = max_pending or workers * 2
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(factory, kwargs)) as executor:
+        pending = deque()
+        try:
+            for chunk in _chunked(items, chunksize):
+                pending.append(executor.submit(_run_chunk, method, chunk))
+                if len(pending) >= max_pending:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            # Consumer stopped early or a chunk failed: drop queued work
+            for future in pending:
+                future.cancel()
+
+
+def imap_unordered(
+    factory: Callable[..., Any],
+    kwargs: Dict[str, Any],
+    method: str,
+    items: Iterable[Any],
+    workers: Optional[int] = None,
+    max_pending: Optional[int] = None
+) -> Iterator[Tuple[Any, Any]]:
+    """
+    Run an analyzer method over items on a warm process pool, in completion order
+
+    Items are submitted one by one in the order given, so the caller decides
+    the schedule; submitting the largest items first keeps one slow item
+    from finishing alone at the end.
+
+    Args:
+        factory: Picklable callable building the analyzer (usually its class)
+        kwargs: Keyword arguments for ``factory``
+        method: Name of the analyzer method applied to each item
+        items: Items to analyze; consumed lazily
+        workers: Number of processes (None for all cores, 1 to stay in-process)
+        max_pending: Maximum items in flight (defaults to twice ``workers``)
+
+    Yields:
+        (item, result) pairs as each item finishes
+    """
+    workers = resolve_workers(workers)
+    if workers == 1:
+        run = getattr(factory(**kwargs), method)
+        for item in items:
+            yield item, run(item)
+        return
+
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    max_pending = max_pending or workers * 2
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(factory, kwargs)) as executor:
+        pending: Dict[Any, Any] = {}
+        try:
+            for item in items:
+                pending[executor.submit(_run_item, method, item)] = item
+                while len(pending) >= max_pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield pending.pop(future), future.result()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result()
+        finally:
+            for future in pending:
+                future.cancel()
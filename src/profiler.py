@@ -0,0 +1,175 @@
+"""
+Opt-in per-pattern cost and hit-rate profiling
+
+A PatternProfiler attached to a PatternMatcher times the work the matcher
+does on behalf of each pattern: confirming a candidate position with the
+compiled regex, or running ``findall`` for patterns without a literal
+prefix.  It also counts invocations, matches and the texts each pattern
+matched in.  Whole-word literals (and automaton-backend literals) are
+matched by a dictionary lookup during tokenization, so they show up with
+hits but no time of their own; that shared work is reported as dispatch
+time.
+
+Matchers are shared between analyzers with the same pattern set, so a
+profiler sees every scan made through them while attached.
+
+Example:
+    >>> profiler = PatternProfiler()
+    >>> with profiler.profiling(analyzer):
+    ...     analyzer.analyze_conversation_file('chat.txt')
+    >>> print(profiler.format_report(top=10))
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+class PatternProfiler:
+    """Accumulates per-pattern match time, invocations and hits"""
+
+    def __init__(self):
+        # id(matcher) -> (matcher, [seconds], [calls], [hits], [texts matched])
+        self._matchers: Dict[int, Tuple[Any, List[float], List[int], List[int], List[int]]] = {}
+        self.scans = 0
+        self.scan_time = 0.0
+
+    def attach(self, target: Any):
+        """
+        Start profiling a matcher
+
+        Args:
+            target: PatternMatcher, or an analyzer with a ``matcher`` attribute
+        """
+        matcher = getattr(target, 'matcher', target)
+        if id(matcher) not in self._matchers:
+            size = len(matcher)
+            self._matchers[id(matcher)] = (matcher, [0.0] * size, [0] * size, [0] * size, [0] * size)
+        matcher.profiler = self
+
+    def detach(self, target: Any):
+        """Stop profiling a matcher; its statistics are kept"""
+        matcher = getattr(target, 'matcher', target)
+        if matcher.profiler is self:
+            matcher.profiler = None
+
+    @contextmanager
+    def profiling(self, *targets: Any) -> Iterator['PatternProfiler']:
+        """Profile the given matchers or analyzers for the duration of a block"""
+        for target in targets:
+            self.attach(target)
+        try:
+            yield self
+        finally:
+            for target in targets:
+                self.detach(target)
+
+    def match(self, matcher: Any, index: int, text: str, start: int):
+        """Confirm a candidate position, timing it against the pattern"""
+        _, seconds, calls, _, _ = self._matchers[id(matcher)]
+        clock = time.perf_counter
+        began = clock()
+        match = matcher._entries[index][2].match(text, start)
+        seconds[index] += clock() - began
+        calls[index] += 1
+        return match
+
+    def findall(self, matcher: Any, index: int, text: str) -> list:
+        """Run a fallback pattern over the text, timing it against the pattern"""
+        _, seconds, calls, _, _ = self._matchers[id(matcher)]
+        clock = time.perf_counter
+        began = clock()
+        matches = matcher._entries[index][2].findall(text)
+        seconds[index] += clock() - began
+        calls[index] += 1
+        return matches
+
+    def record_scan(self, matcher: Any, counts: List[int], elapsed: float):
+        """Add the hits of one finished scan"""
+        _, _, _, hits, texts = self._matchers[id(matcher)]
+        for index, count in enumerate(counts):
+            if count:
+                hits[index] += count
+                texts[index] += 1
+        self.scans += 1
+        self.scan_time += elapsed
+
+    def reset(self):
+        """Clear the statistics of every attached matcher"""
+        for key, (matcher, seconds, _, _, _) in list(self._matchers.items()):
+            size = len(seconds)
+            self._matchers[key] = (matcher, [0.0] * size, [0] * size, [0] * size, [0] * size)
+        self.scans = 0
+        self.scan_time = 0.0
+
+    def report(self, sort: str = 'time') -> List[Dict[str, Any]]:
+        """
+        Per-pattern statistics, ranked
+
+        Patterns shared by several profiled matchers are merged.
+
+        Args:
+            sort: 'time', 'calls' or 'hits' (descending)
+
+        Returns:
+            List of dictionaries with category, pattern, time_s, calls,
+            hits, texts_matched and time_per_call_us
+        """
+        if sort not in ('time', 'calls', 'hits'):
+            raise ValueError("sort must be 'time', 'calls' or 'hits'")
+
+        rows: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for matcher, seconds, calls, hits, texts in self._matchers.values():
+            for index, (category, pattern, _) in enumerate(matcher._entries):
+                row = rows.setdefault((category, pattern), {
+                    'category': category, 'pattern': pattern,
+                    'time_s': 0.0, 'calls': 0, 'hits': 0, 'texts_matched': 0
+                })
+                row['time_s'] += seconds[index]
+                row['calls'] += calls[index]
+                row['hits'] += hits[index]
+                row['texts_matched'] += texts[index]
+
+        for row in rows.values():
+            row['time_per_call_us'] = row['time_s'] / row['calls'] * 1e6 if row['calls'] else 0.0
+        key = {'time': 'time_s', 'calls': 'calls', 'hits': 'hits'}[sort]
+        return sorted(rows.values(), key=lambda row: (-row[key], row['category'], row['pattern']))
+
+    def never_matched(self) -> List[Tuple[str, str]]:
+        """(category, pattern) pairs with no hits in any profiled scan"""
+        return [(row['category'], row['pattern']) for row in self.report() if not row['hits']]
+
+    @property
+    def pattern_time(self) -> float:
+        """Seconds spent in pattern-specific work"""
+        return sum(sum(seconds) for _, seconds, _, _, _ in self._matchers.values())
+
+    def format_report(self, top: Optional[int] = 20, sort: str = 'time') -> str:
+        """
+        Render a ranked text report
+
+        Args:
+            top: Number of patterns listed (None for all)
+            sort: Ranking key, as for report()
+
+        Returns:
+            Multi-line report
+        """
+        rows = self.report(sort)
+        dispatch = max(0.0, self.scan_time - self.pattern_time)
+        lines = [
+            f"{self.scans} scans, {self.scan_time * 1000:.1f} ms total "
+            f"({self.pattern_time * 1000:.1f} ms in pattern matching, "
+            f"{dispatch * 1000:.1f} ms in tokenization and dispatch)",
+            f"{'time ms':>9} {'calls':>8} {'hits':>8} {'us/call':>8}  category / pattern",
+        ]
+        for row in rows[:top] if top is not None else rows:
+            lines.append(
+                f"{row['time_s'] * 1000:>9.2f} {row['calls']:>8} {row['hits']:>8} "
+                f"{row['time_per_call_us']:>8.2f}  {row['category']} / {row['pattern']}"
+            )
+        unmatched = self.never_matched()
+        if unmatched:
+            lines.append(f"{len(unmatched)} patterns never matched:")
+            lines.extend(f"    {category} / {pattern}" for category, pattern in unmatched)
+        return '\n'.join(lines)
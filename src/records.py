@@ -0,0 +1,147 @@
+"""
+Compact per-turn result records
+
+Conversation analyses hold one result per turn, and a dict per turn costs
+several hundred bytes before counting its values.  The records here keep
+their fields in ``__slots__`` instead and only render the familiar dict
+shape on demand.  They are read-only Mappings, so existing code indexing
+them like dicts (``turn['balance']``, ``turn.get('speaker')``) and
+comparisons against dicts keep working; use ``to_dict()`` (or ``to_builtin``
+for a whole result) where a real dict is needed, e.g. for ``json.dumps``.
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+
+# Example category name tuples, shared by every record using them
+_EXAMPLE_NAMES: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+class Record(Mapping):
+    """Read-only Mapping view over a record's slots"""
+
+    __slots__ = ()
+    _fields: Tuple[str, ...] = ()
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._fields:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self._fields)
+        return f'{type(self).__name__}({fields})'
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Render the record as the dict analyzers used to return"""
+        return {name: to_builtin(getattr(self, name)) for name in self._fields}
+
+
+class TurnBalance(Record):
+    """One entry of BalanceAnalyzer.analyze_conversation()['turn_balances']"""
+
+    __slots__ = ('turn', 'role', 'balance', 'technical', 'emotional')
+    _fields = __slots__
+
+    def __init__(self, turn: int, role: str, balance: float, technical: int, emotional: int):
+        self.turn = turn
+        self.role = role
+        self.balance = balance
+        self.technical = technical
+        self.emotional = emotional
+
+
+class TurnAnalysis(Record):
+    """One entry of ComprehensiveAnalyzer results' 'turn_analysis'"""
+
+    __slots__ = ('turn_index', 'speaker', 'text_length', 'balance', 'phase',
+                 'technical_count', 'emotional_count', 'uncertainty_count',
+                 'memory_count', 'hadrael_count', 'balance_awareness_count',
+                 '_example_names', '_example_values')
+    _fields = __slots__[:-2] + ('examples',)
+
+    def __init__(self, turn_index: int, speaker: str, text_length: int, balance: float,
+                 phase: str, technical_count: int, emotional_count: int,
+                 uncertainty_count: int, memory_count: int, hadrael_count: int,
+                 balance_awareness_count: int, examples: Dict[str, Sequence[Any]]):
+        self.turn_index = turn_index
+        self.speaker = speaker
+        self.text_length = text_length
+        self.balance = balance
+        self.phase = phase
+        self.technical_count = technical_count
+        self.emotional_count = emotional_count
+        self.uncertainty_count = uncertainty_count
+        self.memory_count = memory_count
+        self.hadrael_count = hadrael_count
+        self.balance_awareness_count = balance_awareness_count
+        # Category names are shared between turns, and example strings are
+        # interned since the same few words recur across turns
+        names = tuple(examples)
+        self._example_names = _EXAMPLE_NAMES.setdefault(names, names)
+        self._example_values = tuple(
+            tuple(sys.intern(match) if type(match) is str else match for match in found) if found else ()
+            for found in examples.values()
+        )
+
+    @property
+    def examples(self) -> Dict[str, List[Any]]:
+        """Example matches per category, as a fresh dict of lists"""
+        return {name: list(found) for name, found in zip(self._example_names, self._example_values)}
+
+
+class TextScore(Record):
+    """BalanceAnalyzer.score_text() result: the balance and the counts behind it"""
+
+    __slots__ = ('balance', 'technical', 'emotional', 'approximate', 'scanned_chars', 'total_chars')
+    _fields = __slots__
+
+    def __init__(self, balance: float, technical: int, emotional: int, approximate: bool,
+                 scanned_chars: int, total_chars: int):
+        self.balance = balance
+        self.technical = technical
+        self.emotional = emotional
+        self.approximate = approximate
+        self.scanned_chars = scanned_chars
+        self.total_chars = total_chars
+
+
+def to_builtin(value: Any) -> Any:
+    """
+    Replace records inside a result with plain dicts
+
+    Args:
+        value: Analysis result, possibly nesting records in dicts and lists
+
+    Returns:
+        The same structure built from dicts and lists only
+    """
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, dict):
+        return {key: to_builtin(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [to_builtin(item) for item in value]
+    return value
+
+
+def json_default(value: Any) -> Any:
+    """``default`` hook letting ``json.dumps`` serialize records"""
+    if isinstance(value, Record):
+        return value.to_dict()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
@@ -0,0 +1,175 @@
+"""
+Corpus-level reports over many analyzed conversations
+
+A CorpusReport takes ComprehensiveAnalyzer results (or their
+AnalysisSummary) one at a time, in any order, and keeps only running
+totals, so a directory of tens of thousands of transcripts can be
+summarized while its per-file results stream past.  Counts are integers and
+balance sums are kept as exact partials (as in math.fsum), so the same
+conversations give the same report in whatever order they are added; only
+the list of failed files follows the order they were added in.
+"""
+
+import math
+from typing import Any, Dict, List
+
+from .metrics import calculate_balance, hadrael_compliance_level
+from .summary import AnalysisSummary
+
+
+class CorpusReport:
+    """
+    Combined metrics of many conversations
+
+    Conversation files without turn structure (raw analyses) add their
+    pattern counts to the totals but no turns.
+
+    Example:
+        >>> report = CorpusReport()
+        >>> for result in analyzer.iter_directory('transcripts/'):
+        ...     report.add(result)
+        >>> report.to_dict()['overall_metrics']['overall_balance']
+    """
+
+    def __init__(self):
+        self.conversations = 0
+        self.raw_conversations = 0
+        self.failed: List[Dict[str, str]] = []
+        self.total_turns = 0
+        self.technical = 0
+        self.emotional = 0
+        self.uncertainty = 0
+        self.memory = 0
+        self.hadrael = 0
+        self.balance_partials: List[float] = []
+        # phase -> conversations, segments, turns and balance partials over its segments
+        self.phases: Dict[str, Dict[str, Any]] = {}
+        self.final_phases: Dict[str, int] = {}
+        self.trends: Dict[str, int] = {}
+
+    def add(self, result: Dict[str, Any]):
+        """
+        Fold one conversation's result into the report
+
+        Args:
+            result: analyze_conversation_file or analyze_messages result, or
+                a dict with 'file_path' and 'error' for a file that could
+                not be analyzed
+        """
+        if 'error' in result:
+            self.failed.append({'file_path': result.get('file_path'), 'error': result['error']})
+            return
+
+        if result.get('raw_analysis'):
+            self.conversations += 1
+            self.raw_conversations += 1
+            self.technical += result['technical_count']
+            self.emotional += result['emotional_count']
+            return
+
+        self.add_summary(AnalysisSummary.from_turns(result['turn_analysis']))
+
+    def add_summary(self, summary: AnalysisSummary):
+        """
+        Fold one conversation into the report
+
+        Args:
+            summary: AnalysisSummary of the conversation's turns
+        """
+        results = summary.to_results()
+        self.conversations += 1
+        self.total_turns += len(summary)
+        self.technical += summary.technical
+        self.emotional += summary.emotional
+        self.uncertainty += summary.uncertainty
+        self.memory += summary.memory
+        self.hadrael += summary.hadrael
+        _add_exact(self.balance_partials, sum(summary.balances))
+        trend = results['overall_metrics']['trajectory']['trend']
+        self.trends[trend] = self.trends.get(trend, 0) + 1
+
+        progression = results['phase_progression']
+        for phase in {segment['phase'] for segment in progression}:
+            self._phase(phase)['conversations'] += 1
+        for segment in progression:
+            stats = self._phase(segment['phase'])
+            stats['segments'] += 1
+            stats['turns'] += segment['duration']
+            _add_exact(stats['balance_partials'], segment['average_balance'] * segment['duration'])
+        if progression:
+            final = progression[-1]['phase']
+            self.final_phases[final] = self.final_phases.get(final, 0) + 1
+
+    def _phase(self, phase: str) -> Dict[str, Any]:
+        stats = self.phases.get(phase)
+        if stats is None:
+            stats = self.phases[phase] = {'conversations': 0, 'segments': 0, 'turns': 0,
+                                          'balance_partials': []}
+        return stats
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Render the combined report
+
+        Returns:
+            Dictionary with the 'conversations' and 'raw_conversations'
+            counts (conversations, not files: an archive holds many), failed
+            files, total_turns, overall_metrics, hadrael_compliance (shaped
+            like the per-file results) and per-phase progression statistics
+        """
+        turns = self.total_turns
+        return {
+            'conversations': self.conversations,
+            'raw_conversations': self.raw_conversations,
+            'failed': list(self.failed),
+            'total_turns': turns,
+            'overall_metrics': {
+                'overall_balance': calculate_balance(self.technical, self.emotional),
+                'average_turn_balance': math.fsum(self.balance_partials) / turns if turns else 0.5,
+                'total_technical_patterns': self.technical,
+                'total_emotional_patterns': self.emotional,
+                'uncertainty_expressions': self.uncertainty,
+                'memory_references': self.memory,
+                'hadrael_corrections': self.hadrael,
+                'trajectory_trends': dict(self.trends)
+            },
+            'hadrael_compliance': {
+                'attribution_score': self.hadrael / turns if turns else 0,
+                'uncertainty_expression_rate': self.uncertainty / turns if turns else 0,
+                'memory_persistence_rate': self.memory / turns if turns else 0,
+                'compliance_level': hadrael_compliance_level(self.hadrael, self.uncertainty, turns)
+            },
+            'phase_progression': {
+                phase: {
+                    'conversations': stats['conversations'],
+                    'segments': stats['segments'],
+                    'turns': stats['turns'],
+                    'turn_share': stats['turns'] / turns if turns else 0.0,
+                    'average_duration': stats['turns'] / stats['segments'],
+                    'average_balance': (math.fsum(stats['balance_partials']) / stats['turns']
+                                        if stats['turns'] else 0.5)
+                }
+                for phase, stats in self.phases.items()
+            },
+            'final_phases': dict(self.final_phases)
+        }
+
+
+def _add_exact(partials: List[float], value: float):
+    """
+    Add a value to non-overlapping partial sums whose math.fsum is exact
+
+    Shewchuk's algorithm, as in math.fsum: the partials represent the sum
+    without rounding, so it does not depend on the order values are added.
+    """
+    count = 0
+    for partial in partials:
+        if abs(value) < abs(partial):
+            value, partial = partial, value
+        high = value + partial
+        low = partial - (high - value)
+        if low:
+            partials[count] = low
+            count += 1
+        value = high
+    partials[count:] = [value]
@@ -0,0 +1,173 @@
+"""
+Rolling-window Welsh-Winters Balance for live conversations
+
+A RollingBalance keeps the technical and emotional counts of the most
+recent turns in one or more windows at once: the last N turns and/or the
+last N tokens.  Each window holds a queue of per-turn counts with running
+totals, so adding a turn costs O(1) per window (amortized for token
+windows) no matter how large the window is.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, Optional, Tuple
+
+from .analyzer import BalanceAnalyzer
+from .metrics import calculate_balance
+
+
+def count_tokens(text: str) -> int:
+    """Number of whitespace-separated tokens in a text"""
+    return len(text.split())
+
+
+class _TurnWindow:
+    """Counts of the last ``size`` turns"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.entries = deque()
+        self.technical = 0
+        self.emotional = 0
+        self.tokens = 0
+
+    def add(self, technical: int, emotional: int, tokens: int):
+        self.entries.append((technical, emotional, tokens))
+        self.technical += technical
+        self.emotional += emotional
+        self.tokens += tokens
+        if len(self.entries) > self.size:
+            old_technical, old_emotional, old_tokens = self.entries.popleft()
+            self.technical -= old_technical
+            self.emotional -= old_emotional
+            self.tokens -= old_tokens
+
+    def totals(self) -> Tuple[float, float, int, float]:
+        return self.technical, self.emotional, len(self.entries), self.tokens
+
+
+class _TokenWindow(_TurnWindow):
+    """
+    Counts of the last ``size`` tokens
+
+    Whole turns leave the window once the newer turns alone fill it; the
+    oldest turn is usually only partly inside, and contributes its counts
+    pro rata to the share of its tokens that is.
+    """
+
+    def add(self, technical: int, emotional: int, tokens: int):
+        self.entries.append((technical, emotional, tokens))
+        self.technical += technical
+        self.emotional += emotional
+        self.tokens += tokens
+        while len(self.entries) > 1 and self.tokens - self.entries[0][2] >= self.size:
+            old_technical, old_emotional, old_tokens = self.entries.popleft()
+            self.technical -= old_technical
+            self.emotional -= old_emotional
+            self.tokens -= old_tokens
+
+    def totals(self) -> Tuple[float, float, int, float]:
+        excess = self.tokens - self.size
+        if excess <= 0:
+            return self.technical, self.emotional, len(self.entries), self.tokens
+        old_technical, old_emotional, old_tokens = self.entries[0]
+        outside = excess / old_tokens
+        return (self.technical - old_technical * outside,
+                self.emotional - old_emotional * outside,
+                len(self.entries), self.size)
+
+
+class RollingBalance:
+    """Tracks the balance over several sliding windows of a conversation"""
+
+    def __init__(
+        self,
+        turn_windows: Iterable[int] = (10,),
+        token_windows: Iterable[int] = (),
+        analyzer: Optional[BalanceAnalyzer] = None
+    ):
+        """
+        Initialize the tracker
+
+        Args:
+            turn_windows: Window sizes counted in turns
+            token_windows: Window sizes counted in whitespace-separated tokens
+            analyzer: BalanceAnalyzer used to count patterns (default: a new one)
+        """
+        self.analyzer = analyzer
+        self.turn_windows = {size: _TurnWindow(size) for size in turn_windows}
+        self.token_windows = {size: _TokenWindow(size) for size in token_windows}
+        for size in list(self.turn_windows) + list(self.token_windows):
+            if size < 1:
+                raise ValueError("Window sizes must be at least 1")
+        self.total_turns = 0
+
+    def add_turn(self, text: str) -> Dict[str, Dict[int, Dict[str, float]]]:
+        """
+        Count the patterns of a new turn and add it to every window
+
+        Args:
+            text: Text of the turn
+
+        Returns:
+            The updated snapshot()
+        """
+        if self.analyzer is None:
+            self.analyzer = BalanceAnalyzer()
+        counts = self.analyzer.matcher.count(text)
+        self.add_counts(counts['technical'], counts['emotional'], count_tokens(text))
+        return self.snapshot()
+
+    def add_counts(self, technical: int, emotional: int, tokens: int = 0):
+        """
+        Add a turn whose pattern counts are already known
+
+        Args:
+            technical: Technical pattern matches in the turn
+            emotional: Emotional pattern matches in the turn
+            tokens: Token length of the turn (only used by token windows)
+        """
+        for window in self.turn_windows.values():
+            window.add(technical, emotional, tokens)
+        for window in self.token_windows.values():
+            window.add(technical, emotional, tokens)
+        self.total_turns += 1
+
+    def balance(self, turns: Optional[int] = None, tokens: Optional[int] = None) -> float:
+        """
+        Current balance of one window
+
+        Args:
+            turns: Size of a turn window
+            tokens: Size of a token window (used when ``turns`` is None)
+
+        Returns:
+            Balance score between 0.0 and 1.0
+        """
+        window = self.turn_windows[turns] if turns is not None else self.token_windows[tokens]
+        technical, emotional, _, _ = window.totals()
+        return calculate_balance(technical, emotional)
+
+    def snapshot(self) -> Dict[str, Dict[int, Dict[str, float]]]:
+        """
+        Current state of every window
+
+        Returns:
+            Dictionary with 'turns' and 'tokens' entries mapping each window
+            size to its balance, technical/emotional counts, and the turns
+            and tokens it covers
+        """
+        return {
+            'turns': {size: self._describe(window) for size, window in self.turn_windows.items()},
+            'tokens': {size: self._describe(window) for size, window in self.token_windows.items()}
+        }
+
+    @staticmethod
+    def _describe(window: _TurnWindow) -> Dict[str, float]:
+        technical, emotional, turns, tokens = window.totals()
+        return {
+            'balance': calculate_balance(technical, emotional),
+            'technical_count': technical,
+            'emotional_count': emotional,
+            'turns': turns,
+            'tokens': tokens
+        }
@@ -0,0 +1,339 @@
+"""
+Sampled corpus estimates with bootstrap confidence intervals
+
+estimate_corpus() answers corpus-level questions without analyzing every
+conversation.  The archive is streamed once into a uniform reservoir sample
+(one per stratum when stratified by a metadata field such as ``domain``),
+which costs a JSON parse per conversation but no pattern matching.  Sampled
+conversations are then analyzed in random order, interleaved so every
+stratum stays represented in proportion to its size, and a stratified
+bootstrap is checked at intervals until the confidence intervals of the
+balance estimates are narrower than the requested precision.
+
+Estimates are ratios of weighted totals, so they are the corpus-wide
+figures of a CorpusReport (overall_balance, average_turn_balance) and
+per-turn pattern rates, not averages of per-conversation values.  Each
+stratum's totals are scaled by population / sampled; strata analyzed in
+full are exact and add no variance.  A stratum with a single sampled
+conversation shows no variance to the bootstrap, so when any stratum has
+fewer than two (many small strata, or fewer samples than strata) the
+estimates fall back to treating the sample as unstratified.
+
+Example:
+    >>> with open('archive.jsonl') as source:
+    ...     result = estimate_corpus(ComprehensiveAnalyzer(), iter_conversations(source),
+    ...                              precision=0.01, stratify='domain')
+    >>> result['estimates']['overall_balance']
+    {'estimate': 0.61, 'low': 0.6, 'high': 0.62}
+"""
+
+import random
+from typing import TYPE_CHECKING, Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from .metrics import calculate_balance
+from .summary import TOTALS
+
+if TYPE_CHECKING:
+    from .comprehensive_analyzer import ComprehensiveAnalyzer
+
+
+# Estimated metrics, in report order
+ESTIMATES = (
+    'overall_balance', 'average_turn_balance', 'technical_rate', 'emotional_rate',
+    'uncertainty_rate', 'memory_rate', 'hadrael_rate',
+)
+
+# Estimates whose interval half-width is held to the requested precision
+PRECISION_ESTIMATES = ('overall_balance', 'average_turn_balance')
+
+# Per-conversation values behind the estimates: pattern totals, balance sum, turns
+_COLUMNS = TOTALS + ('balance_sum', 'turns')
+_BALANCE_SUM = len(TOTALS)
+_TURNS = _BALANCE_SUM + 1
+
+# Growth of the sample between interval checks
+_CHECK_GROWTH = 1.2
+
+
+def stratum_of(conversation: Any, key: Optional[str]) -> Hashable:
+    """
+    Stratum of a conversation
+
+    Args:
+        conversation: Conversation dict (or message list)
+        key: Field looked up in the conversation's 'metadata', then in the
+            conversation itself; None for a single stratum
+
+    Returns:
+        The field value (its repr when it is unhashable, such as a list),
+        or None when it is missing
+    """
+    if key is None or not isinstance(conversation, dict):
+        return None
+    metadata = conversation.get('metadata')
+    if isinstance(metadata, dict) and key in metadata:
+        value = metadata[key]
+    else:
+        value = conversation.get(key)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def reservoir_sample(items: Iterable[Any], size: int, rng: random.Random,
+                     stratify: Optional[str] = None) -> Tuple[Dict[Hashable, List[Any]], Dict[Hashable, int]]:
+    """
+    Uniform sample of at most ``size`` items per stratum, in one pass
+
+    Args:
+        items: Conversations, consumed once
+        size: Reservoir size of each stratum
+        rng: Random source
+        stratify: Stratum field, as for stratum_of()
+
+    Returns:
+        (samples, population): sampled items and number of items seen, by
+        stratum in order of first appearance
+    """
+    samples: Dict[Hashable, List[Any]] = {}
+    population: Dict[Hashable, int] = {}
+    for item in items:
+        stratum = stratum_of(item, stratify)
+        seen = population.get(stratum, 0)
+        population[stratum] = seen + 1
+        reservoir = samples.setdefault(stratum, [])
+        if seen < size:
+            reservoir.append(item)
+        else:
+            slot = rng.randrange(seen + 1)
+            if slot < size:
+                reservoir[slot] = item
+    return samples, population
+
+
+def _analysis_order(samples: Dict[Hashable, List[Any]], population: Dict[Hashable, int],
+                    rng: random.Random) -> List[Tuple[Hashable, Any]]:
+    """
+    Interleave shuffled strata so any prefix is roughly proportional
+
+    The k-th item of a stratum of N conversations comes at position k / N,
+    so every stratum contributes one item first and then keeps pace with
+    its share of the corpus.
+    """
+    keyed = []
+    for stratum, items in samples.items():
+        items = list(items)
+        rng.shuffle(items)
+        size = population[stratum]
+        keyed.extend((k / size, rng.random(), stratum, item) for k, item in enumerate(items))
+    keyed.sort(key=lambda entry: entry[:2])
+    return [(stratum, item) for _, _, stratum, item in keyed]
+
+
+def _ratios(totals: Sequence[float]) -> Dict[str, float]:
+    """Estimated metrics from weighted column totals"""
+    turns = totals[_TURNS]
+    technical, emotional, uncertainty, memory, hadrael = totals[:_BALANCE_SUM]
+    return {
+        'overall_balance': calculate_balance(technical, emotional),
+        'average_turn_balance': totals[_BALANCE_SUM] / turns if turns else 0.5,
+        'technical_rate': technical / turns if turns else 0.0,
+        'emotional_rate': emotional / turns if turns else 0.0,
+        'uncertainty_rate': uncertainty / turns if turns else 0.0,
+        'memory_rate': memory / turns if turns else 0.0,
+        'hadrael_rate': hadrael / turns if turns else 0.0,
+    }
+
+
+def _intervals(columns: Dict[Hashable, List[List[float]]], population: Dict[Hashable, int],
+               confidence: float, resamples: int, rng: random.Random) -> Dict[str, Dict[str, float]]:
+    """Point estimates and stratified percentile-bootstrap intervals"""
+    fixed = [0.0] * len(_COLUMNS)
+    varying = []
+    for stratum, values in columns.items():
+        sampled = len(values[0])
+        weight = population[stratum] / sampled
+        if sampled == population[stratum]:
+            # Census stratum: exact, no sampling variance
+            for index, column in enumerate(values):
+                fixed[index] += sum(column)
+        else:
+            varying.append((values, sampled, weight))
+
+    point = list(fixed)
+    for values, _, weight in varying:
+        for index, column in enumerate(values):
+            point[index] += weight * sum(column)
+    estimates = _ratios(point)
+    if not varying:
+        return {name: {'estimate': estimates[name], 'low': estimates[name], 'high': estimates[name]}
+                for name in ESTIMATES}
+
+    draws: Dict[str, List[float]] = {name: [] for name in ESTIMATES}
+    for _ in range(resamples):
+        totals = list(fixed)
+        for values, sampled, weight in varying:
+            picks = rng.choices(range(sampled), k=sampled)
+            for index, column in enumerate(values):
+                totals[index] += weight * sum(map(column.__getitem__, picks))
+        for name, value in _ratios(totals).items():
+            draws[name].append(value)
+
+    tail = (1 - confidence) / 2
+    low = int(round(tail * (resamples - 1)))
+    high = int(round((1 - tail) * (resamples - 1)))
+    intervals = {}
+    for name in ESTIMATES:
+        values = sorted(draws[name])
+        intervals[name] = {'estimate': estimates[name], 'low': values[low], 'high': values[high]}
+    return intervals
+
+
+def _stratified(columns: Dict[Hashable, List[List[float]]], population: Dict[Hashable, int]) -> bool:
+    """
+    Whether every stratum can be estimated on its own
+
+    A stratum needs two sampled conversations for the bootstrap to see any
+    variance in it, unless it was analyzed in full.
+    """
+    for stratum, size in population.items():
+        values = columns.get(stratum)
+        sampled = len(values[0]) if values is not None else 0
+        if sampled < 2 and sampled < size:
+            return False
+    return True
+
+
+def _pooled(columns: Dict[Hashable, List[List[float]]],
+            population: Dict[Hashable, int]) -> Tuple[Dict[Hashable, List[List[float]]], Dict[Hashable, int]]:
+    """All analyzed conversations as one stratum covering the whole population"""
+    pooled = [[] for _ in _COLUMNS]
+    for values in columns.values():
+        for index, column in enumerate(values):
+            pooled[index].extend(column)
+    return {None: pooled}, {None: sum(population.values())}
+
+
+def _precise(intervals: Dict[str, Dict[str, float]], precision: float) -> bool:
+    return all((intervals[name]['high'] - intervals[name]['low']) / 2 <= precision
+               for name in PRECISION_ESTIMATES)
+
+
+def estimate_corpus(
+    analyzer: 'ComprehensiveAnalyzer',
+    conversations: Iterable[Any],
+    precision: float = 0.01,
+    confidence: float = 0.95,
+    max_sample: int = 2000,
+    min_sample: int = 30,
+    stratify: Optional[str] = None,
+    resamples: int = 200,
+    seed: Optional[int] = 0,
+    workers: Optional[int] = 1,
+    chunksize: int = 16
+) -> Dict[str, Any]:
+    """
+    Estimate corpus metrics from a sample of conversations
+
+    Args:
+        analyzer: ComprehensiveAnalyzer to analyze sampled conversations with
+        conversations: Conversations of the corpus, read once
+        precision: Target half-width of the overall_balance and
+            average_turn_balance intervals; sampling stops once both are
+            within it (0 to analyze the whole sample)
+        confidence: Confidence level of the intervals
+        max_sample: Most conversations sampled per stratum and analyzed in
+            total; memory holds up to this many conversations per stratum
+        min_sample: Conversations analyzed before the first precision
+            check; checks also wait until every stratum has two sampled
+            conversations (or was analyzed in full)
+        stratify: Metadata field to stratify by (e.g. 'domain'), looked up
+            as in stratum_of(); None for simple random sampling
+        resamples: Bootstrap resamples per interval check
+        seed: Random seed (None for a different sample on every call)
+        workers: Number of worker processes, as for analyze_many
+        chunksize: Number of conversations handed to a worker at a time
+
+    Returns:
+        Dictionary with 'estimates' (estimate, low and high of each metric
+        in ESTIMATES), 'population' and 'sampled' counts, 'approximate'
+        (False when every conversation was analyzed), 'stopped_early',
+        'confidence', 'precision' and, when stratified, per-stratum
+        'strata' counts and 'stratified' (False when some stratum had
+        fewer than two sampled conversations, so the estimates treat the
+        sample as unstratified)
+
+    Raises:
+        ValueError: If fewer than two conversations could be sampled from
+            a corpus larger than that
+    """
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be between 0 and 1")
+    if precision < 0:
+        raise ValueError("precision must not be negative")
+    if max_sample < 1 or resamples < 1:
+        raise ValueError("max_sample and resamples must be at least 1")
+
+    rng = random.Random(seed)
+    samples, population = reservoir_sample(conversations, max_sample, rng, stratify)
+    order = _analysis_order(samples, population, rng)[:max_sample]
+
+    columns: Dict[Hashable, List[List[float]]] = {}
+    analyzed = 0
+    next_check = max(min_sample, 1)
+    intervals = None
+    stopped_early = False
+    summaries = analyzer.summarize_many((item for _, item in order), workers=workers, chunksize=chunksize)
+    try:
+        for (stratum, _), summary in zip(order, summaries):
+            values = columns.get(stratum)
+            if values is None:
+                values = columns[stratum] = [[] for _ in _COLUMNS]
+            for index, name in enumerate(TOTALS):
+                values[index].append(getattr(summary, name))
+            values[_BALANCE_SUM].append(sum(summary.balances))
+            values[_TURNS].append(len(summary))
+            analyzed += 1
+
+            if analyzed >= next_check and analyzed < len(order) and precision > 0 \
+                    and _stratified(columns, population):
+                intervals = _intervals(columns, population, confidence, resamples, rng)
+                if _precise(intervals, precision):
+                    stopped_early = True
+                    break
+                intervals = None
+                next_check = max(analyzed + 1, int(analyzed * _CHECK_GROWTH))
+    finally:
+        summaries.close()
+
+    total = sum(population.values())
+    stratified = _stratified(columns, population)
+    if intervals is None:
+        if stratified:
+            intervals = _intervals(columns, population, confidence, resamples, rng)
+        else:
+            # Too few samples per stratum (or strata never reached): estimate
+            # as a simple random sample of the whole corpus instead
+            if analyzed < 2:
+                raise ValueError("At least 2 sampled conversations are needed for an interval; "
+                                 "raise max_sample")
+            intervals = _intervals(*_pooled(columns, population), confidence, resamples, rng)
+
+    result = {
+        'estimates': intervals,
+        'population': total,
+        'sampled': analyzed,
+        'approximate': analyzed < total,
+        'stopped_early': stopped_early,
+        'confidence': confidence,
+        'precision': precision,
+    }
+    if stratify is not None:
+        result['stratified'] = stratified
+        result['strata'] = {
+            stratum: {'population': count, 'sampled': len(columns[stratum][0]) if stratum in columns else 0}
+            for stratum, count in population.items()
+        }
+    return result
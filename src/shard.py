@@ -0,0 +1,227 @@
+"""
+Sharded corpus reports: shard, map and reduce
+
+The corpus report of a large archive can be split into independent jobs,
+run as separate processes or on separate machines:
+
+- shard_archive() partitions an archive into N JSONL shard files.  A
+  conversation goes to shard ``shard_of(id, N)``, a stable hash of its id
+  (of its position when it has none), so an archive always shards the same
+  way.  Each record keeps the conversation's position in the archive.
+- map_shard() analyzes one shard into a partial-results file holding one
+  AnalysisSummary per conversation, tagged with that position.
+- reduce_partials() merges the partial files back into archive order and
+  folds them into a CorpusReport.
+
+A CorpusReport depends only on the conversations added, not their order, so
+the reduced report is identical to report_archive() over the whole archive
+on one node.
+
+Example:
+    >>> paths = shard_archive(iter_conversations(source), 'shards/', 4)
+    >>> for index, path in enumerate(paths):  # one job per shard
+    ...     with open(path) as shard, open(f'part-{index}.jsonl', 'w') as output:
+    ...         map_shard(ComprehensiveAnalyzer(), shard, output)
+    >>> reduce_partials([f'part-{index}.jsonl' for index in range(4)])
+"""
+
+import hashlib
+import heapq
+import json
+import os
+from collections import deque
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO
+
+from .corpus import conversation_id
+from .records import json_default
+from .report import CorpusReport
+from .summary import AnalysisSummary
+
+if TYPE_CHECKING:
+    from .comprehensive_analyzer import ComprehensiveAnalyzer
+
+
+# Format version of shard and partial-results files
+SHARD_FORMAT = 1
+
+
+def shard_of(identifier: Any, shards: int) -> int:
+    """
+    Shard a conversation id belongs to
+
+    Args:
+        identifier: Conversation id, as returned by conversation_id()
+        shards: Number of shards
+
+    Returns:
+        Shard index in ``range(shards)``, the same on every run and machine
+    """
+    digest = hashlib.blake2b(str(identifier).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % shards
+
+
+def shard_path(directory: str, index: int, shards: int) -> str:
+    """Path of shard ``index`` of ``shards`` in a directory"""
+    return os.path.join(directory, f'shard-{index:04d}-of-{shards:04d}.jsonl')
+
+
+def shard_archive(conversations: Iterable[Any], directory: str, shards: int) -> List[str]:
+    """
+    Partition conversations into shard files by conversation id
+
+    Every shard file is written, even when no conversation hashes to it,
+    so the set of partial results is complete only once all shards ran.
+
+    Args:
+        conversations: Conversations in archive order, e.g. from
+            iter_conversations()
+        directory: Directory to write the shard files to (created if needed)
+        shards: Number of shards
+
+    Returns:
+        Paths of the shard files, by shard index
+    """
+    if shards < 1:
+        raise ValueError("shards must be at least 1")
+    os.makedirs(directory, exist_ok=True)
+    paths = [shard_path(directory, index, shards) for index in range(shards)]
+    outputs = [open(path, 'w', encoding='utf-8') for path in paths]
+    try:
+        for index, output in enumerate(outputs):
+            output.write(json.dumps({'format': SHARD_FORMAT, 'shard': index, 'shards': shards}) + '\n')
+        for seq, conversation in enumerate(conversations):
+            identifier = conversation_id(conversation, seq) if isinstance(conversation, dict) else seq
+            record = {'seq': seq, 'conversation': conversation}
+            outputs[shard_of(identifier, shards)].write(json.dumps(record, ensure_ascii=False) + '\n')
+    finally:
+        for output in outputs:
+            output.close()
+    return paths
+
+
+def _read_header(stream: TextIO, kind: str, keys: Sequence[str]) -> Dict[str, Any]:
+    """Read and check the first line of a shard or partial-results file"""
+    line = stream.readline()
+    try:
+        header = json.loads(line)
+    except json.JSONDecodeError:
+        header = None
+    if not isinstance(header, dict) or not all(key in header for key in keys):
+        raise ValueError(f"{getattr(stream, 'name', 'input')} is not a {kind} file")
+    if header.get('format') != SHARD_FORMAT:
+        raise ValueError(f"Unsupported {kind} format {header.get('format')!r}")
+    return header
+
+
+def _records(stream: TextIO) -> Iterator[Dict[str, Any]]:
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def map_shard(analyzer: 'ComprehensiveAnalyzer', shard: TextIO, output: TextIO,
+              workers: Optional[int] = 1, chunksize: int = 16) -> int:
+    """
+    Analyze one shard file into a partial-results file
+
+    Args:
+        analyzer: ComprehensiveAnalyzer to analyze conversations with
+        shard: Open shard file written by shard_archive()
+        output: Text stream the partial results are written to
+        workers: Number of worker processes, as for analyze_many
+        chunksize: Number of conversations handed to a worker at a time
+
+    Returns:
+        Number of conversations analyzed
+    """
+    header = _read_header(shard, 'shard', ('shard', 'shards'))
+    output.write(json.dumps({
+        'format': SHARD_FORMAT,
+        'shard': header['shard'],
+        'shards': header['shards'],
+        'version': analyzer.turn_cache_version
+    }) + '\n')
+
+    # Positions and ids of conversations in flight; summaries come back in order
+    pending: deque = deque()
+
+    def conversations() -> Iterator[Any]:
+        for record in _records(shard):
+            conversation = record['conversation']
+            identifier = conversation_id(conversation, record['seq']) \
+                if isinstance(conversation, dict) else record['seq']
+            pending.append((record['seq'], identifier))
+            yield conversation
+
+    count = 0
+    for summary in analyzer.summarize_many(conversations(), workers=workers, chunksize=chunksize):
+        seq, identifier = pending.popleft()
+        output.write(json.dumps({'seq': seq, 'id': identifier, 'summary': summary.to_dict()},
+                                default=json_default) + '\n')
+        count += 1
+    return count
+
+
+def reduce_partials(paths: Sequence[str]) -> Dict[str, Any]:
+    """
+    Merge partial-results files into the corpus report
+
+    Args:
+        paths: Partial-results files of every shard, written by map_shard()
+
+    Returns:
+        CorpusReport dictionary, identical to report_archive() over the
+        archive the shards were cut from
+
+    Raises:
+        ValueError: If the partials come from different shardings or
+            analyzer versions, a shard is missing or repeated, or a
+            conversation appears twice
+    """
+    streams = [open(path, 'r', encoding='utf-8') for path in paths]
+    try:
+        headers = [_read_header(stream, 'partial-results', ('shard', 'shards', 'version')) for stream in streams]
+        if not headers:
+            raise ValueError("No partial-results files to reduce")
+        if len({header['version'] for header in headers}) > 1:
+            raise ValueError("Partial results were produced by different analyzer versions")
+        if len({header['shards'] for header in headers}) > 1:
+            raise ValueError("Partial results come from different shardings")
+        shards = headers[0]['shards']
+        indexes = sorted(header['shard'] for header in headers)
+        if indexes != list(range(shards)):
+            missing = sorted(set(range(shards)) - set(indexes))
+            raise ValueError(f"Expected one partial per shard of {shards}; "
+                             f"missing {missing}, got {indexes}")
+
+        report = CorpusReport()
+        last = -1
+        for record in heapq.merge(*(_records(stream) for stream in streams), key=lambda record: record['seq']):
+            if record['seq'] <= last:
+                raise ValueError(f"Conversation {record['seq']} appears more than once or out of order")
+            last = record['seq']
+            report.add_summary(AnalysisSummary.from_dict(record['summary']))
+        return report.to_dict()
+    finally:
+        for stream in streams:
+            stream.close()
+
+
+def report_archive(analyzer: 'ComprehensiveAnalyzer', conversations: Iterable[Any],
+                   workers: Optional[int] = 1, chunksize: int = 16) -> Dict[str, Any]:
+    """
+    Corpus report of a whole archive on one node
+
+    Args:
+        analyzer: ComprehensiveAnalyzer to analyze conversations with
+        conversations: Conversations in archive order
+        workers: Number of worker processes, as for analyze_many
+        chunksize: Number of conversations handed to a worker at a time
+
+    Returns:
+        CorpusReport dictionary
+    """
+    report = CorpusReport()
+    for summary in analyzer.summarize_many(conversations, workers=workers, chunksize=chunksize):
+        report.add_summary(summary)
+    return report.to_dict()
@@ -0,0 +1,161 @@
+"""
+Persistent on-disk cache of per-turn analysis results
+
+Re-analyzing an archive after small edits mostly sees turns it has already
+scored.  TurnCache keeps each turn's pattern counts and examples in a
+SQLite file, keyed by a digest of the turn text and by a version string
+identifying the pattern set, so warm reruns only scan new or changed turns
+and editing any pattern makes every old row unreachable.
+
+Writes are buffered and committed in batches (and at the end of each
+analyzed conversation), since one transaction per turn would cost more
+than the scan it saves.
+"""
+
+import json
+import sqlite3
+from typing import Any, Dict, Optional
+
+from .cache import text_digest
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS turn_results (
+    digest BLOB NOT NULL,
+    version TEXT NOT NULL,
+    result TEXT NOT NULL,
+    PRIMARY KEY (digest, version)
+) WITHOUT ROWID
+"""
+
+
+class TurnCache:
+    """
+    SQLite-backed cache of per-turn results
+
+    Example:
+        >>> analyzer = ComprehensiveAnalyzer(turn_cache=TurnCache('turns.sqlite'))
+        >>> analyzer.analyze_conversation_file('chat.txt')  # cold: scans every turn
+        >>> analyzer.analyze_conversation_file('chat.txt')  # warm: no scans
+    """
+
+    def __init__(self, path: str, batch_size: int = 1024, timeout: float = 30.0):
+        """
+        Open (or create) a cache file
+
+        Args:
+            path: SQLite database path
+            batch_size: Number of new results buffered before a commit
+            timeout: Seconds to wait for a lock held by another process
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self._connection = sqlite3.connect(path, timeout=timeout)
+        try:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+        except sqlite3.DatabaseError:
+            pass  # e.g. in-memory databases; the default journal still works
+        self._connection.execute(SCHEMA)
+        self._connection.commit()
+        self._pending: Dict[tuple, str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __reduce__(self):
+        # Worker processes open their own connection to the same file
+        return type(self), (self.path, self.batch_size, self.timeout)
+
+    def __enter__(self) -> 'TurnCache':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get(self, version: str, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up the cached result of a turn
+
+        Args:
+            version: Pattern-set version the result was computed with
+            text: Turn text
+
+        Returns:
+            The stored result, or None on a miss
+        """
+        key = (text_digest(text), version)
+        result = self._pending.get(key)
+        if result is None:
+            row = self._connection.execute(
+                'SELECT result FROM turn_results WHERE digest = ? AND version = ?', key
+            ).fetchone()
+            result = row[0] if row is not None else None
+
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(result)
+
+    def put(self, version: str, text: str, result: Dict[str, Any]):
+        """
+        Store the result of a turn
+
+        Args:
+            version: Pattern-set version the result was computed with
+            text: Turn text
+            result: JSON-serializable result
+        """
+        self._pending[(text_digest(text), version)] = json.dumps(result)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Commit buffered results"""
+        if not self._pending:
+            return
+        with self._connection:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO turn_results (digest, version, result) VALUES (?, ?, ?)',
+                [(digest, version, result) for (digest, version), result in self._pending.items()]
+            )
+        self._pending.clear()
+
+    def prune(self, version: str) -> int:
+        """
+        Delete results computed with any other pattern-set version
+
+        Args:
+            version: Version to keep
+
+        Returns:
+            Number of rows deleted
+        """
+        self.flush()
+        with self._connection:
+            cursor = self._connection.execute('DELETE FROM turn_results WHERE version != ?', (version,))
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Cache statistics for this connection
+
+        Returns:
+            Dictionary with hits, misses, hit_rate and the stored row count
+        """
+        self.flush()
+        lookups = self.hits + self.misses
+        rows = self._connection.execute('SELECT COUNT(*) FROM turn_results').fetchone()[0]
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': rows
+        }
+
+    def close(self):
+        """Commit buffered results and close the database"""
+        if self._connection is not None:
+            self.flush()
+            self._connection.close()
+            self._connection = None
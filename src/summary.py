@@ -0,0 +1,189 @@
+"""
+Mergeable partial aggregates of turn analyses
+
+An AnalysisSummary holds everything overall_metrics, phase_progression and
+hadrael_compliance are computed from: the pattern totals and the turn
+balances in order.  Summaries of consecutive parts of a conversation (or of
+a corpus) merge into the summary of the whole, and merging is associative,
+so parts analyzed on different cores or machines can be reduced in any
+grouping, as long as they are concatenated in their original order, without
+re-reading turns.  ComprehensiveAnalyzer builds its results from one, so a
+merged summary reproduces a single pass exactly.
+
+Summaries serialize to a small JSON-ready dict, with the balances packed as
+base64 float64 rather than a list of numbers.
+
+Example:
+    >>> first = AnalysisSummary.from_turns(result_a['turn_analysis'])
+    >>> second = AnalysisSummary.from_turns(result_b['turn_analysis'])
+    >>> first.merge(second).overall_metrics()
+"""
+
+import base64
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Mapping
+
+from .metrics import calculate_balance, calculate_trajectory, hadrael_compliance_level, phase_progression
+
+
+# Serialized format version
+SUMMARY_FORMAT = 1
+
+# Pattern totals, each summed from the per-turn '<name>_count'
+TOTALS = ('technical', 'emotional', 'uncertainty', 'memory', 'hadrael')
+
+
+class AnalysisSummary:
+    """Pattern totals and ordered turn balances of a run of turns"""
+
+    __slots__ = ('technical', 'emotional', 'uncertainty', 'memory', 'hadrael', 'balances')
+
+    def __init__(self, technical: int = 0, emotional: int = 0, uncertainty: int = 0,
+                 memory: int = 0, hadrael: int = 0, balances: Iterable[float] = ()):
+        self.technical = technical
+        self.emotional = emotional
+        self.uncertainty = uncertainty
+        self.memory = memory
+        self.hadrael = hadrael
+        self.balances = array('d', balances)
+
+    @classmethod
+    def from_turns(cls, turns: Iterable[Mapping[str, Any]]) -> 'AnalysisSummary':
+        """Summarize per-turn results ('turn_analysis' entries)"""
+        summary = cls()
+        for turn in turns:
+            summary.add_turn(turn)
+        return summary
+
+    @classmethod
+    def merged(cls, summaries: Iterable['AnalysisSummary']) -> 'AnalysisSummary':
+        """Merge summaries, in order, into a new summary"""
+        result = cls()
+        for summary in summaries:
+            result.merge(summary)
+        return result
+
+    def __len__(self) -> int:
+        """Number of turns"""
+        return len(self.balances)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, AnalysisSummary):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def add_turn(self, turn: Mapping[str, Any]) -> 'AnalysisSummary':
+        """
+        Add the next turn
+
+        Args:
+            turn: Per-turn result with 'balance' and the *_count fields
+
+        Returns:
+            The summary, for chaining
+        """
+        self.technical += turn['technical_count']
+        self.emotional += turn['emotional_count']
+        self.uncertainty += turn['uncertainty_count']
+        self.memory += turn['memory_count']
+        self.hadrael += turn['hadrael_count']
+        self.balances.append(turn['balance'])
+        return self
+
+    def merge(self, other: 'AnalysisSummary') -> 'AnalysisSummary':
+        """
+        Append the turns summarized by ``other``
+
+        Args:
+            other: Summary of the turns following this summary's turns
+
+        Returns:
+            The summary (updated in place), for chaining
+        """
+        self.technical += other.technical
+        self.emotional += other.emotional
+        self.uncertainty += other.uncertainty
+        self.memory += other.memory
+        self.hadrael += other.hadrael
+        self.balances.extend(other.balances)
+        return self
+
+    def overall_metrics(self) -> Dict[str, Any]:
+        """The 'overall_metrics' of ComprehensiveAnalyzer results"""
+        balances = self.balances
+        return {
+            'overall_balance': calculate_balance(self.technical, self.emotional),
+            'average_turn_balance': sum(balances) / len(balances) if balances else 0.5,
+            'total_technical_patterns': self.technical,
+            'total_emotional_patterns': self.emotional,
+            'uncertainty_expressions': self.uncertainty,
+            'memory_references': self.memory,
+            'hadrael_corrections': self.hadrael,
+            'trajectory': calculate_trajectory(balances.tolist())
+        }
+
+    def hadrael_compliance(self) -> Dict[str, Any]:
+        """The 'hadrael_compliance' of ComprehensiveAnalyzer results"""
+        turns = len(self.balances)
+        return {
+            'attribution_score': self.hadrael / turns if turns else 0,
+            'uncertainty_expression_rate': self.uncertainty / turns if turns else 0,
+            'memory_persistence_rate': self.memory / turns if turns else 0,
+            'compliance_level': hadrael_compliance_level(self.hadrael, self.uncertainty, turns)
+        }
+
+    def to_results(self) -> Dict[str, Any]:
+        """
+        Conversation-level results computed from the summary
+
+        Returns:
+            Dictionary with total_turns, overall_metrics, phase_progression
+            and hadrael_compliance, as in ComprehensiveAnalyzer results
+        """
+        return {
+            'total_turns': len(self.balances),
+            'overall_metrics': self.overall_metrics(),
+            'phase_progression': phase_progression(self.balances.tolist()),
+            'hadrael_compliance': self.hadrael_compliance()
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to a JSON-ready dict"""
+        balances = array('d', self.balances)
+        if sys.byteorder == 'big':
+            balances.byteswap()
+        state = {name: getattr(self, name) for name in TOTALS}
+        state['format'] = SUMMARY_FORMAT
+        state['balances'] = base64.b64encode(balances.tobytes()).decode('ascii')
+        return state
+
+    @classmethod
+    def from_dict(cls, state: Mapping[str, Any]) -> 'AnalysisSummary':
+        """
+        Rebuild a summary written by to_dict()
+
+        Raises:
+            ValueError: If the dict is from an unknown format version
+        """
+        if state.get('format') != SUMMARY_FORMAT:
+            raise ValueError(f"Unsupported summary format {state.get('format')!r}")
+        balances = array('d')
+        balances.frombytes(base64.b64decode(state['balances']))
+        if sys.byteorder == 'big':
+            balances.byteswap()
+        summary = cls(**{name: state[name] for name in TOTALS})
+        summary.balances = balances
+        return summary
+
+    def __repr__(self) -> str:
+        totals = ', '.join(f'{name}={getattr(self, name)}' for name in TOTALS)
+        return f'AnalysisSummary({totals}, turns={len(self.balances)})'
+
@@ -0,0 +1,270 @@
+"""
+Columnar per-turn results for corpus analysis
+
+A TurnTable stores the turns of many conversations column by column in
+contiguous typed arrays: balances as float32, pattern counts as int32, and
+roles and phases as int8 codes.  Conversation ``i`` covers rows
+``offsets[i]:offsets[i + 1]``, the layout calculate_trajectory_batch takes.
+
+Tables are saved as a directory holding one ``.npy`` file per column plus
+``meta.json`` (role names, conversation ids).  The files are plain NumPy
+format 1.0, written without needing NumPy, and load() memory-maps them:
+with NumPy installed columns come back as read-only ``np.memmap`` arrays,
+otherwise as typed memoryviews over the mapping, so nothing is copied.
+"""
+
+import ast
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple
+
+from .corpus import conversation_id
+from .metrics import PHASE_ORDER, calculate_trajectory_batch, load_numpy, phase_detector
+
+
+NPY_MAGIC = b'\x93NUMPY'
+
+# array typecode -> little-endian .npy dtype descriptor
+NPY_DESCR = {'b': '|i1', 'i': '<i4', 'f': '<f4', 'q': '<i8'}
+
+BASIC_COLUMNS = (
+    ('turn', 'i'), ('role', 'b'), ('phase', 'b'), ('balance', 'f'),
+    ('technical', 'i'), ('emotional', 'i'),
+)
+COMPREHENSIVE_COLUMNS = BASIC_COLUMNS + (
+    ('uncertainty', 'i'), ('memory', 'i'), ('hadrael', 'i'), ('balance_awareness', 'i'),
+)
+
+# Keys a column is read from in BalanceAnalyzer / ComprehensiveAnalyzer turn results
+FIELD_KEYS = {
+    'turn': ('turn', 'turn_index'),
+    'role': ('role', 'speaker'),
+    'technical': ('technical', 'technical_count'),
+    'emotional': ('emotional', 'emotional_count'),
+    'uncertainty': ('uncertainty_count',),
+    'memory': ('memory_count',),
+    'hadrael': ('hadrael_count',),
+    'balance_awareness': ('balance_awareness_count',),
+}
+
+_PHASE_CODES = {phase.value: code for code, phase in enumerate(PHASE_ORDER)}
+
+
+class TurnTable:
+    """
+    Per-turn analysis results stored column-wise
+
+    Example:
+        >>> table = BalanceAnalyzer().analyze_table(conversations)
+        >>> table.save('results.table')
+        >>> table = TurnTable.load('results.table')
+        >>> table['balance'][table.offsets[3]:table.offsets[4]]
+    """
+
+    def __init__(self, columns: Sequence[Tuple[str, str]] = BASIC_COLUMNS):
+        """
+        Create an empty table
+
+        Args:
+            columns: (name, array typecode) pairs, e.g. BASIC_COLUMNS or
+                COMPREHENSIVE_COLUMNS
+        """
+        for name, typecode in columns:
+            if typecode not in NPY_DESCR:
+                raise ValueError(f"Unsupported typecode {typecode!r} for column {name!r}")
+        self.schema = tuple((name, typecode) for name, typecode in columns)
+        self.columns: Dict[str, Any] = {name: array(typecode) for name, typecode in self.schema}
+        self.offsets: Any = array('q', [0])
+        self.roles: List[str] = []
+        self.ids: List[Any] = []
+        self._role_codes: Dict[str, int] = {}
+        self.read_only = False
+        self._maps: List[mmap.mmap] = []
+
+    def __len__(self) -> int:
+        """Number of turns"""
+        return int(self.offsets[-1])
+
+    def __getitem__(self, name: str) -> Any:
+        return self.columns[name]
+
+    @property
+    def conversation_count(self) -> int:
+        return len(self.offsets) - 1
+
+    def add_conversation(self, turns: Iterable[Mapping[str, Any]], conversation: Any = None):
+        """
+        Append the per-turn results of one conversation
+
+        Args:
+            turns: 'turn_balances' of BalanceAnalyzer.analyze_conversation or
+                'turn_analysis' of ComprehensiveAnalyzer results
+            conversation: Conversation id (defaults to its position)
+        """
+        if self.read_only:
+            raise TypeError("Loaded tables are read-only")
+
+        columns = self.columns
+        count = 0
+        for turn in turns:
+            for name, _ in self.schema:
+                if name == 'balance':
+                    value = turn['balance']
+                elif name == 'phase':
+                    phase = turn.get('phase')
+                    value = _PHASE_CODES[phase] if phase is not None else \
+                        PHASE_ORDER.index(phase_detector(turn['balance']))
+                elif name == 'role':
+                    value = self._role_code(_lookup(turn, name))
+                else:
+                    value = _lookup(turn, name)
+                columns[name].append(value)
+            count += 1
+
+        self.offsets.append(self.offsets[-1] + count)
+        self.ids.append(conversation if conversation is not None else self.conversation_count - 1)
+
+    def _role_code(self, role: str) -> int:
+        code = self._role_codes.get(role)
+        if code is None:
+            if len(self.roles) >= 127:
+                raise ValueError("TurnTable supports at most 127 distinct roles")
+            code = self._role_codes[role] = len(self.roles)
+            self.roles.append(role)
+        return code
+
+    def conversation(self, index: int) -> Dict[str, Any]:
+        """
+        Columns of one conversation
+
+        Args:
+            index: Conversation position in the table
+
+        Returns:
+            Dictionary of column name to a slice of that column
+        """
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        return {name: column[start:end] for name, column in self.columns.items()}
+
+    def trajectories(self) -> Dict[str, Any]:
+        """Trajectory metrics of every conversation, via calculate_trajectory_batch"""
+        return calculate_trajectory_batch(self.columns['balance'], offsets=self.offsets)
+
+    def save(self, path: str):
+        """
+        Write the table to a directory of .npy files
+
+        Args:
+            path: Directory to create (or overwrite files in)
+        """
+        os.makedirs(path, exist_ok=True)
+        for name, typecode in self.schema:
+            _write_npy(os.path.join(path, name + '.npy'), self.columns[name], typecode)
+        _write_npy(os.path.join(path, 'offsets.npy'), self.offsets, 'q')
+        with open(os.path.join(path, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'columns': [list(column) for column in self.schema],
+                'roles': self.roles,
+                'phases': [phase.value for phase in PHASE_ORDER],
+                'ids': self.ids
+            }, f)
+
+    @classmethod
+    def load(cls, path: str) -> 'TurnTable':
+        """
+        Memory-map a table written by save()
+
+        Args:
+            path: Directory written by save()
+
+        Returns:
+            Read-only TurnTable whose columns are views of the files
+        """
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+
+        table = cls([tuple(column) for column in meta['columns']])
+        table.roles = meta['roles']
+        table.ids = meta['ids']
+        table._role_codes = {role: code for code, role in enumerate(table.roles)}
+        table.read_only = True
+        for name, typecode in table.schema:
+            table.columns[name] = table._map_column(os.path.join(path, name + '.npy'), typecode)
+        table.offsets = table._map_column(os.path.join(path, 'offsets.npy'), 'q')
+        return table
+
+    def _map_column(self, filename: str, typecode: str) -> Any:
+        np = load_numpy()
+        if np is not None:
+            return np.load(filename, mmap_mode='r')
+
+        with open(filename, 'rb') as f:
+            offset, length = _read_npy_header(f, typecode)
+            if length == 0:
+                return memoryview(array(typecode))
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        view = memoryview(mapped)[offset:offset + length * array(typecode).itemsize].cast(typecode)
+        if sys.byteorder == 'big' and typecode != 'b':
+            # Columns are stored little-endian; a big-endian host needs a copy
+            swapped = array(typecode, view)
+            swapped.byteswap()
+            return memoryview(swapped)
+        return view
+
+    def close(self):
+        """Release the memory maps of a loaded table"""
+        self.columns = {name: array(typecode) for name, typecode in self.schema}
+        self.offsets = array('q', [0])
+        while self._maps:
+            try:
+                self._maps.pop().close()
+            except BufferError:
+                pass  # A caller still holds a view; the map closes with it
+
+
+def _lookup(turn: Mapping[str, Any], name: str) -> Any:
+    for key in FIELD_KEYS[name]:
+        if key in turn:
+            return turn[key]
+    raise KeyError(f"Turn result has no value for column {name!r}")
+
+
+def _write_npy(filename: str, values: Any, typecode: str):
+    """Write a 1-D column in NumPy .npy format 1.0"""
+    data = array(typecode, values)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    header = "{'descr': '%s', 'fortran_order': False, 'shape': (%d,), }" % (NPY_DESCR[typecode], len(data))
+    # Pad so the data starts on a 64-byte boundary, as NumPy does
+    padding = -(len(NPY_MAGIC) + 4 + len(header) + 1) % 64
+    header = (header + ' ' * padding + '\n').encode('latin1')
+    with open(filename, 'wb') as f:
+        f.write(NPY_MAGIC + bytes([1, 0]) + struct.pack('<H', len(header)) + header)
+        f.write(data.tobytes())
+
+
+def _read_npy_header(f, typecode: str) -> Tuple[int, int]:
+    """Validate a .npy header; return (data offset, number of items)"""
+    prefix = f.read(len(NPY_MAGIC) + 2)
+    if prefix[:len(NPY_MAGIC)] != NPY_MAGIC:
+        raise ValueError(f"{f.name} is not a .npy file")
+    major = prefix[-2]
+    size_format = '<H' if major == 1 else '<I'
+    size_bytes = f.read(struct.calcsize(size_format))
+    header = ast.literal_eval(f.read(struct.unpack(size_format, size_bytes)[0]).decode('latin1'))
+    if header['descr'] != NPY_DESCR[typecode] or header['fortran_order'] or len(header['shape']) != 1:
+        raise ValueError(f"{f.name} does not hold a 1-D {NPY_DESCR[typecode]} column")
+    return f.tell(), header['shape'][0]
+
+
+def track_ids(conversations: Iterable[Any], ids: deque) -> Iterator[Any]:
+    """Record conversation ids as conversations are handed to an analyzer"""
+    for index, conversation in enumerate(conversations):
+        ids.append(conversation_id(conversation, index) if isinstance(conversation, dict) else index)
+        yield conversation
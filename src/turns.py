@@ -0,0 +1,183 @@
+"""
+Turn boundary location for conversation transcripts
+
+Transcripts mark each turn with a speaker label in one of three formats:
+``**Speaker**: text``, ``Speaker: text`` (at the start of a line) and
+``[Speaker]: text``.  A turn's text starts at the first non-whitespace
+character after the label and runs to the end of that line or to the next
+label, whichever comes first.
+
+The functions here work on ``str`` as well as on ``bytes``-like buffers
+such as an ``mmap`` of a UTF-8 file, so large exports can be walked without
+decoding (or even reading) more than one turn at a time.
+"""
+
+import re
+from typing import Iterator, Optional, Pattern, Tuple
+
+
+# Label patterns, in the order formats are tried
+TURN_FORMATS = [
+    ('bold', r'\*\*([^*]+)\*\*:'),
+    ('plain', r'^([A-Za-z]+):'),
+    ('bracket', r'\[([^\]]+)\]:'),
+]
+
+# Characters matched by \s in str patterns, for the equivalent bytes pattern
+_UNICODE_WHITESPACE = (
+    '\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680'
+    '\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a'
+    '\u2028\u2029\u202f\u205f\u3000'
+)
+
+STR_HEADERS = [(name, re.compile(pattern, re.MULTILINE)) for name, pattern in TURN_FORMATS]
+STR_WHITESPACE = re.compile(r'\s*')
+STR_LINE_END = re.compile(r'\n')
+
+# Files read as bytes keep their \r\n or \r line endings, which text mode
+# would have translated to \n; treat a lone \r as a line break as well.
+BYTES_HEADERS = [
+    ('bold', re.compile(rb'\*\*([^*]+)\*\*:')),
+    ('plain', re.compile(rb'(?:^|(?<=\r))([A-Za-z]+):', re.MULTILINE)),
+    ('bracket', re.compile(rb'\[([^\]]+)\]:')),
+]
+BYTES_WHITESPACE = re.compile(
+    b'(?:' + b'|'.join(re.escape(char.encode('utf-8')) for char in _UNICODE_WHITESPACE) + b')*'
+)
+BYTES_LINE_END = re.compile(rb'[\r\n]')
+
+Span = Tuple[int, int]
+
+# Bytes (or characters) inspected when sniffing a transcript's format
+SNIFF_SIZE = 8192
+
+
+def detect_format(buffer, headers) -> Optional[Tuple[str, Pattern]]:
+    """
+    Find the first turn format with at least one label in the buffer
+
+    Args:
+        buffer: Text or bytes-like buffer
+        headers: STR_HEADERS or BYTES_HEADERS
+
+    Returns:
+        Tuple of (format name, compiled label pattern), or None
+    """
+    for name, header in headers:
+        if header.search(buffer) is not None:
+            return name, header
+    return None
+
+
+def sniff_format(buffer, headers, sniff_size: Optional[int] = None) -> Optional[Tuple[str, Pattern]]:
+    """
+    Pick the turn format from the start of the buffer
+
+    The first ``sniff_size`` characters usually settle the question: if a
+    format's label appears there, only the formats tried before it need to
+    be ruled out over the rest of the buffer (a label anywhere makes an
+    earlier format win, as detect_format does).
+
+    Args:
+        buffer: Text or bytes-like buffer
+        headers: STR_HEADERS or BYTES_HEADERS
+        sniff_size: Length of the prefix to inspect (default SNIFF_SIZE)
+
+    Returns:
+        Tuple of (format name, compiled label pattern), or None
+    """
+    # A label may straddle the end of the prefix; searching the prefix only
+    # finds labels wholly inside it, which is all the guess needs.
+    prefix = buffer[:sniff_size or SNIFF_SIZE]
+    for position, (name, header) in enumerate(headers):
+        if header.search(prefix) is not None:
+            earlier = detect_format(buffer, headers[:position])
+            return earlier if earlier is not None else (name, header)
+    return detect_format(buffer, headers)
+
+
+def iter_turn_spans(buffer, header: Pattern, whitespace: Pattern,
+                    line_end: Pattern) -> Iterator[Tuple[Span, Span]]:
+    """
+    Locate every turn of one format in a single left-to-right pass
+
+    Args:
+        buffer: Text or bytes-like buffer
+        header: Compiled label pattern with the speaker as group 1
+        whitespace: Pattern matching the whitespace run after a label
+        line_end: Pattern matching a line break
+
+    Yields:
+        Tuples of (speaker span, text span); text spans are unstripped and
+        may be empty
+    """
+    size = len(buffer)
+    match = header.search(buffer)
+    line_break = -1
+
+    while match is not None:
+        text_start = whitespace.match(buffer, match.end()).end()
+
+        # Both searches only move forward, so each byte is looked at once
+        if line_break < text_start:
+            found = line_end.search(buffer, text_start)
+            line_break = found.start() if found is not None else size
+        next_match = header.search(buffer, text_start)
+
+        text_end = line_break
+        if next_match is not None and next_match.start() < text_end:
+            text_end = next_match.start()
+
+        yield match.span(1), (text_start, text_end)
+        match = next_match
+
+
+def iter_turns_bytes(buffer, encoding: str = 'utf-8') -> Iterator[Tuple[str, str]]:
+    """
+    Decode the turns of a bytes-like buffer one at a time
+
+    Args:
+        buffer: bytes, bytearray or mmap holding the transcript
+        encoding: Text encoding of the buffer
+
+    Yields:
+        Tuples of (speaker, text) with whitespace stripped, skipping empty turns
+    """
+    detected = sniff_format(buffer, BYTES_HEADERS)
+    if detected is None:
+        return
+
+    _, header = detected
+    for (speaker_start, speaker_end), (text_start, text_end) in iter_turn_spans(
+            buffer, header, BYTES_WHITESPACE, BYTES_LINE_END):
+        text = decode_text(buffer[text_start:text_end], encoding).strip()
+        if text:
+            speaker = decode_text(buffer[speaker_start:speaker_end], encoding).strip()
+            yield speaker, text
+
+
+def iter_turns(content: str) -> Iterator[Tuple[str, str]]:
+    """
+    Extract the turns of a transcript in one linear pass
+
+    Args:
+        content: Transcript text
+
+    Yields:
+        Tuples of (speaker, text) with whitespace stripped, skipping empty turns
+    """
+    detected = sniff_format(content, STR_HEADERS)
+    if detected is None:
+        return
+
+    _, header = detected
+    for (speaker_start, speaker_end), (text_start, text_end) in iter_turn_spans(
+            content, header, STR_WHITESPACE, STR_LINE_END):
+        text = content[text_start:text_end].strip()
+        if text:
+            yield content[speaker_start:speaker_end].strip(), text
+
+
+def decode_text(raw: bytes, encoding: str = 'utf-8') -> str:
+    """Decode a slice with universal newlines, as text-mode reads do"""
+    return raw.decode(encoding).replace('\r\n', '\n').replace('\r', '\n')
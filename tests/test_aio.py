@@ -0,0 +1,135 @@
+"""
+Unit tests for the asyncio analysis API
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from src import aio
+from src.analyzer import BalanceAnalyzer
+from src.consciousness import ConsciousnessEngine
+
+
+class SlowAnalyzer:
+    """Analyzer stand-in recording how many calls overlap"""
+
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+    calls = 0
+
+    def work(self, seconds):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.calls += 1
+            cls.peak = max(cls.peak, cls.active)
+        time.sleep(seconds)
+        with cls.lock:
+            cls.active -= 1
+        return seconds
+
+
+class TaggedAnalyzer:
+    """Analyzer stand-in built from keyword arguments"""
+
+    def __init__(self, tag):
+        self.tag = tag
+
+    def work(self):
+        return self.tag
+
+
+class TestAsyncAnalysis(unittest.TestCase):
+
+    def setUp(self):
+        SlowAnalyzer.active = SlowAnalyzer.peak = SlowAnalyzer.calls = 0
+        self.executor = ThreadPoolExecutor(max_workers=4)
+
+    def tearDown(self):
+        aio.configure()
+        self.executor.shutdown(wait=True)
+
+    def test_results_match_sync(self):
+        """Async methods return what their synchronous counterparts do"""
+        analyzer = BalanceAnalyzer()
+        text = "Implement the API function, thank you so much!"
+        messages = [{'role': 'user', 'content': text}, {'role': 'assistant', 'content': 'I feel happy'}]
+
+        async def run():
+            return await asyncio.gather(
+                analyzer.analyze_text_async(text),
+                analyzer.analyze_conversation_async(messages, executor=self.executor)
+            )
+
+        balance, conversation = asyncio.run(run())
+        self.assertEqual(balance, analyzer.analyze_text(text))
+        self.assertEqual(conversation, analyzer.analyze_conversation(messages))
+
+    def test_process_async(self):
+        """process_async builds the same response as process"""
+        engine = ConsciousnessEngine()
+        text = "Go deep on the database architecture, with gratitude"
+        response = asyncio.run(engine.process_async(text))
+        expected = ConsciousnessEngine().process(text)
+        for key in ('activation_level', 'welsh_winters_balance', 'enhancements', 'pathway'):
+            self.assertEqual(response[key], expected[key])
+
+    def test_thread_pool_uses_instance(self):
+        """Thread pools call the analyzer itself, with its current settings"""
+        analyzer = BalanceAnalyzer()
+        analyzer.scan_rate = 1
+        text = "Implement the API function, thank you so much! " * 50
+        score = asyncio.run(analyzer.score_text_async(text, executor=self.executor, deadline=0.01))
+        self.assertTrue(score.approximate)
+        self.assertLess(score.scanned_chars, len(text))
+
+    def test_built_analyzers_are_bounded(self):
+        """Analyzers built from factory arguments are evicted least recently used first"""
+        aio.configure(executor=self.executor)
+
+        async def run():
+            return [await aio.run_analysis(TaggedAnalyzer, {'tag': tag}, 'work')
+                    for tag in range(aio.MAX_ANALYZERS * 2)]
+
+        self.assertEqual(asyncio.run(run()), list(range(aio.MAX_ANALYZERS * 2)))
+        tags = [dict(kwargs)['tag'] for factory, kwargs in aio._analyzers if factory is TaggedAnalyzer]
+        self.assertEqual(tags, list(range(aio.MAX_ANALYZERS, aio.MAX_ANALYZERS * 2)))
+
+    def test_concurrency_limit(self):
+        """No more than max_concurrency analyses run at once"""
+        aio.configure(executor=self.executor, max_concurrency=2)
+
+        async def run():
+            return await asyncio.gather(*[
+                aio.run_analysis(SlowAnalyzer, {}, 'work', 0.02) for _ in range(6)
+            ])
+
+        self.assertEqual(asyncio.run(run()), [0.02] * 6)
+        self.assertEqual(SlowAnalyzer.peak, 2)
+
+    def test_cancellation_drops_queued_work(self):
+        """Cancelled calls that have not started never run"""
+        aio.configure(executor=self.executor, max_concurrency=1)
+
+        async def run():
+            tasks = [asyncio.ensure_future(aio.run_analysis(SlowAnalyzer, {}, 'work', 0.05))
+                     for _ in range(4)]
+            await asyncio.sleep(0.01)
+            for task in tasks[1:]:
+                task.cancel()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            # The slot is free again once the running call has finished
+            await aio.run_analysis(SlowAnalyzer, {}, 'work', 0)
+            return results
+
+        results = asyncio.run(run())
+        self.assertEqual(results[0], 0.05)
+        self.assertTrue(all(isinstance(r, asyncio.CancelledError) for r in results[1:]))
+        self.assertEqual(SlowAnalyzer.calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
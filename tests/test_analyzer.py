@@ -106,5 +106,36 @@ class TestPatternBreakdown(unittest.TestCase):
         self.assertTrue(any('API' in p for p in technical_patterns_found))
 
 
+class TestBatchAnalysis(unittest.TestCase):
+    
+    def setUp(self):
+        self.analyzer = BalanceAnalyzer()
+        self.items = [
+            "Implement the API endpoint using REST architecture.",
+            [{"role": "human", "content": "Thank you so much!"},
+             {"role": "assistant", "content": "Let's debug the function together."}],
+            {"id": "example", "messages": [{"role": "human", "content": "I feel happy"}]},
+            "",
+        ] * 5
+    
+    def expected(self):
+        return [self.analyzer._analyze_item(item) for item in self.items]
+    
+    def test_analyze_many_in_process(self):
+        """Single-worker batches match item-by-item analysis"""
+        results = list(self.analyzer.analyze_many(self.items, workers=1))
+        self.assertEqual(results, self.expected())
+    
+    def test_analyze_many_process_pool(self):
+        """Pooled batches are returned in input order"""
+        results = self.analyzer.analyze_many(iter(self.items), workers=2, chunksize=3)
+        self.assertEqual(list(results), self.expected())
+    
+    def test_analyze_many_is_lazy(self):
+        """Results stream from a generator without consuming it up front"""
+        results = self.analyzer.analyze_many(("I feel happy" for _ in range(10 ** 9)), workers=1)
+        self.assertEqual(next(results), 0.0)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
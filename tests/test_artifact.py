@@ -0,0 +1,115 @@
+"""
+Unit tests for the precompiled pattern artifact
+"""
+
+import io
+import os
+import pickle
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from src import artifact, matcher
+from src.analyzer import BalanceAnalyzer
+from src.cli import main
+from src.comprehensive_analyzer import ComprehensiveAnalyzer
+from src.matcher import PatternMatcher, _DeferredPattern, get_matcher
+from src.profiler import PatternProfiler
+
+
+TEXTS = [
+    "Implement the API endpoint using REST architecture and JSON schema validation.",
+    "Thank you! I'm not sure, but I feel happy. if (x) { return data; }",
+    "As we discussed, the Welsh-Winters Balance needs technical and emotional care.",
+]
+
+
+class TestArtifact(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'matchers.pickle')
+        environment = mock.patch.dict(os.environ, {artifact.ARTIFACT_ENV: self.path})
+        environment.start()
+        self.addCleanup(environment.stop)
+        self.addCleanup(self.reset_matchers)
+        self.reset_matchers()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    @staticmethod
+    def reset_matchers():
+        matcher._artifact_matchers = None
+        matcher._cached_matcher.cache_clear()
+
+    def test_loaded_matchers_count_like_compiled(self):
+        """Analyzers use the artifact's matchers, with identical results"""
+        artifact.build_artifact()
+        self.reset_matchers()
+        for backend in matcher.BACKENDS:
+            for factory in (BalanceAnalyzer, ComprehensiveAnalyzer):
+                loaded = factory(backend=backend).matcher
+                compiled = PatternMatcher(loaded.categories, backend)
+                self.assertTrue(any(isinstance(entry[2], _DeferredPattern) for entry in loaded._entries))
+                for text in TEXTS:
+                    self.assertEqual(loaded.scan(text, {'technical': 3}),
+                                     compiled.scan(text, {'technical': 3}))
+        self.assertEqual(len(artifact.load_artifact()), 4)
+
+    def test_regexes_compile_on_first_use(self):
+        """Only the regexes a scan confirms with are compiled"""
+        artifact.build_artifact()
+        self.reset_matchers()
+        loaded = BalanceAnalyzer().matcher
+        loaded.count(TEXTS[1])
+        compiled = [entry for entry in loaded._entries if not isinstance(entry[2], _DeferredPattern)]
+        self.assertTrue(compiled)
+        self.assertLess(len(compiled), len(loaded._entries))
+        index = next(i for i, entry in enumerate(loaded._entries) if isinstance(entry[2], _DeferredPattern))
+        self.assertEqual(loaded._entries[index][2].pattern, loaded._entries[index][1])
+        self.assertNotIsInstance(loaded._entries[index][2], _DeferredPattern)
+
+    def test_stale_or_unreadable_artifacts_are_ignored(self):
+        """Changed sources, foreign files and disabled loading fall back to compiling"""
+        artifact.build_artifact()
+        with mock.patch.object(artifact, 'source_digest', return_value='0' * 32):
+            self.assertEqual(artifact.load_artifact(), {})
+
+        with open(self.path, 'wb') as f:
+            f.write(b'not a pickle')
+        self.assertEqual(artifact.load_artifact(), {})
+
+        with mock.patch.dict(os.environ, {artifact.ARTIFACT_ENV: ''}):
+            self.assertIsNone(artifact.default_path())
+            self.assertEqual(artifact.load_artifact(), {})
+
+    def test_pattern_set_changes_miss(self):
+        """Pattern sets not in the artifact are compiled as before"""
+        artifact.build_artifact(matchers=[PatternMatcher({'x': [r'\bx\b']})])
+        self.reset_matchers()
+        self.assertNotIsInstance(get_matcher({'x': [r'\bx\b', r'\by\b']})._entries[0][2],
+                                 _DeferredPattern)
+        self.assertIsInstance(get_matcher({'x': [r'\bx\b']})._entries[0][2], _DeferredPattern)
+
+    def test_pickled_matcher_drops_profiler(self):
+        """Pickling keeps the indexes but not the compiled regexes or a profiler"""
+        original = PatternMatcher({'x': [r'\bAPI\b', r'\bif\s*\(']})
+        PatternProfiler().attach(original)
+        copy = pickle.loads(pickle.dumps(original))
+        self.assertIsNone(copy.profiler)
+        self.assertEqual(copy.fingerprint, original.fingerprint)
+        self.assertEqual(copy.count('API if (x)'), {'x': 2})
+
+    def test_cli_build(self):
+        """The build-artifact command writes the artifact"""
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(main(['build-artifact']), 0)
+        self.assertIn(self.path, output.getvalue())
+        self.assertEqual(len(artifact.load_artifact()), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
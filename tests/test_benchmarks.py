@@ -0,0 +1,64 @@
+"""
+Smoke tests for the benchmark suite and its corpus generator
+"""
+
+import unittest
+from benchmarks.generator import ConversationGenerator, to_transcript
+from benchmarks.run import compare, percentile, run_benchmarks
+from src.analyzer import BalanceAnalyzer
+from src.comprehensive_analyzer import ComprehensiveAnalyzer
+
+
+class TestConversationGenerator(unittest.TestCase):
+
+    def setUp(self):
+        self.generator = ConversationGenerator(seed=7)
+
+    def test_seeded(self):
+        """Equal seeds produce equal corpora of the requested size"""
+        corpus = self.generator.corpus(conversations=3, turns=5)
+        self.assertEqual(corpus, ConversationGenerator(seed=7).corpus(conversations=3, turns=5))
+        self.assertNotEqual(corpus, ConversationGenerator(seed=8).corpus(conversations=3, turns=5))
+        self.assertEqual([len(c['messages']) for c in corpus], [5, 5, 5])
+
+    def test_technical_ratio(self):
+        """The technical ratio moves the corpus balance"""
+        analyzer = BalanceAnalyzer()
+
+        def overall(ratio):
+            corpus = self.generator.corpus(conversations=5, turns=10, technical_ratio=ratio)
+            return [analyzer.analyze_conversation(c['messages'])['overall_balance'] for c in corpus]
+
+        self.assertLess(max(overall(0.0)), min(overall(1.0)))
+
+    def test_transcript_round_trip(self):
+        """Rendered transcripts extract back into the same turns"""
+        conversation = self.generator.corpus(conversations=1, turns=4)[0]
+        turns = ComprehensiveAnalyzer()._extract_turns(to_transcript(conversation))
+        self.assertEqual([t['text'] for t in turns], [m['content'] for m in conversation['messages']])
+
+
+class TestBenchmarkRunner(unittest.TestCase):
+
+    def test_report(self):
+        """Every case reports throughput and latency percentiles"""
+        report = run_benchmarks(conversations=2, turns=4)
+        self.assertEqual(set(report['results']), {
+            'analyze_text', 'analyze_conversation', 'analyze_conversation_file',
+            'extract_turns', 'calculate_trajectory'
+        })
+        for result in report['results'].values():
+            self.assertGreater(result['turns_per_sec'], 0)
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+        self.assertEqual(compare(report, report), {name: 0.0 for name in report['results']})
+
+    def test_percentile(self):
+        """Percentiles use the nearest-rank method"""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.5), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile([3.0], 0.99), 3.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
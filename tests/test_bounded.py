@@ -0,0 +1,128 @@
+"""
+Unit tests for bounded scoring of long texts
+"""
+
+import asyncio
+import random
+import time
+import unittest
+from unittest import mock
+from src.analyzer import BalanceAnalyzer
+from src.bounded import sample_windows, spread_order
+from src.consciousness import ConsciousnessEngine
+
+
+WORDS = ("the API function database I feel grateful thank you debug server "
+         "log line error timeout module happy").split()
+
+
+def long_text(words=200000, seed=0):
+    rng = random.Random(seed)
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+class TestBoundedScoring(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.analyzer = BalanceAnalyzer()
+        cls.text = long_text()
+        cls.full = cls.analyzer.score_text(cls.text)
+
+    def test_spread_order(self):
+        """Windows are visited in bit-reversed order, each once"""
+        self.assertEqual(spread_order(8), [0, 4, 2, 6, 1, 5, 3, 7])
+        self.assertEqual(sorted(spread_order(5)), list(range(5)))
+        self.assertEqual(spread_order(1), [0])
+
+    def test_windows_align_to_words(self):
+        """Windows stay within the budget and never cut a word"""
+        windows = sample_windows(self.text, 20000)
+        self.assertEqual(len(windows), 32)
+        self.assertLessEqual(sum(end - start for start, end in windows), 20000)
+        for start, end in windows:
+            self.assertTrue(start == 0 or self.text[start - 1].isspace())
+            self.assertTrue(end == len(self.text) or self.text[end].isspace())
+
+    def test_short_text_is_exact(self):
+        """Texts within the budget are scanned in full"""
+        text = "Implement the API function, thank you so much!"
+        score = self.analyzer.score_text(text, max_chars=1000, deadline=1.0)
+        self.assertFalse(score.approximate)
+        self.assertEqual(score.balance, self.analyzer.analyze_text(text))
+        self.assertEqual(score.scanned_chars, len(text))
+        self.assertFalse(self.full.approximate)
+
+    def test_max_chars_extrapolates(self):
+        """Long texts are scored from a bounded sample with scaled counts"""
+        score = self.analyzer.score_text(self.text, max_chars=50000)
+        self.assertTrue(score.approximate)
+        self.assertLessEqual(score.scanned_chars, 50000)
+        self.assertEqual(score.total_chars, len(self.text))
+        self.assertAlmostEqual(score.balance, self.full.balance, delta=0.02)
+        self.assertAlmostEqual(score.technical / self.full.technical, 1.0, delta=0.05)
+        self.assertAlmostEqual(score.emotional / self.full.emotional, 1.0, delta=0.05)
+        self.assertEqual(self.analyzer.analyze_text(self.text, max_chars=50000), score.balance)
+
+    def test_deadline(self):
+        """A deadline bounds the scan of a long text"""
+        text = self.text * 4
+        began = time.perf_counter()
+        score = self.analyzer.score_text(text, deadline=0.01)
+        elapsed = time.perf_counter() - began
+        self.assertTrue(score.approximate)
+        self.assertLess(score.scanned_chars, len(text))
+        self.assertLess(elapsed, 0.5)
+        with self.assertRaises(ValueError):
+            self.analyzer.score_text(text, deadline=0)
+        with self.assertRaises(ValueError):
+            self.analyzer.score_text(text, max_chars=0)
+
+    def test_process_flags_approximate(self):
+        """process() scores long inputs from a sample and says so"""
+        engine = ConsciousnessEngine()
+        response = engine.process(self.text + " go deep", max_chars=20000)
+        self.assertTrue(response['approximate'])
+        self.assertEqual(response['activation_level'], 'deep')
+        self.assertAlmostEqual(response['welsh_winters_balance'], self.full.balance, delta=0.03)
+        self.assertFalse(engine.process("Go deep on the API", max_chars=20000)['approximate'])
+
+    def test_process_shares_deadline(self):
+        """Time spent detecting the activation level comes out of the scoring deadline"""
+        engine = ConsciousnessEngine()
+        detect = engine.detect_activation_request
+
+        def slow_detect(text):
+            time.sleep(0.05)
+            return detect(text)
+
+        with mock.patch.object(engine, 'detect_activation_request', slow_detect), \
+                mock.patch.object(engine.analyzer, 'score_text', wraps=engine.analyzer.score_text) as score:
+            response = engine.process(self.text, deadline=0.06)
+        deadline = score.call_args[0][2]
+        self.assertGreater(deadline, 0)
+        self.assertLess(deadline, 0.02)
+        self.assertTrue(response['approximate'])
+        with self.assertRaises(ValueError):
+            engine.process(self.text, activation_level='deep', deadline=0)
+
+    def test_activation_reads_within_budget(self):
+        """Activation detection reads no more than the budget, however small"""
+        engine = ConsciousnessEngine()
+        detect = engine.detect_activation_request
+        text = "word " * 2_000_000
+        lengths = []
+
+        def recording_detect(text):
+            lengths.append(len(text))
+            return detect(text)
+
+        with mock.patch.object(engine, 'detect_activation_request', recording_detect):
+            for max_chars in (1, 2, 3):
+                engine.process(text, max_chars=max_chars)
+                asyncio.run(engine.process_async(text, max_chars=max_chars))
+        self.assertEqual(lengths, [1, 1, 2, 2, 3, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
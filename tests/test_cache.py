@@ -0,0 +1,79 @@
+"""
+Unit tests for the scan result cache
+"""
+
+import pickle
+import unittest
+from src.analyzer import BalanceAnalyzer
+from src.cache import ResultCache
+from src.matcher import PatternMatcher
+
+
+TEXTS = [
+    "Hello! Thank you so much, I appreciate it.",
+    "Implement the API endpoint and debug the function.",
+    "I feel grateful to build this database together.",
+]
+
+
+class TestResultCache(unittest.TestCase):
+
+    def test_cached_results_unchanged(self):
+        """Cached analyses equal uncached ones, and repeats are hits"""
+        plain = BalanceAnalyzer()
+        cached = BalanceAnalyzer(cache=ResultCache())
+        for _ in range(3):
+            for text in TEXTS:
+                self.assertEqual(cached.analyze_text(text), plain.analyze_text(text))
+                self.assertEqual(cached.get_pattern_breakdown(text), plain.get_pattern_breakdown(text))
+        messages = [{'role': 'user', 'content': text} for text in TEXTS]
+        self.assertEqual(cached.analyze_conversation(messages), plain.analyze_conversation(messages))
+
+        stats = cached.cache.stats()
+        self.assertEqual(stats['misses'], len(TEXTS))
+        # 3 rounds x 2 calls per text, plus the conversation, minus first scans
+        self.assertEqual(stats['hits'], len(TEXTS) * 7 - len(TEXTS))
+        self.assertEqual(stats['entries'], len(TEXTS))
+
+    def test_pattern_sets_do_not_collide(self):
+        """The same text scanned by different pattern sets is cached separately"""
+        cache = ResultCache()
+        first = PatternMatcher({'a': [r'\bapi\b', r'\bdata\b']})
+        second = PatternMatcher({'a': [r'\bdata\b', r'\bapi\b']})
+        text = "api api data"
+        self.assertEqual(cache.scan_counts(first, text), [2, 1])
+        self.assertEqual(cache.scan_counts(second, text), [1, 2])
+        self.assertEqual(cache.scan_counts(first, text), [2, 1])
+        self.assertEqual(len(cache), 2)
+
+    def test_lru_eviction(self):
+        """The least recently used entry is evicted past max_entries"""
+        cache = ResultCache(max_entries=2)
+        matcher = BalanceAnalyzer().matcher
+        cache.scan_counts(matcher, TEXTS[0])
+        cache.scan_counts(matcher, TEXTS[1])
+        cache.scan_counts(matcher, TEXTS[0])
+        cache.scan_counts(matcher, TEXTS[2])
+        self.assertEqual(cache.stats()['evictions'], 1)
+        cache.scan_counts(matcher, TEXTS[0])
+        self.assertEqual(cache.stats()['hits'], 2)
+
+    def test_byte_limit(self):
+        """The byte budget bounds the cache size"""
+        cache = ResultCache(max_bytes=600)
+        matcher = BalanceAnalyzer().matcher
+        for index in range(20):
+            cache.scan_counts(matcher, f"the API {index}")
+        self.assertLessEqual(cache.stats()['bytes'], 600)
+        self.assertGreater(cache.stats()['evictions'], 0)
+
+    def test_pickles_empty(self):
+        """Caches sent to worker processes start empty with the same limits"""
+        cache = ResultCache(max_entries=5)
+        cache.scan_counts(BalanceAnalyzer().matcher, TEXTS[0])
+        copy = pickle.loads(pickle.dumps(cache))
+        self.assertEqual((copy.max_entries, len(copy)), (5, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+Unit tests for archive streaming and the command line interface
+"""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+from unittest import mock
+from src import corpus
+from src.analyzer import BalanceAnalyzer
+from src.cli import main
+from src.comprehensive_analyzer import ComprehensiveAnalyzer
+from src.corpus import iter_conversations
+
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'sample_conversations.json')
+
+
+def load_sample():
+    with open(SAMPLE_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)['conversations']
+
+
+class TestCorpusReader(unittest.TestCase):
+
+    def test_json_document(self):
+        """Pretty-printed JSON archives are streamed element by element"""
+        with mock.patch.object(corpus, 'READ_SIZE', 7):
+            with open(SAMPLE_PATH, 'r', encoding='utf-8') as f:
+                conversations = list(iter_conversations(f))
+        self.assertEqual(conversations, load_sample())
+
+    def test_jsonl(self):
+        """JSONL archives yield one conversation per non-blank line"""
+        sample = load_sample()
+        stream = io.StringIO('\n'.join(json.dumps(c) for c in sample) + '\n\n')
+        self.assertEqual(list(iter_conversations(stream)), sample)
+
+    def test_nested_conversations_key(self):
+        """Only the top-level 'conversations' member is streamed"""
+        sample = load_sample()
+        document = {
+            'metadata': {'conversations': [{'x': 1}], 'note': '"conversations": []'},
+            'conversations': sample
+        }
+        with mock.patch.object(corpus, 'READ_SIZE', 5):
+            conversations = list(iter_conversations(io.StringIO(json.dumps(document, indent=2))))
+        self.assertEqual(conversations, sample)
+        with self.assertRaises(ValueError):
+            list(iter_conversations(io.StringIO(json.dumps({'metadata': {'conversations': []}}, indent=2))))
+
+    def test_top_level_array(self):
+        """A bare JSON array of conversations is accepted"""
+        sample = load_sample()
+        stream = io.StringIO(json.dumps(sample, indent=2))
+        self.assertEqual(list(iter_conversations(stream)), sample)
+
+
+class TestAnalyzeCommand(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.sample = load_sample()
+        self.input_path = os.path.join(self.tmpdir.name, 'archive.jsonl')
+        with open(self.input_path, 'w', encoding='utf-8') as f:
+            for conversation in self.sample:
+                f.write(json.dumps(conversation) + '\n')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def run_cli(self, *args):
+        output_path = os.path.join(self.tmpdir.name, 'results.jsonl')
+        self.assertEqual(main(['analyze', self.input_path, '-o', output_path] + list(args)), 0)
+        with open(output_path, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_basic_analyzer(self):
+        """Each output line holds the conversation id and its analysis"""
+        analyzer = BalanceAnalyzer()
+        records = self.run_cli()
+        self.assertEqual([r['id'] for r in records], [c['id'] for c in self.sample])
+        for record, conversation in zip(records, self.sample):
+            expected = analyzer.analyze_conversation(conversation['messages'])
+            self.assertEqual(record['overall_balance'], expected['overall_balance'])
+
+    def test_comprehensive_analyzer_with_jobs(self):
+        """Pooled comprehensive scoring matches in-process analysis"""
+        analyzer = ComprehensiveAnalyzer()
+        records = self.run_cli('--analyzer', 'comprehensive', '--jobs', '2', '--chunksize', '1')
+        for record, conversation in zip(records, self.sample):
+            expected = analyzer.analyze_messages(conversation['messages'])
+            self.assertEqual(record['overall_metrics'], json.loads(json.dumps(expected['overall_metrics'])))
+            self.assertEqual(record['total_turns'], len(conversation['messages']))
+
+    def test_turn_cache(self):
+        """A warm rerun with --turn-cache writes the same results"""
+        cache_path = os.path.join(self.tmpdir.name, 'turns.sqlite')
+        cold = self.run_cli('--analyzer', 'comprehensive', '--turn-cache', cache_path)
+        warm = self.run_cli('--analyzer', 'comprehensive', '--turn-cache', cache_path, '--jobs', '2')
+        self.assertEqual(warm, cold)
+        with self.assertRaises(SystemExit):
+            main(['analyze', self.input_path, '--turn-cache', cache_path])
+
+    def test_profile_report(self):
+        """--profile prints a ranked pattern report to stderr"""
+        stderr = io.StringIO()
+        with redirect_stderr(stderr):
+            self.run_cli('--profile', '5')
+        self.assertIn('scans', stderr.getvalue())
+        with self.assertRaises(SystemExit), redirect_stderr(io.StringIO()):
+            self.run_cli('--profile', '--jobs', '2')
+
+
+if __name__ == '__main__':
+    unittest.main()
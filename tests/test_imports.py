@@ -0,0 +1,68 @@
+"""
+Import-cost tests: the package must stay cheap to import
+"""
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+# Modules that are slow to import and only needed by optional features
+HEAVY_MODULES = ['numpy', 'asyncio', 'sqlite3', 'concurrent.futures', 'multiprocessing',
+                 'src.comprehensive_analyzer', 'src.consciousness', 'src.table', 'src.store']
+
+# Wall-clock budget for importing one analyzer, in seconds; generous so a
+# loaded CI machine does not fail, yet far below the cost of eager imports
+IMPORT_BUDGET = 0.25
+
+
+def run_import(statement):
+    """Run an import in a fresh interpreter; return (seconds, loaded modules)"""
+    code = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"{statement}\n"
+        "elapsed = time.perf_counter() - start\n"
+        "print(json.dumps([elapsed, sorted(sys.modules)]))\n"
+    )
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    elapsed, modules = json.loads(output)
+    return elapsed, set(modules)
+
+
+class TestImportCost(unittest.TestCase):
+
+    def test_package_import_is_lazy(self):
+        """Importing the package loads no analyzer modules"""
+        _, modules = run_import("import src")
+        self.assertFalse({m for m in modules if m.startswith('src.')})
+
+    def test_balance_analyzer_budget(self):
+        """Importing BalanceAnalyzer loads only what it needs, within budget"""
+        elapsed, modules = run_import("from src import BalanceAnalyzer")
+        self.assertIn('src.analyzer', modules)
+        self.assertEqual([m for m in HEAVY_MODULES if m in modules], [])
+        self.assertLess(elapsed, IMPORT_BUDGET)
+
+    def test_cli_import(self):
+        """The CLI entry point defers analyzer and optional imports"""
+        _, modules = run_import("from src.cli import main")
+        self.assertEqual([m for m in HEAVY_MODULES if m in modules], [])
+
+    def test_lazy_attributes(self):
+        """Every exported name resolves, and unknown names still raise"""
+        import src
+        for name in src.__all__:
+            self.assertTrue(callable(getattr(src, name)), name)
+        self.assertIn('ComprehensiveAnalyzer', dir(src))
+        with self.assertRaises(AttributeError):
+            src.NotAName
+
+
+if __name__ == '__main__':
+    unittest.main()
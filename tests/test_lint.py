@@ -0,0 +1,93 @@
+"""
+Unit tests for the pattern set linter
+"""
+
+import io
+import json
+import unittest
+from contextlib import redirect_stdout
+
+from src.cli import main
+from src.comprehensive_analyzer import ComprehensiveAnalyzer
+from src.lint import format_lint, lint_patterns
+from src.matcher import PatternMatcher
+
+
+def kinds(report, pattern):
+    return sorted(finding['kind'] for finding in report['findings'] if finding['pattern'] == pattern)
+
+
+class TestLintPatterns(unittest.TestCase):
+
+    def setUp(self):
+        self.categories = {
+            'emotional': [r'\bfeel\b', r'\bI feel\b', r'\b♥\b', r'\b!+\b', r'\blet\'s\b'],
+            'technical': [r'\blet\b', r'\bsource:\b', r'\btechnical.*emotional\b',
+                          r'\b(\w+\s*)+done\b', r'\b(unclosed', r'\bFEEL\b'],
+        }
+        self.report = lint_patterns(self.categories)
+
+    def test_findings(self):
+        """Each problem is reported against the pattern causing it"""
+        self.assertEqual(kinds(self.report, r'\b♥\b'), ['between-words'])
+        self.assertEqual(kinds(self.report, r'\b!+\b'), ['between-words'])
+        self.assertEqual(kinds(self.report, r'\bsource:\b'), ['between-words'])
+        self.assertEqual(kinds(self.report, r'\btechnical.*emotional\b'), ['greedy-wildcard'])
+        self.assertEqual(kinds(self.report, r'\b(\w+\s*)+done\b'), ['nested-quantifier'])
+        self.assertEqual(kinds(self.report, r'\b(unclosed'), ['invalid'])
+        self.assertEqual(kinds(self.report, r'\bFEEL\b'), ['duplicate'])
+        self.assertEqual(kinds(self.report, r'\bI feel\b'), ['overlap', 'overlap'])
+        self.assertEqual(kinds(self.report, r'\blet\'s\b'), ['overlap'])
+        self.assertEqual(kinds(self.report, r'\bfeel\b'), [])
+
+    def test_served_by_and_optimized_set(self):
+        """Patterns are listed with how the matcher runs them and their rewrite"""
+        rows = {row['pattern']: row for row in self.report['patterns']}
+        self.assertEqual(rows[r'\bfeel\b']['served_by'], 'lookup')
+        self.assertEqual(rows[r'\bI feel\b']['served_by'], 'candidate')
+        self.assertEqual(rows[r'\b♥\b']['served_by'], 'findall')
+        self.assertEqual(rows[r'\b♥\b']['optimized'], r'♥(?<=\w♥)\b')
+        self.assertIsNone(rows[r'\bfeel\b']['optimized'])
+        self.assertNotIn(r'\b(unclosed', rows)
+
+        optimized = self.report['optimized']
+        self.assertEqual(list(optimized), list(self.categories))
+        self.assertEqual(optimized['emotional'][3], r'!(?<=\w!)!*\b')
+
+    def test_samples_are_timed(self):
+        """With samples every pattern gets a time and hit count"""
+        report = lint_patterns(self.categories, ["I feel great♥thanks", "let's feel"])
+        rows = {row['pattern']: row for row in report['patterns']}
+        self.assertEqual(rows[r'\bfeel\b']['hits'], 2)
+        self.assertEqual(rows[r'\b♥\b']['hits'], 1)
+        self.assertTrue(all(row['time_us'] >= 0 for row in report['patterns']))
+        self.assertIn('us/scan', format_lint(report))
+
+    def test_analyzer_patterns(self):
+        """The built-in sets only need whole-text scans for the between-words patterns"""
+        matcher = ComprehensiveAnalyzer().matcher
+        report = lint_patterns(matcher.categories)
+        self.assertFalse([f for f in report['findings'] if f['severity'] == 'error'])
+        whole_text = [row for row in report['patterns'] if row['served_by'] == 'findall']
+        self.assertTrue(whole_text)
+        self.assertTrue(all(row['optimized'] for row in whole_text))
+
+        optimized = PatternMatcher(report['optimized'])
+        text = "source: it works!!really I♥you, wow!! :)"
+        self.assertEqual(optimized.scan(text)[0], matcher.scan(text)[0])
+
+    def test_cli(self):
+        """lint-patterns prints the text or JSON report"""
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(main(['lint-patterns', '--json']), 0)
+        report = json.loads(output.getvalue())
+        self.assertIn('emotional', report['optimized'])
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(main(['lint-patterns', '--analyzer', 'comprehensive']), 0)
+        self.assertIn('between-words', output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
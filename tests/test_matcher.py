@@ -0,0 +1,177 @@
+"""
+Unit tests for the compiled pattern matcher
+"""
+
+import re
+import unittest
+from src.analyzer import BalanceAnalyzer
+from src.automaton import parse_literal
+from src.comprehensive_analyzer import ComprehensiveAnalyzer
+from src.matcher import PatternMatcher, analyze_prefix, optimize_pattern
+from src.patterns import TechnicalPatterns, EmotionalPatterns
+
+
+SAMPLE_TEXTS = [
+    "",
+    "Implement the API endpoint using REST architecture and JSON schema validation.",
+    "I feel grateful and happy to be working together on this amazing journey!",
+    "if (x) { return data; } else if(y) { log the error }",
+    "Thank you! Thanks, I think we can build it. Let's share the data structure.",
+    "I'm not sure, Im not sure, I don't know: the Welsh-Winters Balance is WelshWinters balance.",
+    "FUNCTION Function function functions dysfunction _function function_",
+    "I♥you, wow!!great, 😊 and the ſhare of KEY data (Kelvin sign)",
+]
+
+
+def findall_counts(text, patterns):
+    return [len(re.findall(pattern, text, re.IGNORECASE)) for pattern in patterns]
+
+
+class TestPatternMatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.categories = {
+            'technical': TechnicalPatterns.get_patterns(),
+            'emotional': EmotionalPatterns.get_patterns(),
+            'extra': [r'\bI\'?m not sure\b', r'\bWelsh-?Winters Balance\b',
+                      r'\btechnical.*emotional\b', r'\bsource:\b', r'\bcolou?r\b'],
+        }
+        self.matcher = PatternMatcher(self.categories)
+
+    def test_counts_match_findall(self):
+        """Per-pattern counts are identical to independent re.findall calls"""
+        for text in SAMPLE_TEXTS:
+            counts, _ = self.matcher.scan(text)
+            expected = []
+            for patterns in self.categories.values():
+                expected.extend(findall_counts(text, patterns))
+            self.assertEqual(counts, expected, text)
+            self.assertEqual(len(self.matcher), len(counts))
+
+    def test_breakdown_matches_findall(self):
+        """Breakdown lists every matched pattern with its findall count"""
+        text = SAMPLE_TEXTS[4]
+        breakdown = self.matcher.breakdown(text)
+        for name, patterns in self.categories.items():
+            expected = {}
+            for pattern, count in zip(patterns, findall_counts(text, patterns)):
+                if count > 0:
+                    expected[pattern] = count
+            self.assertEqual(breakdown[name], expected)
+
+    def test_examples_in_pattern_order(self):
+        """Examples are collected in pattern order, then match order"""
+        text = "Let's debug the function, then test the function again"
+        counts, per_entry = self.matcher.scan(text, {'technical': 2})
+        examples = self.matcher.examples(per_entry, {'technical': 2})
+        self.assertEqual(examples['technical'], ['function', 'function'])
+
+    def test_invalid_patterns_skipped(self):
+        """Invalid regex patterns are ignored rather than raising"""
+        matcher = PatternMatcher({'broken': [r'\b(unclosed', r'\bvalid\b']})
+        self.assertEqual(matcher.count("a valid text"), {'broken': 1})
+        self.assertEqual(len(matcher), 1)
+
+    def test_prefix_analysis(self):
+        """Literal prefixes are only trusted when the pattern guarantees them"""
+        self.assertEqual(analyze_prefix(r'\bAPI\b'), ('exact', 'api'))
+        self.assertEqual(analyze_prefix(r'\bif\s*\('), ('prefix', 'if'))
+        self.assertEqual(analyze_prefix(r'\bcolou?r\b'), ('prefix', 'colo'))
+        self.assertEqual(analyze_prefix(r'\bfoo'), ('prefix', 'foo'))
+        self.assertEqual(analyze_prefix(r'\b!+\b')[0], 'fallback')
+
+    def test_optimized_patterns_equivalent(self):
+        """Rewritten patterns find the same matches as the originals"""
+        self.assertEqual(optimize_pattern(r'\b♥\b'), r'♥(?<=\w♥)\b')
+        self.assertEqual(optimize_pattern(r'\b!+\b'), r'!(?<=\w!)!*\b')
+        for pattern in [r'\bAPI\b', r'\b!*\b', r'\b!+?\b', r'\b!|x']:
+            self.assertEqual(optimize_pattern(pattern), pattern)
+
+        texts = SAMPLE_TEXTS + ["a!!b a!!,b !x x! ...a a...b a.b", "I♥♥you ♥ x♥"]
+        for pattern in [r'\b!+\b', r'\b♥\b', r'\b\.\.\.\b', r'\b\.(b)', r'\b!\s*\w']:
+            optimized = re.compile(optimize_pattern(pattern), re.IGNORECASE)
+            for text in texts:
+                self.assertEqual(optimized.findall(text), re.findall(pattern, text, re.IGNORECASE),
+                                 (pattern, text))
+
+
+class TestAutomatonBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.categories = {
+            'technical': TechnicalPatterns.get_patterns(),
+            'emotional': EmotionalPatterns.get_patterns(),
+            'extra': [r'\bsource:\b', r'\b0\.5\b', r'\bI\'?m not sure\b', r'\bfeel\b'],
+        }
+
+    def test_parse_literal(self):
+        """Only pure word literals are routed to the automaton"""
+        self.assertEqual(parse_literal(r'\bthank you\b'), 'thank you')
+        self.assertEqual(parse_literal(r'\blet\'s\b'), "let's")
+        self.assertEqual(parse_literal(r'\b0\.5\b'), '0.5')
+        self.assertIsNone(parse_literal(r'\bif\s*\('))
+        self.assertIsNone(parse_literal(r'\bWelsh-?Winters\b'))
+        self.assertIsNone(parse_literal(r'\b♥\b'))
+
+    def test_backends_agree(self):
+        """Automaton and regex backends produce identical scans"""
+        regex = PatternMatcher(self.categories, backend='regex')
+        automaton = PatternMatcher(self.categories, backend='automaton')
+        limits = {'technical': 2, 'emotional': 2, 'extra': 1}
+        for text in SAMPLE_TEXTS + ["source:x and source: 0.5 0.55 I feel"]:
+            self.assertEqual(automaton.scan(text, limits), regex.scan(text, limits), text)
+
+    def test_unknown_backend(self):
+        """Unknown backends are rejected up front"""
+        with self.assertRaises(ValueError):
+            PatternMatcher(self.categories, backend='hyperscan')
+        with self.assertRaises(ValueError):
+            ComprehensiveAnalyzer(backend='hyperscan')
+
+    def test_analyzers_accept_backend(self):
+        """Both analyzers give the same results with either backend"""
+        text = SAMPLE_TEXTS[4]
+        self.assertEqual(BalanceAnalyzer(backend='automaton').analyze_text(text),
+                         BalanceAnalyzer().analyze_text(text))
+        comprehensive = ComprehensiveAnalyzer(backend='automaton')
+        self.assertEqual(comprehensive._count_patterns(text, comprehensive.emotional_patterns),
+                         ComprehensiveAnalyzer()._count_patterns(text, comprehensive.emotional_patterns))
+
+
+class TestAnalyzerUsesMatcher(unittest.TestCase):
+
+    def test_analyzer_counts_unchanged(self):
+        """BalanceAnalyzer totals equal the per-pattern findall totals"""
+        analyzer = BalanceAnalyzer()
+        for text in SAMPLE_TEXTS:
+            technical = sum(findall_counts(text, analyzer.technical_patterns))
+            emotional = sum(findall_counts(text, analyzer.emotional_patterns))
+            self.assertEqual(analyzer._count_patterns(text, analyzer.technical_patterns), technical)
+            self.assertEqual(analyzer.matcher.count(text),
+                             {'technical': technical, 'emotional': emotional})
+
+    def test_comprehensive_turn_single_scan(self):
+        """All six category counts and the examples come from one scan"""
+        analyzer = ComprehensiveAnalyzer()
+        categories = {
+            'technical': (analyzer.technical_patterns, 2),
+            'emotional': (analyzer.emotional_patterns, 2),
+            'uncertainty': (analyzer.uncertainty_patterns, 1),
+            'memory': (analyzer.memory_patterns, 1),
+            'hadrael': (analyzer.hadrael_patterns, 1),
+            'balance_awareness': (analyzer.balance_awareness_patterns, 0),
+        }
+        text = ("To clarify, as we discussed, I think the technical and emotional "
+                "balance matters: maybe implement the API together, I'm not sure.")
+        metrics = analyzer._analyze_turn({'speaker': 'human', 'text': text}, 0)
+        for name, (patterns, limit) in categories.items():
+            self.assertEqual(metrics[name + '_count'], sum(findall_counts(text, patterns)))
+            if limit:
+                expected = []
+                for pattern in patterns:
+                    expected.extend(re.findall(pattern, text, re.IGNORECASE)[:limit - len(expected)])
+                self.assertEqual(metrics['examples'][name], expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+"""
+Unit tests for batch and incremental trajectory metrics
+"""
+
+import random
+import unittest
+from unittest import mock
+from src import metrics
+from src.metrics import (
+    calculate_balance, calculate_trajectory, calculate_trajectory_batch, hallucination_risk_score,
+    phase_detector, phase_detector_batch, PHASE_ORDER, TrajectoryAccumulator
+)
+
+
+def sample_rows(seed=7, count=200):
+    rng = random.Random(seed)
+    choices = [0.5, 0.56, 0.75, 0.8, 1.0, 0.0]
+    return [
+        [rng.choice(choices + [rng.random()]) for _ in range(rng.choice([0, 1, 3, 4, 5, 8, 20]))]
+        for _ in range(count)
+    ]
+
+
+class TestTrajectoryBatch(unittest.TestCase):
+
+    def assert_matches_scalar(self, result, rows):
+        for i, row in enumerate(rows):
+            expected = calculate_trajectory(row)
+            self.assertEqual(result['length'][i], len(row))
+            self.assertEqual(str(result['trend'][i]), expected['trend'])
+            self.assertAlmostEqual(float(result['volatility'][i]), expected['volatility'])
+            self.assertAlmostEqual(float(result['stability_score'][i]), expected['stability_score'])
+            self.assertEqual(list(result['phases_detected'][i]), expected['phases_detected'])
+            if row:
+                self.assertAlmostEqual(float(result['average_balance'][i]), expected['average_balance'])
+                self.assertAlmostEqual(float(result['end_balance'][i]), expected['end_balance'])
+                self.assertAlmostEqual(
+                    float(result['risk_score'][i]),
+                    hallucination_risk_score(expected['average_balance'], expected['volatility'])
+                )
+
+    def batch_inputs(self, rows):
+        flat = [balance for row in rows for balance in row]
+        offsets = [0]
+        for row in rows:
+            offsets.append(offsets[-1] + len(row))
+        return flat, offsets
+
+    @unittest.skipIf(metrics.load_numpy() is None, "NumPy not installed")
+    def test_numpy_offsets(self):
+        """Ragged rows given by offsets match calculate_trajectory"""
+        rows = sample_rows()
+        self.assert_matches_scalar(calculate_trajectory_batch(*self.batch_inputs(rows)), rows)
+
+    @unittest.skipIf(metrics.load_numpy() is None, "NumPy not installed")
+    def test_numpy_padded(self):
+        """Padded 2-D rows with lengths match calculate_trajectory"""
+        rows = sample_rows(seed=3)
+        width = max(len(row) for row in rows)
+        padded = [row + [0.0] * (width - len(row)) for row in rows]
+        result = calculate_trajectory_batch(padded, lengths=[len(row) for row in rows])
+        self.assert_matches_scalar(result, rows)
+
+    def test_pure_python_fallback(self):
+        """Without NumPy the batch API returns the same values as lists"""
+        rows = sample_rows(seed=11)
+        with mock.patch.object(metrics, 'np', None):
+            result = calculate_trajectory_batch(*self.batch_inputs(rows))
+        self.assertIsInstance(result['volatility'], list)
+        self.assert_matches_scalar(result, rows)
+
+    @unittest.skipIf(metrics.load_numpy() is None, "NumPy not installed")
+    def test_trend_threshold(self):
+        """Thirds about 0.1 apart get the same trend as calculate_trajectory"""
+        rng = random.Random(5)
+        rows = [[0.6, 1.0, 0.667, 0.429, 0.6, 0.8]]
+        for _ in range(3000):
+            rows.append([calculate_balance(rng.randint(0, 5), rng.randint(0, 5))
+                         for _ in range(rng.randint(3, 12))])
+        result = calculate_trajectory_batch(*self.batch_inputs(rows))
+        mismatched = [row for row, trend in zip(rows, result['trend'])
+                      if str(trend) != calculate_trajectory(row)['trend']]
+        self.assertEqual(mismatched, [])
+
+    def test_two_balances(self):
+        """Two-balance rows report insufficient data instead of raising"""
+        result = calculate_trajectory_batch([[0.2, 0.8]])
+        self.assertEqual(str(result['trend'][0]), 'insufficient_data')
+        self.assertAlmostEqual(float(result['volatility'][0]), 0.6)
+        self.assertEqual(calculate_trajectory([0.2, 0.8])['trend'], 'insufficient_data')
+
+    def test_phase_codes(self):
+        """Batch phase codes agree with phase_detector"""
+        balances = [0.3, 0.55, 0.56, 0.72, 0.75, 0.8, 0.85, 0.9]
+        codes = phase_detector_batch(balances)
+        self.assertEqual([PHASE_ORDER[code] for code in codes],
+                         [phase_detector(balance) for balance in balances])
+
+
+class TestTrajectoryAccumulator(unittest.TestCase):
+
+    def test_matches_calculate_trajectory(self):
+        """Metrics after every update equal a full recomputation"""
+        for row in sample_rows(seed=5, count=50):
+            accumulator = TrajectoryAccumulator()
+            for end, balance in enumerate(row, 1):
+                accumulator.update(balance)
+                if end == 2:
+                    continue
+                expected = calculate_trajectory(row[:end])
+                current = accumulator.to_dict()
+                self.assertEqual(current['trend'], expected['trend'])
+                self.assertEqual(current['phases_detected'], expected['phases_detected'])
+                for key in ('volatility', 'stability_score', 'average_balance', 'end_balance'):
+                    self.assertAlmostEqual(current[key], expected[key])
+
+    def test_trend_threshold(self):
+        """Thirds exactly 0.1 apart are not a shift, as in calculate_trajectory"""
+        row = [0.56, 0.5, 0.56, 0.08, 0.8, 0.56, 0.8, 0.56, 0.56]
+        self.assertEqual(TrajectoryAccumulator(row).trend, calculate_trajectory(row)['trend'])
+
+    def test_empty_and_short(self):
+        """Empty and two-balance accumulators do not raise"""
+        accumulator = TrajectoryAccumulator()
+        self.assertEqual(accumulator.to_dict(), calculate_trajectory([]))
+        self.assertIsNone(accumulator.risk_score)
+        accumulator.update(0.2).update(0.8)
+        self.assertEqual(accumulator.trend, 'insufficient_data')
+        self.assertAlmostEqual(accumulator.volatility, 0.6)
+        self.assertAlmostEqual(accumulator.risk_score, hallucination_risk_score(0.5, 0.6))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+Unit tests for the per-pattern profiler
+"""
+
+import unittest
+from src.analyzer import BalanceAnalyzer
+from src.comprehensive_analyzer import ComprehensiveAnalyzer
+from src.matcher import PatternMatcher
+from src.profiler import PatternProfiler
+
+
+class TestPatternProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.matcher = PatternMatcher({
+            'words': [r'\bapi\b', r'\bunused\b'],
+            'regex': [r'\bif\s*\(', r'\btechnical.*emotional\b', r'\b!+\b'],
+        })
+        self.texts = ["if (x) call the API", "technical and emotional, if(y)", "api api"]
+
+    def test_counts_and_hits(self):
+        """Calls, hits and texts matched are recorded per pattern"""
+        profiler = PatternProfiler()
+        with profiler.profiling(self.matcher):
+            results = [self.matcher.scan(text)[0] for text in self.texts]
+        self.assertIsNone(self.matcher.profiler)
+        self.assertEqual(results, [PatternMatcher(self.matcher.categories).scan(t)[0] for t in self.texts])
+
+        rows = {row['pattern']: row for row in profiler.report()}
+        self.assertEqual((rows[r'\bapi\b']['hits'], rows[r'\bapi\b']['texts_matched']), (3, 2))
+        self.assertEqual(rows[r'\bapi\b']['calls'], 0)
+        self.assertEqual((rows[r'\bif\s*\(']['calls'], rows[r'\bif\s*\(']['hits']), (2, 2))
+        self.assertEqual(rows[r'\b!+\b']['calls'], 3)
+        self.assertGreater(rows[r'\btechnical.*emotional\b']['time_s'], 0)
+        self.assertEqual(profiler.scans, 3)
+        self.assertEqual(sorted(profiler.never_matched()), [('regex', r'\b!+\b'), ('words', r'\bunused\b')])
+
+    def test_ranking(self):
+        """Reports are ranked by the requested key"""
+        profiler = PatternProfiler()
+        with profiler.profiling(self.matcher):
+            for text in self.texts:
+                self.matcher.scan(text)
+        hits = [row['hits'] for row in profiler.report('hits')]
+        self.assertEqual(hits, sorted(hits, reverse=True))
+        times = [row['time_s'] for row in profiler.report()]
+        self.assertEqual(times, sorted(times, reverse=True))
+        self.assertIn('never matched', profiler.format_report(top=2))
+        with self.assertRaises(ValueError):
+            profiler.report('name')
+
+    def test_analyzers(self):
+        """Profiling an analyzer covers every scan it makes"""
+        analyzer = ComprehensiveAnalyzer()
+        profiler = PatternProfiler()
+        messages = [{'role': 'user', 'content': text} for text in self.texts]
+        with profiler.profiling(analyzer, BalanceAnalyzer()):
+            analyzer.analyze_messages(messages)
+        self.assertEqual(profiler.scans, len(messages))
+        self.assertEqual({row['category'] for row in profiler.report()},
+                         set(analyzer.matcher.categories))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+"""
+Unit tests for compact turn records
+"""
+
+import json
+import pickle
+import unittest
+from src.analyzer import BalanceAnalyzer
+from src.comprehensive_analyzer import ComprehensiveAnalyzer
+from src.records import TurnAnalysis, TurnBalance, json_default, to_builtin
+
+
+class TestTurnRecords(unittest.TestCase):
+
+    def setUp(self):
+        self.messages = [
+            {'role': 'user', 'content': 'Can you debug this API function?'},
+            {'role': 'assistant', 'content': 'Happy to help, thank you! I think the database is slow.'},
+            {'role': 'user', 'content': 'Thanks, I feel grateful.'},
+        ]
+
+    def test_turn_balance_mapping(self):
+        """Turn balances read and compare like the dicts they replace"""
+        turn = BalanceAnalyzer().analyze_conversation(self.messages)['turn_balances'][0]
+        self.assertIsInstance(turn, TurnBalance)
+        self.assertFalse(hasattr(turn, '__dict__'))
+        self.assertEqual(turn['role'], 'user')
+        self.assertEqual(turn.get('missing', 'default'), 'default')
+        self.assertEqual(turn, {'turn': 1, 'role': 'user', 'balance': 1.0, 'technical': 3, 'emotional': 0})
+        self.assertEqual(list(turn), ['turn', 'role', 'balance', 'technical', 'emotional'])
+
+    def test_turn_analysis_dict_shape(self):
+        """to_dict renders the original per-turn dict, examples included"""
+        analyzer = ComprehensiveAnalyzer()
+        results = analyzer.analyze_messages(self.messages)
+        turn = results['turn_analysis'][1]
+        self.assertIsInstance(turn, TurnAnalysis)
+        rendered = turn.to_dict()
+        self.assertEqual(list(rendered), [
+            'turn_index', 'speaker', 'text_length', 'balance', 'phase', 'technical_count',
+            'emotional_count', 'uncertainty_count', 'memory_count', 'hadrael_count',
+            'balance_awareness_count', 'examples'
+        ])
+        _, per_entry = analyzer.matcher.scan(self.messages[1]['content'], analyzer.EXAMPLE_LIMITS)
+        self.assertEqual(rendered['examples'], analyzer.matcher.examples(per_entry, analyzer.EXAMPLE_LIMITS))
+        self.assertEqual(rendered['examples']['uncertainty'], ['I think'])
+        self.assertEqual(turn['examples'], rendered['examples'])
+
+    def test_serialization(self):
+        """Results holding records serialize to JSON and pickle"""
+        results = ComprehensiveAnalyzer().analyze_messages(self.messages)
+        self.assertEqual(json.loads(json.dumps(results, default=json_default)),
+                         json.loads(json.dumps(to_builtin(results))))
+        copy = pickle.loads(pickle.dumps(results['turn_analysis']))
+        self.assertEqual(copy, results['turn_analysis'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Unit tests for directory analysis and corpus reports
+"""
+
+import os
+import random
+import tempfile
+import unittest
+from src.comprehensive_analyzer import ComprehensiveAnalyzer
+from src.report import CorpusReport
+
+
+def transcript(turns):
+    lines = []
+    for index in range(turns):
+        if index % 2:
+            lines.append("Assistant: Of course, I'm happy to help. Perhaps the index is missing, to clarify.")
+        else:
+            lines.append("Human: Can you debug this API function and the database query?")
+    return '\n'.join(lines) + '\n'
+
+
+class TestAnalyzeDirectory(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = self.tmpdir.name
+        os.makedirs(os.path.join(self.root, 'nested'))
+        self.files = {
+            'short.txt': transcript(2),
+            'medium.txt': transcript(6),
+            os.path.join('nested', 'long.txt'): transcript(40),
+            'raw.txt': 'Just some notes about the API, no speakers at all.',
+        }
+        for name, content in self.files.items():
+            with open(os.path.join(self.root, name), 'w', encoding='utf-8') as f:
+                f.write(content)
+        with open(os.path.join(self.root, 'notes.md'), 'w', encoding='utf-8') as f:
+            f.write(transcript(4))
+        with open(os.path.join(self.root, 'broken.txt'), 'wb') as f:
+            f.write(b'Human: \xff\xfe not utf-8\n')
+        self.analyzer = ComprehensiveAnalyzer()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def expected_report(self):
+        report = CorpusReport()
+        for name in self.files:
+            report.add(self.analyzer.analyze_conversation_file(os.path.join(self.root, name)))
+        return report.to_dict()
+
+    def test_largest_first_in_process(self):
+        """Files are analyzed largest first and streamed with their path"""
+        results = list(self.analyzer.iter_directory(self.root, workers=1))
+        paths = [os.path.relpath(result['file_path'], self.root) for result in results]
+        readable = [path for path in paths if path != 'broken.txt']
+        self.assertEqual(readable, sorted(self.files, key=lambda name: -len(self.files[name])))
+        self.assertNotIn('notes.md', paths)
+        raw = next(result for result in results if result['file_path'].endswith('raw.txt'))
+        self.assertTrue(raw['raw_analysis'])
+
+    def test_report_matches_single_files(self):
+        """The corpus report combines the per-file results"""
+        streamed = []
+        report = self.analyzer.analyze_directory(self.root, workers=1, on_result=streamed.append)
+        expected = self.expected_report()
+        expected['failed'] = report['failed']
+        self.assertEqual(report, expected)
+        self.assertEqual(len(streamed), 5)
+        self.assertEqual(report['conversations'], 4)
+        self.assertEqual(report['raw_conversations'], 1)
+        self.assertEqual(report['total_turns'], 48)
+        self.assertEqual([os.path.basename(f['file_path']) for f in report['failed']], ['broken.txt'])
+        self.assertIn('UnicodeDecodeError', report['failed'][0]['error'])
+        phases = report['phase_progression']
+        self.assertEqual(sum(stats['turns'] for stats in phases.values()), 48)
+        self.assertAlmostEqual(sum(stats['turn_share'] for stats in phases.values()), 1.0)
+        self.assertEqual(sum(report['final_phases'].values()), 3)
+
+    def test_process_pool(self):
+        """A process pool gives the same report"""
+        serial = self.analyzer.analyze_directory(self.root, workers=1)
+        pooled = self.analyzer.analyze_directory(self.root, workers=2, use_mmap=True)
+        # Errors locate the bad byte differently when memory-mapped
+        pooled.pop('failed')
+        serial.pop('failed')
+        self.assertEqual(pooled, serial)
+
+    def test_order_independent(self):
+        """Adding the same results in any order gives an identical report"""
+        rng = random.Random(2)
+        lines = ["Can you debug this API function?", "I feel so grateful, thank you.",
+                 "Perhaps the index is missing.", "I'm happy to help, debug the server.",
+                 "Thank you, I appreciate the database query and the API.",
+                 "I love this, grateful and happy, fix the bug."]
+        results = [self.analyzer.analyze_messages(
+                       [{'role': 'user', 'content': rng.choice(lines)} for _ in range(rng.randint(1, 30))])
+                   for _ in range(60)]
+        expected = CorpusReport()
+        for result in results:
+            expected.add(result)
+        for _ in range(5):
+            rng.shuffle(results)
+            report = CorpusReport()
+            for result in results:
+                report.add(result)
+            self.assertEqual(report.to_dict(), expected.to_dict())
+
+    def test_glob(self):
+        """Only files matching the glob are analyzed"""
+        report = self.analyzer.analyze_directory(self.root, glob='*.md', workers=1)
+        self.assertEqual((report['conversations'], report['total_turns']), (1, 4))
+
+    def test_empty_report(self):
+        """An empty directory gives neutral metrics"""
+        report = CorpusReport().to_dict()
+        self.assertEqual(report['total_turns'], 0)
+        self.assertEqual(report['overall_metrics']['average_turn_balance'], 0.5)
+        self.assertEqual(report['hadrael_compliance']['compliance_level'], 'Not Applicable')
+
+
+if __name__ == '__main__':
+    unittest.main()
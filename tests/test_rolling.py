@@ -0,0 +1,68 @@
+"""
+Unit tests for rolling-window balance tracking
+"""
+
+import random
+import unittest
+from src.analyzer import BalanceAnalyzer
+from src.metrics import calculate_balance
+from src.rolling import RollingBalance
+
+
+class TestRollingBalance(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(3)
+        self.turns = [(rng.randint(0, 4), rng.randint(0, 4), rng.randint(0, 12)) for _ in range(60)]
+
+    def test_turn_windows(self):
+        """Each turn window equals the balance of its last N turns"""
+        rolling = RollingBalance(turn_windows=(1, 5, 20))
+        for end, counts in enumerate(self.turns, 1):
+            rolling.add_counts(*counts)
+            for size in (1, 5, 20):
+                recent = self.turns[max(0, end - size):end]
+                expected = calculate_balance(sum(t[0] for t in recent), sum(t[1] for t in recent))
+                self.assertAlmostEqual(rolling.balance(turns=size), expected)
+
+    def test_token_windows(self):
+        """Token windows pro-rate the oldest, partly covered turn"""
+        rolling = RollingBalance(turn_windows=(), token_windows=(7, 30))
+        for end, counts in enumerate(self.turns, 1):
+            rolling.add_counts(*counts)
+            for size in (7, 30):
+                # Brute force: walk back from the newest turn until size tokens
+                technical = emotional = 0.0
+                remaining = size
+                for turn_technical, turn_emotional, tokens in reversed(self.turns[:end]):
+                    if remaining <= 0:
+                        break
+                    share = 1.0 if tokens <= remaining else remaining / tokens
+                    technical += turn_technical * share
+                    emotional += turn_emotional * share
+                    remaining -= tokens
+                window = rolling.snapshot()['tokens'][size]
+                self.assertAlmostEqual(window['technical_count'], technical)
+                self.assertAlmostEqual(window['emotional_count'], emotional)
+                self.assertAlmostEqual(window['balance'], calculate_balance(technical, emotional))
+
+    def test_add_turn_counts_patterns(self):
+        """add_turn scores text with the analyzer's matcher"""
+        rolling = RollingBalance(turn_windows=(2,), token_windows=(100,))
+        texts = ["Implement the API function", "I feel grateful, thank you", "Debug the code"]
+        for text in texts:
+            snapshot = rolling.add_turn(text)
+        analyzer = BalanceAnalyzer()
+        self.assertAlmostEqual(snapshot['turns'][2]['balance'], analyzer.analyze_text(' '.join(texts[1:])))
+        self.assertAlmostEqual(snapshot['tokens'][100]['balance'], analyzer.analyze_text(' '.join(texts)))
+        self.assertEqual(snapshot['turns'][2]['turns'], 2)
+        self.assertEqual(rolling.total_turns, 3)
+
+    def test_invalid_size(self):
+        """Window sizes below one are rejected"""
+        with self.assertRaises(ValueError):
+            RollingBalance(turn_windows=(0,))
+
+
+if __name__ == '__main__':
+    unittest.main()
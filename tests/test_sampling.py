@@ -0,0 +1,157 @@
+"""
+Unit tests for sampled corpus estimates
+"""
+
+import io
+import json
+import os
+import random
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from src.cli import main
+from src.comprehensive_analyzer import ComprehensiveAnalyzer
+from src.sampling import ESTIMATES, estimate_corpus, reservoir_sample, stratum_of
+from src.shard import report_archive
+
+
+TECHNICAL = "Can you debug this API function and the database query?"
+EMOTIONAL = "I feel so grateful, thank you, I really appreciate your kindness."
+REPLY = "Perhaps the index is missing; to clarify, I'm happy to help."
+
+
+def build_corpus(size=400, seed=3):
+    """Conversations whose balance depends on their domain"""
+    rng = random.Random(seed)
+    conversations = []
+    for index in range(size):
+        domain = 'support' if index % 5 == 0 else 'engineering'
+        user = EMOTIONAL if domain == 'support' else TECHNICAL
+        messages = []
+        for _ in range(rng.randint(1, 4)):
+            messages.append({'role': 'user', 'content': user if rng.random() < 0.8 else REPLY})
+            messages.append({'role': 'assistant', 'content': REPLY})
+        conversations.append({'id': f'c{index}', 'metadata': {'domain': domain}, 'messages': messages})
+    return conversations
+
+
+class TestSampling(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.analyzer = ComprehensiveAnalyzer()
+        cls.corpus = build_corpus()
+        cls.full = report_archive(cls.analyzer, cls.corpus)
+
+    def test_reservoir(self):
+        """Reservoirs are capped per stratum and count the whole population"""
+        samples, population = reservoir_sample(self.corpus, 50, random.Random(0), 'domain')
+        self.assertEqual(population, {'support': 80, 'engineering': 320})
+        self.assertEqual({stratum: len(items) for stratum, items in samples.items()},
+                         {'support': 50, 'engineering': 50})
+        self.assertTrue(all(stratum_of(item, 'domain') == 'support' for item in samples['support']))
+        self.assertEqual(len({item['id'] for item in samples['engineering']}), 50)
+        self.assertEqual(stratum_of({'domain': 'x', 'messages': []}, 'domain'), 'x')
+        self.assertIsNone(stratum_of([], 'domain'))
+
+    def test_census_is_exact(self):
+        """Analyzing every conversation reproduces the corpus report"""
+        result = estimate_corpus(self.analyzer, self.corpus, precision=0, max_sample=len(self.corpus))
+        self.assertFalse(result['approximate'])
+        self.assertEqual(result['sampled'], len(self.corpus))
+        estimates = result['estimates']
+        metrics = self.full['overall_metrics']
+        self.assertAlmostEqual(estimates['overall_balance']['estimate'], metrics['overall_balance'])
+        self.assertAlmostEqual(estimates['average_turn_balance']['estimate'], metrics['average_turn_balance'])
+        self.assertAlmostEqual(estimates['hadrael_rate']['estimate'],
+                               self.full['hadrael_compliance']['attribution_score'])
+        self.assertEqual(estimates['overall_balance']['low'], estimates['overall_balance']['high'])
+
+    def test_sample_interval_covers_corpus_value(self):
+        """A sample's intervals bracket the full-corpus values"""
+        for stratify in (None, 'domain'):
+            result = estimate_corpus(self.analyzer, self.corpus, precision=0, max_sample=120,
+                                     stratify=stratify, seed=7)
+            self.assertTrue(result['approximate'])
+            self.assertEqual(result['sampled'], 120)
+            self.assertEqual(set(result['estimates']), set(ESTIMATES))
+            for name in ('overall_balance', 'average_turn_balance'):
+                interval = result['estimates'][name]
+                self.assertLessEqual(interval['low'], interval['estimate'])
+                self.assertLessEqual(interval['estimate'], interval['high'])
+                self.assertLessEqual(interval['low'], self.full['overall_metrics'][name])
+                self.assertLessEqual(self.full['overall_metrics'][name], interval['high'])
+
+    def test_stratified_allocation(self):
+        """Strata are sampled in proportion to their size"""
+        result = estimate_corpus(self.analyzer, self.corpus, precision=0, max_sample=100,
+                                 stratify='domain')
+        self.assertEqual(result['strata'], {
+            'engineering': {'population': 320, 'sampled': 80},
+            'support': {'population': 80, 'sampled': 20},
+        })
+
+    def test_early_stop(self):
+        """Sampling stops once the balance intervals reach the precision"""
+        result = estimate_corpus(self.analyzer, self.corpus, precision=0.05, max_sample=400,
+                                 stratify='domain')
+        self.assertTrue(result['stopped_early'])
+        self.assertLess(result['sampled'], 400)
+        for name in ('overall_balance', 'average_turn_balance'):
+            interval = result['estimates'][name]
+            self.assertLessEqual((interval['high'] - interval['low']) / 2, 0.05)
+
+        again = estimate_corpus(self.analyzer, self.corpus, precision=0.05, max_sample=400,
+                                stratify='domain')
+        self.assertEqual(again, result)
+
+    def test_many_small_strata(self):
+        """Strata with fewer than two samples fall back to an unstratified estimate"""
+        corpus = [dict(conversation, bucket=index % 60) for index, conversation in enumerate(self.corpus)]
+        for stratify, max_sample in (('id', 10), ('bucket', 30)):
+            result = estimate_corpus(self.analyzer, corpus, precision=0.05, max_sample=max_sample,
+                                     stratify=stratify)
+            self.assertTrue(result['approximate'])
+            self.assertFalse(result['stratified'])
+            self.assertFalse(result['stopped_early'])
+            self.assertEqual(result['sampled'], max_sample)
+            for name in ('overall_balance', 'average_turn_balance'):
+                interval = result['estimates'][name]
+                self.assertLess(interval['low'], interval['high'])
+
+        with self.assertRaises(ValueError):
+            estimate_corpus(self.analyzer, self.corpus, max_sample=1)
+
+    def test_precision_waits_for_every_stratum(self):
+        """No precision check stops sampling before each stratum has two samples"""
+        corpus = [dict(conversation, bucket=index % 60) for index, conversation in enumerate(self.corpus)]
+        result = estimate_corpus(self.analyzer, corpus, precision=0.5, stratify='bucket')
+        self.assertTrue(result['stopped_early'])
+        self.assertTrue(result['stratified'])
+        self.assertTrue(all(counts['sampled'] >= 2 for counts in result['strata'].values()))
+
+    def test_unhashable_stratum(self):
+        """Unhashable metadata values are keyed by their repr"""
+        corpus = [dict(conversation, metadata={'domain': [index % 2]})
+                  for index, conversation in enumerate(self.corpus)]
+        samples, population = reservoir_sample(corpus, 10, random.Random(0), 'domain')
+        self.assertEqual(population, {'[0]': 200, '[1]': 200})
+
+    def test_sample_command(self):
+        """The sample command writes the estimates as JSON"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            archive = os.path.join(tmpdir, 'archive.jsonl')
+            with open(archive, 'w', encoding='utf-8') as f:
+                for conversation in self.corpus:
+                    f.write(json.dumps(conversation) + '\n')
+            output = io.StringIO()
+            with redirect_stdout(output):
+                self.assertEqual(main(['sample', archive, '--precision', '0.05',
+                                       '--stratify', 'domain', '--max-sample', '200']), 0)
+        result = json.loads(output.getvalue())
+        self.assertEqual(result['population'], 400)
+        self.assertIn('overall_balance', result['estimates'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+"""
+Unit tests for sharded map/reduce corpus reports
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from src.cli import main
+from src.comprehensive_analyzer import ComprehensiveAnalyzer
+from src.report import CorpusReport
+from src.shard import map_shard, reduce_partials, report_archive, shard_archive, shard_of
+
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SAMPLE_PATH = os.path.join(ROOT, 'data', 'sample_conversations.json')
+
+REPLIES = [
+    "Perhaps the API returns a null pointer; to clarify, check the function signature.",
+    "I'm so happy to help, and I appreciate you sharing this with me.",
+    "As we discussed, the database index should fix the query performance.",
+    "I'm not sure, but according to the docs the algorithm is O(n log n).",
+]
+
+
+def build_archive():
+    with open(SAMPLE_PATH, 'r', encoding='utf-8') as f:
+        conversations = json.load(f)['conversations']
+    for index in range(40):
+        messages = []
+        for turn in range(index % 7 + 1):
+            messages.append({'role': 'user', 'content': f"Question {turn} about the server config?"})
+            messages.append({'role': 'assistant', 'content': REPLIES[(index + turn) % len(REPLIES)]})
+        conversation = {'messages': messages}
+        if index % 5:
+            conversation['id'] = f'conv-{index}'
+        conversations.append(conversation)
+    return conversations
+
+
+class TestShard(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = self.tmpdir.name
+        self.conversations = build_archive()
+        self.archive = os.path.join(self.root, 'archive.jsonl')
+        with open(self.archive, 'w', encoding='utf-8') as f:
+            for conversation in self.conversations:
+                f.write(json.dumps(conversation) + '\n')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _partials(self, shards):
+        paths = shard_archive(self.conversations, os.path.join(self.root, 'shards'), shards)
+        analyzer = ComprehensiveAnalyzer()
+        partials = []
+        for index, path in enumerate(paths):
+            partial = os.path.join(self.root, f'part-{index}.jsonl')
+            with open(path, 'r', encoding='utf-8') as shard, open(partial, 'w', encoding='utf-8') as output:
+                map_shard(analyzer, shard, output)
+            partials.append(partial)
+        return partials
+
+    def test_shards_partition_by_id(self):
+        """Every conversation lands in exactly one shard, chosen by its id, in archive order"""
+        paths = shard_archive(self.conversations, os.path.join(self.root, 'shards'), 4)
+        seen = []
+        for index, path in enumerate(paths):
+            with open(path, 'r', encoding='utf-8') as f:
+                header = json.loads(f.readline())
+                records = [json.loads(line) for line in f]
+            self.assertEqual((header['shard'], header['shards']), (index, 4))
+            seqs = [record['seq'] for record in records]
+            self.assertEqual(seqs, sorted(seqs))
+            for record in records:
+                identifier = record['conversation'].get('id', record['seq'])
+                self.assertEqual(shard_of(identifier, 4), index)
+                self.assertEqual(record['conversation'], self.conversations[record['seq']])
+            seen.extend(seqs)
+        self.assertEqual(sorted(seen), list(range(len(self.conversations))))
+
+    def test_reduce_matches_single_node(self):
+        """Reduced partials equal the report of one pass over the archive"""
+        single = report_archive(ComprehensiveAnalyzer(), self.conversations)
+        self.assertEqual(reduce_partials(self._partials(3)), single)
+
+        report = CorpusReport()
+        for result in ComprehensiveAnalyzer().analyze_many(self.conversations, workers=1):
+            report.add(result)
+        self.assertEqual(report.to_dict(), single)
+        self.assertEqual(single['conversations'], len(self.conversations))
+
+    def test_reduce_checks_partials(self):
+        """Missing, repeated or mismatched partials are rejected"""
+        partials = self._partials(3)
+        with self.assertRaisesRegex(ValueError, 'missing \\[1\\]'):
+            reduce_partials([partials[0], partials[2]])
+        with self.assertRaises(ValueError):
+            reduce_partials(partials + [partials[1]])
+
+        stale = os.path.join(self.root, 'stale.jsonl')
+        with open(partials[1], 'r', encoding='utf-8') as f:
+            header = json.loads(f.readline())
+            rest = f.read()
+        header['version'] = 'other'
+        with open(stale, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(header) + '\n' + rest)
+        with self.assertRaisesRegex(ValueError, 'analyzer versions'):
+            reduce_partials([partials[0], stale, partials[2]])
+
+        with self.assertRaisesRegex(ValueError, 'not a partial-results file'):
+            reduce_partials([os.path.join(self.root, 'shards', 'shard-0000-of-0003.jsonl')])
+
+    def test_shards_as_separate_processes(self):
+        """Shard, map in one process per shard, reduce: same bytes as `report`"""
+        shard_dir = os.path.join(self.root, 'shards')
+        with open(os.devnull, 'w') as devnull:
+            subprocess.run([sys.executable, '-m', 'src.cli', 'shard', self.archive, '-n', '3', '-d', shard_dir],
+                           cwd=ROOT, check=True, stdout=devnull)
+            shards = sorted(os.listdir(shard_dir))
+            self.assertEqual(len(shards), 3)
+            partials = [os.path.join(self.root, f'part-{index}.jsonl') for index in range(3)]
+            jobs = [subprocess.Popen([sys.executable, '-m', 'src.cli', 'map', os.path.join(shard_dir, name),
+                                      '-o', partial], cwd=ROOT)
+                    for name, partial in zip(shards, partials)]
+            self.assertEqual([job.wait() for job in jobs], [0, 0, 0])
+
+        reduced = os.path.join(self.root, 'reduced.json')
+        single = os.path.join(self.root, 'single.json')
+        self.assertEqual(main(['reduce', *partials, '-o', reduced]), 0)
+        self.assertEqual(main(['report', self.archive, '-o', single, '--jobs', '2']), 0)
+        with open(reduced, 'rb') as a, open(single, 'rb') as b:
+            self.assertEqual(a.read(), b.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Unit tests for the persistent per-turn cache
+"""
+
+import os
+import tempfile
+import unittest
+from src.comprehensive_analyzer import ComprehensiveAnalyzer
+from src.store import TurnCache
+
+
+TRANSCRIPT = """Human: Can you help me debug this API function?
+Assistant: Of course! I'm happy to help, thank you for sharing the code.
+Human: To clarify, as we discussed, the database query might be slow.
+Assistant: Based on the error, perhaps the index is missing.
+"""
+
+
+class TestTurnCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.tmpdir.name, 'turns.sqlite')
+        self.transcript = os.path.join(self.tmpdir.name, 'chat.txt')
+        with open(self.transcript, 'w', encoding='utf-8') as f:
+            f.write(TRANSCRIPT)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_warm_rerun_matches(self):
+        """Cached turns give the same analysis without rescanning"""
+        expected = ComprehensiveAnalyzer().analyze_conversation_file(self.transcript)
+
+        with TurnCache(self.cache_path) as cache:
+            cold = ComprehensiveAnalyzer(turn_cache=cache).analyze_conversation_file(self.transcript)
+            self.assertEqual(cache.stats()['misses'], 4)
+        self.assertEqual(cold, expected)
+
+        with TurnCache(self.cache_path) as cache:
+            analyzer = ComprehensiveAnalyzer(turn_cache=cache)
+            warm = analyzer.analyze_conversation_file(self.transcript, use_mmap=True)
+            self.assertEqual(cache.stats(), {'hits': 4, 'misses': 0, 'hit_rate': 1.0, 'entries': 4})
+        self.assertEqual(warm, expected)
+
+    def test_changed_turns_only(self):
+        """Only new or edited turns miss the cache"""
+        with TurnCache(self.cache_path) as cache:
+            analyzer = ComprehensiveAnalyzer(turn_cache=cache)
+            analyzer.analyze_conversation_file(self.transcript)
+            with open(self.transcript, 'a', encoding='utf-8') as f:
+                f.write("Human: Thanks, I feel grateful!\n")
+            analyzer.analyze_conversation_file(self.transcript)
+            self.assertEqual((cache.hits, cache.misses), (4, 5))
+
+    def test_version_isolates_pattern_sets(self):
+        """Results stored under another pattern-set version are not reused"""
+        with TurnCache(self.cache_path) as cache:
+            cache.put('v1', 'some text', {'counts': {}, 'examples': {}})
+            self.assertIsNone(cache.get('v2', 'some text'))
+            self.assertEqual(cache.get('v1', 'some text'), {'counts': {}, 'examples': {}})
+            self.assertEqual(cache.prune('v2'), 1)
+            self.assertIsNone(cache.get('v1', 'some text'))
+
+
+if __name__ == '__main__':
+    unittest.main()
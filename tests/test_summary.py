@@ -0,0 +1,81 @@
+"""
+Unit tests for mergeable analysis summaries
+"""
+
+import json
+import pickle
+import random
+import unittest
+from src.comprehensive_analyzer import ComprehensiveAnalyzer
+from src.summary import AnalysisSummary
+
+
+SENTENCES = [
+    "Can you debug this API function and the database query?",
+    "I'm happy to help, thank you for sharing. I feel we can do it together.",
+    "To clarify, as we discussed, the schema might be wrong, I'm not sure.",
+    "According to the log, the server returns an error.",
+    "Perhaps we should refactor the module, based on the earlier you said notes.",
+    "Wonderful, I appreciate the support of our team!",
+]
+
+RESULT_KEYS = ('total_turns', 'overall_metrics', 'phase_progression', 'hadrael_compliance')
+
+
+def conversation(seed, turns):
+    rng = random.Random(seed)
+    return [
+        {'role': 'user' if index % 2 == 0 else 'assistant',
+         'content': ' '.join(rng.choice(SENTENCES) for _ in range(rng.randint(1, 3)))}
+        for index in range(turns)
+    ]
+
+
+class TestAnalysisSummary(unittest.TestCase):
+
+    def setUp(self):
+        self.analyzer = ComprehensiveAnalyzer()
+
+    def expected(self, messages):
+        result = self.analyzer.analyze_messages(messages)
+        return {key: result[key] for key in RESULT_KEYS}
+
+    def test_merged_shards_reproduce_single_pass(self):
+        """Summaries of consecutive shards merge into the single-pass results"""
+        for seed in range(5):
+            messages = conversation(seed, 25)
+            cuts = sorted(random.Random(seed).sample(range(1, 25), 3))
+            parts = [messages[start:end] for start, end in zip([0] + cuts, cuts + [25])]
+            summaries = [AnalysisSummary.from_turns(self.analyzer.analyze_messages(part)['turn_analysis'])
+                         for part in parts]
+            merged = AnalysisSummary.merged(summaries)
+            self.assertEqual(merged.to_results(), self.expected(messages))
+            self.assertEqual(len(merged), 25)
+
+    def test_merge_is_associative(self):
+        """Any grouping of in-order merges gives the same summary"""
+        summaries = [AnalysisSummary.from_turns(self.analyzer.analyze_messages(conversation(seed, 7))
+                                                ['turn_analysis']) for seed in range(3)]
+        left = AnalysisSummary.merged(summaries[:2]).merge(summaries[2])
+        right = AnalysisSummary.merged(summaries[:1]).merge(AnalysisSummary.merged(summaries[1:]))
+        self.assertEqual(left, right)
+        self.assertEqual(left.to_results(), right.to_results())
+
+    def test_serialization(self):
+        """Summaries round-trip through JSON and pickle"""
+        summary = AnalysisSummary.from_turns(
+            self.analyzer.analyze_messages(conversation(1, 9))['turn_analysis'])
+        state = json.loads(json.dumps(summary.to_dict()))
+        self.assertEqual(AnalysisSummary.from_dict(state), summary)
+        self.assertEqual(pickle.loads(pickle.dumps(summary)), summary)
+        self.assertIsInstance(state['balances'], str)
+        with self.assertRaises(ValueError):
+            AnalysisSummary.from_dict(dict(state, format=99))
+
+    def test_empty(self):
+        """An empty summary gives the results of a conversation without turns"""
+        self.assertEqual(AnalysisSummary().to_results(), self.expected([]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Unit tests for columnar turn tables
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from src import metrics
+from src.analyzer import BalanceAnalyzer
+from src.comprehensive_analyzer import ComprehensiveAnalyzer
+from src.metrics import PHASE_ORDER, calculate_trajectory
+from src.table import TurnTable
+
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'sample_conversations.json')
+
+
+def load_sample():
+    with open(SAMPLE_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)['conversations']
+
+
+class TestTurnTable(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.sample = load_sample()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def assert_matches(self, table, results, technical_key):
+        self.assertEqual(table.conversation_count, len(results))
+        for index, result in enumerate(results):
+            rows = table.conversation(index)
+            turns = result['turn_analysis'] if 'turn_analysis' in result else result['turn_balances']
+            self.assertEqual(list(rows['technical']), [turn[technical_key] for turn in turns])
+            for stored, turn in zip(rows['balance'], turns):
+                self.assertAlmostEqual(float(stored), turn['balance'], places=6)
+            self.assertEqual([table.roles[code] for code in rows['role']],
+                             [turn.get('role', turn.get('speaker')) for turn in turns])
+
+    def test_basic_table(self):
+        """analyze_table stores every turn_balances entry column-wise"""
+        analyzer = BalanceAnalyzer()
+        table = analyzer.analyze_table(self.sample)
+        self.assertEqual(table.ids, [c['id'] for c in self.sample])
+        self.assertEqual(table['balance'].typecode, 'f')
+        self.assertEqual(table['technical'].itemsize, 4)
+        results = [analyzer.analyze_conversation(c['messages']) for c in self.sample]
+        self.assert_matches(table, results, 'technical')
+
+    def test_comprehensive_table_phases(self):
+        """Comprehensive tables keep all counts and phase codes"""
+        analyzer = ComprehensiveAnalyzer()
+        table = analyzer.analyze_table(self.sample, workers=1)
+        results = [analyzer.analyze_messages(c['messages']) for c in self.sample]
+        self.assert_matches(table, results, 'technical_count')
+        phases = [PHASE_ORDER[code].value for code in table['phase']]
+        self.assertEqual(phases, [t['phase'] for r in results for t in r['turn_analysis']])
+
+    def load_round_trip(self):
+        table = BalanceAnalyzer().analyze_table(self.sample)
+        path = os.path.join(self.tmpdir.name, 'results.table')
+        table.save(path)
+        return table, TurnTable.load(path)
+
+    def check_loaded(self, table, loaded):
+        self.assertEqual(loaded.ids, table.ids)
+        self.assertEqual(loaded.roles, table.roles)
+        self.assertEqual(list(loaded.offsets), list(table.offsets))
+        for name, _ in table.schema:
+            self.assertEqual(list(loaded[name]), list(table[name]))
+        # Mapped balances feed calculate_trajectory directly
+        rows = loaded.conversation(0)['balance']
+        self.assertEqual(calculate_trajectory(rows)['trend'],
+                         calculate_trajectory(list(table.conversation(0)['balance']))['trend'])
+        with self.assertRaises(TypeError):
+            loaded.add_conversation([])
+
+    @unittest.skipIf(metrics.load_numpy() is None, "NumPy not installed")
+    def test_save_load_numpy(self):
+        """Saved columns are standard .npy files NumPy memory-maps"""
+        table, loaded = self.load_round_trip()
+        self.assertIsInstance(loaded['balance'], metrics.np.memmap)
+        self.check_loaded(table, loaded)
+        trajectories = loaded.trajectories()
+        self.assertEqual(len(trajectories['trend']), table.conversation_count)
+
+    def test_save_load_without_numpy(self):
+        """Without NumPy columns load as memoryviews over the mapped files"""
+        with mock.patch.object(metrics, 'np', None):
+            table, loaded = self.load_round_trip()
+            self.assertIsInstance(loaded['balance'], memoryview)
+            self.check_loaded(table, loaded)
+            loaded.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+"""
+Unit tests for transcript turn extraction
+"""
+
+import os
+import re
+import tempfile
+import unittest
+from src.comprehensive_analyzer import ComprehensiveAnalyzer
+from src.turns import STR_HEADERS, iter_turns, iter_turns_bytes, sniff_format
+
+
+TRANSCRIPTS = {
+    'bold': (
+        "# Session notes\n\n"
+        "**Human**: I feel excited to implement the API together!\n"
+        "**Assistant**: To clarify, as we discussed, maybe we should test the endpoint.\n"
+        "**Human**:\n\n  Thank you, I think the function works. **AI**: Great to hear\n"
+        "Unlabelled line that belongs to no turn\n"
+    ),
+    'plain': (
+        "Human: Let's debug the database query\n"
+        "Assistant: I'm not sure, but the schema might be wrong\n"
+        "Human:\n"
+        "Assistant: According to the log, the error is in the module\n"
+    ),
+    'bracket': (
+        "[User]: We can build this together\n"
+        "[Bot]: Based on the data, I believe the algorithm is fine\n"
+        "[User]: Wonderful, thanks!\n"
+    ),
+}
+
+
+def legacy_turns(content):
+    """The original DOTALL regex extraction, kept as a reference"""
+    patterns = [
+        r'\*\*([^*]+)\*\*:\s*(.*?)(?=\*\*[^*]+\*\*:|$)',
+        r'^([A-Za-z]+):\s*(.*?)(?=^[A-Za-z]+:|$)',
+        r'\[([^\]]+)\]:\s*(.*?)(?=\[[^\]]+\]:|$)'
+    ]
+    for pattern in patterns:
+        matches = list(re.finditer(pattern, content, re.MULTILINE | re.DOTALL))
+        if matches:
+            return [(m.group(1).strip(), m.group(2).strip()) for m in matches if m.group(2).strip()]
+    return []
+
+
+class TestTurnExtraction(unittest.TestCase):
+
+    def test_matches_legacy_extraction(self):
+        """The linear extractor yields the same turns as the DOTALL regexes"""
+        extra = [
+            "",
+            "no labels at all",
+            "**Multi\nLine**: label spanning lines **B**: x",
+            "Human:\nAssistant: hi\n[Tag]: ignored because plain wins",
+            "**A**: first **B**:\n\n second\n**C**:",
+        ]
+        for content in list(TRANSCRIPTS.values()) + extra:
+            self.assertEqual(list(iter_turns(content)), legacy_turns(content), content)
+
+    def test_sniffing_respects_format_priority(self):
+        """A bold label past the sniffed prefix still wins over plain labels"""
+        content = "Human: hello\n" * 50 + "**Human**: late bold label\n"
+        self.assertEqual(sniff_format(content, STR_HEADERS, sniff_size=64)[0], 'bold')
+        self.assertEqual(list(iter_turns(content)), [('Human', 'late bold label')])
+
+    def test_extract_turns_normalizes_speakers(self):
+        """_extract_turns keeps its list-of-dicts shape"""
+        turns = ComprehensiveAnalyzer()._extract_turns(TRANSCRIPTS['bracket'])
+        self.assertEqual([t['speaker'] for t in turns], ['human', 'assistant', 'human'])
+
+
+class TestMappedFileAnalysis(unittest.TestCase):
+
+    def setUp(self):
+        self.analyzer = ComprehensiveAnalyzer()
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, content, newline='\n'):
+        path = os.path.join(self.tmpdir.name, 'transcript.md')
+        with open(path, 'w', encoding='utf-8', newline=newline) as f:
+            f.write(content)
+        return path
+
+    def test_mmap_matches_read(self):
+        """Memory-mapped analysis gives the same results as reading the file"""
+        for name, content in TRANSCRIPTS.items():
+            for newline in ('\n', '\r\n', '\r'):
+                path = self.write(content, newline)
+                self.assertEqual(
+                    self.analyzer.analyze_conversation_file(path, use_mmap=True),
+                    self.analyzer.analyze_conversation_file(path),
+                    (name, newline)
+                )
+
+    def test_mmap_raw_content(self):
+        """Files without turn labels fall back to raw analysis"""
+        path = self.write("Just some notes about the API and how happy we are.\n")
+        result = self.analyzer.analyze_conversation_file(path, use_mmap=True)
+        self.assertTrue(result['raw_analysis'])
+        self.assertEqual(result, self.analyzer.analyze_conversation_file(path))
+
+    def test_mmap_empty_file(self):
+        """Empty files cannot be mapped but are still analyzed"""
+        path = self.write("")
+        self.assertEqual(self.analyzer.analyze_conversation_file(path, use_mmap=True),
+                         self.analyzer.analyze_conversation_file(path))
+
+    def test_bytes_turns(self):
+        """Turns are decoded one at a time from a bytes buffer"""
+        turns = list(iter_turns_bytes(TRANSCRIPTS['bold'].encode('utf-8')))
+        self.assertEqual([speaker for speaker, _ in turns], ['Human', 'Assistant', 'Human', 'AI'])
+        self.assertEqual(turns[2][1], 'Thank you, I think the function works.')
+
+
+if __name__ == '__main__':
+    unittest.main()